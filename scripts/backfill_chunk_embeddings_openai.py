@@ -10,15 +10,20 @@ Hard rules:
 import argparse
 import os
 import re
+import sys
 from dataclasses import dataclass
+from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
-import tiktoken
 from dotenv import load_dotenv
 from openai import OpenAI
 from supabase import create_client
 from tqdm import tqdm
 
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.knowledge.tokenization import Tokenizer, get_tokenizer
+
 
 ALLOWED_SEGMENT_TYPES = ("interview", "lightning_round")
 EMBEDDING_MODEL = "text-embedding-3-small"
@@ -40,45 +45,37 @@ def split_into_sentences(text: str) -> List[str]:
     return [p.strip() for p in parts if p.strip()]
 
 
-def chunk_text_by_tokens(text: str, enc, target_tokens: int, overlap_tokens: int) -> List[Tuple[str, int]]:
+def chunk_text_by_tokens(text: str, tokenizer: Tokenizer, target_tokens: int, overlap_tokens: int) -> List[Tuple[str, int]]:
     sentences = split_into_sentences(text)
     if not sentences:
         return []
 
-    chunks: List[Tuple[str, int]] = []
-    current: List[str] = []
+    # Sentence counts come from one batch; chunk sizes and overlaps from prefix sums
+    sentence_tokens = tokenizer.count_batch(sentences)
+    spans: List[Tuple[int, int]] = []
+    start = 0
     current_tokens = 0
 
-    for sent in sentences:
-        stoks = len(enc.encode(sent))
-        if current and current_tokens + stoks > target_tokens:
-            content = " ".join(current).strip()
-            ctoks = len(enc.encode(content))
-            if content:
-                chunks.append((content, ctoks))
+    for j, stoks in enumerate(sentence_tokens):
+        if j > start and current_tokens + stoks > target_tokens:
+            spans.append((start, j))
 
             # overlap from tail
-            overlap: List[str] = []
+            k = j
             overlap_count = 0
-            for s in reversed(current):
-                toks = len(enc.encode(s))
-                if overlap_count + toks > overlap_tokens:
-                    break
-                overlap.insert(0, s)
-                overlap_count += toks
-            current = overlap + [sent]
+            while k > start and overlap_count + sentence_tokens[k - 1] <= overlap_tokens:
+                k -= 1
+                overlap_count += sentence_tokens[k]
+            start = k
             current_tokens = overlap_count + stoks
         else:
-            current.append(sent)
             current_tokens += stoks
 
-    if current:
-        content = " ".join(current).strip()
-        ctoks = len(enc.encode(content))
-        if content:
-            chunks.append((content, ctoks))
+    spans.append((start, len(sentences)))
 
-    return chunks
+    contents = [" ".join(sentences[a:b]).strip() for a, b in spans]
+    contents = [content for content in contents if content]
+    return list(zip(contents, tokenizer.count_batch(contents)))
 
 
 def fetch_all_rows(client, table: str, select: str, filters: Optional[List[Tuple[str, str, str]]] = None, page_size: int = 1000):
@@ -123,7 +120,7 @@ def main():
         raise ValueError("OPENAI_API_KEY is required unless --dry-run is used")
 
     sb = create_client(supabase_url, supabase_key)
-    enc = tiktoken.get_encoding("cl100k_base")
+    tokenizer = get_tokenizer("cl100k_base")
     oai = OpenAI(api_key=openai_key) if openai_key else None
 
     print("Loading episodes map...")
@@ -158,7 +155,7 @@ def main():
         start_time = seg.get("start_time")
         seg_id = seg.get("id")
         for idx, (chunk_text, token_count) in enumerate(
-            chunk_text_by_tokens(content, enc, args.target_tokens, args.overlap_tokens)
+            chunk_text_by_tokens(content, tokenizer, args.target_tokens, args.overlap_tokens)
         ):
             chunks.append(
                 Chunk(
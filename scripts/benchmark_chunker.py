@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark IntelligentChunker throughput on the real episodes/ corpus.
+
+Transcripts are parsed once up front so only chunking is timed. The shared
+tokenizer's token-count cache is cleared before every timed pass, so each
+pass encodes every turn (as a first build over new episodes does). Pass
+--baseline-rev to also time the chunker as it exists at an earlier git
+revision (e.g. the commit before token-count memoization) and compare.
+
+    python scripts/benchmark_chunker.py --baseline-rev <rev>
+"""
+import argparse
+import subprocess
+import sys
+import time
+import types
+from pathlib import Path
+
+# Add src to path
+REPO_ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(REPO_ROOT))
+
+from src.knowledge.chunker import IntelligentChunker
+from src.knowledge.tokenization import get_tokenizer
+from src.knowledge.transcript_parser import TranscriptParser
+
+
+def load_chunker_at(rev: str):
+    """Import IntelligentChunker from src/knowledge/chunker.py at a git revision."""
+    source = subprocess.run(
+        ["git", "show", f"{rev}:src/knowledge/chunker.py"],
+        cwd=REPO_ROOT, check=True, capture_output=True, text=True
+    ).stdout
+    module = types.ModuleType("src.knowledge._baseline_chunker")
+    module.__package__ = "src.knowledge"
+    exec(compile(source, f"{rev}:chunker.py", "exec"), module.__dict__)
+    return module.IntelligentChunker
+
+
+def time_chunker(chunker, transcripts, repeats: int):
+    """Return (best seconds per full-corpus pass with a cold count cache, chunks from the last pass)."""
+    best = float("inf")
+    chunks = []
+    for _ in range(repeats):
+        get_tokenizer().clear_cache()
+        start = time.perf_counter()
+        chunks = [chunk for transcript in transcripts for chunk in chunker.chunk_transcript(transcript)]
+        best = min(best, time.perf_counter() - start)
+    return best, chunks
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcript chunking")
+    parser.add_argument("--episodes-dir", default="episodes", help="Episodes directory")
+    parser.add_argument("--parse-workers", type=int, default=0, help="Parser processes (0 = all cores)")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed passes per chunker (best is reported)")
+    parser.add_argument("--baseline-rev", default=None, help="Git revision whose chunker to compare against")
+    args = parser.parse_args()
+
+    transcripts = list(TranscriptParser(episodes_dir=args.episodes_dir, workers=args.parse_workers).iter_episodes())
+    num_turns = sum(len(t.turns) for t in transcripts)
+    print(f"Corpus: {len(transcripts)} episodes, {num_turns} turns")
+
+    runs = []
+    if args.baseline_rev:
+        runs.append(("baseline", load_chunker_at(args.baseline_rev)()))
+    runs.append(("current", IntelligentChunker()))
+
+    results = {}
+    print(f"\n{'chunker':<10} {'seconds':>9} {'episodes/s':>12} {'turns/s':>10} {'chunks':>8} {'tokens':>10}")
+    for name, chunker in runs:
+        seconds, chunks = time_chunker(chunker, transcripts, args.repeats)
+        tokens = sum(chunk.token_count for chunk in chunks)
+        results[name] = (seconds, chunks)
+        print(f"{name:<10} {seconds:>9.3f} {len(transcripts) / seconds:>12.1f} "
+              f"{num_turns / seconds:>10.0f} {len(chunks):>8} {tokens:>10}")
+
+    if "baseline" in results:
+        baseline_time, baseline_chunks = results["baseline"]
+        current_time, current_chunks = results["current"]
+        print(f"\nSpeedup: {baseline_time / current_time:.2f}x")
+
+        # Parity report: boundaries should match; token counts may differ by the
+        # few tokens BPE merges across the " " between joined turns
+        baseline_by_id = {chunk.chunk_id: chunk for chunk in baseline_chunks}
+        boundary_diffs = [
+            chunk.chunk_id for chunk in current_chunks
+            if chunk.chunk_id not in baseline_by_id
+            or baseline_by_id[chunk.chunk_id].turn_indices != chunk.turn_indices
+        ]
+        token_drift = sum(
+            abs(baseline_by_id[chunk.chunk_id].token_count - chunk.token_count)
+            for chunk in current_chunks if chunk.chunk_id in baseline_by_id
+        )
+        print(f"Chunks with different boundaries: {len(boundary_diffs)}")
+        print(f"Total |token_count| drift: {token_drift}")
+
+
+if __name__ == "__main__":
+    main()
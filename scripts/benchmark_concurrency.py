@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""
+Search throughput (QPS) and latency against thread count for each FAISS/BLAS
+threading policy on a built vector store.
+
+For each policy and thread count T the store gets T cores: "intra_query"
+runs one search at a time on all T cores, "inter_query" runs up to T
+single-threaded searches side by side. T client threads issue the queries,
+which are sampled from the stored chunk texts.
+"""
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.knowledge.concurrency import THREADING_POLICIES
+from src.knowledge.vector_store import VectorStore
+
+
+def run(store: VectorStore, queries, clients: int, k: int):
+    """Issue all queries from `clients` threads; returns (wall seconds, per-query latencies in ms)."""
+    def timed_search(query: str) -> float:
+        start = time.perf_counter()
+        store.search(query, k=k)
+        return (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = list(pool.map(timed_search, queries))
+    return time.perf_counter() - start, np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="QPS vs thread count for vector store searches")
+    parser.add_argument("--index-path", default="knowledge_base/vector_store", help="Saved vector store")
+    parser.add_argument("--policies", nargs="+", default=list(THREADING_POLICIES), choices=list(THREADING_POLICIES), help="Threading policies to compare")
+    parser.add_argument("--threads", nargs="+", type=int, default=[1, 2, 4, 8], help="Thread counts to measure")
+    parser.add_argument("--queries", type=int, default=500, help="Queries per measurement")
+    parser.add_argument("-k", type=int, default=10, help="Results per query")
+    parser.add_argument("--seed", type=int, default=0, help="Query sampling seed")
+    args = parser.parse_args()
+
+    store = VectorStore(index_path=args.index_path)
+    chunk_ids = [chunk_id for chunk_id in store.chunk_id_order if chunk_id in store.chunks]
+    rng = random.Random(args.seed)
+    queries = [store.chunks[rng.choice(chunk_ids)] for _ in range(args.queries)]
+    print(f"Vectors: {len(store.vectors)} x {store.dimension}, index: {store.index_type}")
+
+    # Warm up the encoder and index outside the measurements
+    store.search(queries[0], k=args.k)
+
+    print(f"\n{'policy':<12} {'threads':>7} {'QPS':>9} {'p50 ms':>8} {'p95 ms':>8}")
+    for policy in args.policies:
+        for threads in args.threads:
+            store.set_threading_policy(policy, threads)
+            seconds, latencies = run(store, queries, threads, args.k)
+            print(f"{policy:<12} {threads:>7} {len(queries) / seconds:>9.1f} "
+                  f"{np.percentile(latencies, 50):>8.2f} {np.percentile(latencies, 95):>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
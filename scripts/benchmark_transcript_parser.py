@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Benchmark the single-pass transcript scanner against the legacy
+split('---') + yaml + regex parser on the real episodes/ corpus.
+
+Files are read into memory once so only parsing is timed.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.knowledge.transcript_parser import TranscriptParser
+
+
+def time_parser(parser: TranscriptParser, corpus, repeats: int):
+    """Return (best seconds per full-corpus pass, parsed transcripts)."""
+    best = float("inf")
+    parsed = {}
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for episode_id, content in corpus:
+            try:
+                parsed[episode_id] = parser.parse_content(content, episode_id)
+            except Exception:
+                continue
+        best = min(best, time.perf_counter() - start)
+    return best, parsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark transcript parsing")
+    parser.add_argument("--episodes-dir", default="episodes", help="Episodes directory")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed passes per parser (best is reported)")
+    args = parser.parse_args()
+
+    paths = TranscriptParser(episodes_dir=args.episodes_dir).get_all_episodes()
+    corpus = [(path.parent.name, path.read_text(encoding="utf-8")) for path in paths]
+    total_mb = sum(len(content.encode("utf-8")) for _, content in corpus) / 1e6
+    print(f"Corpus: {len(corpus)} episodes, {total_mb:.1f} MB")
+
+    legacy_time, legacy = time_parser(TranscriptParser(use_scanner=False), corpus, args.repeats)
+    scanner_time, scanned = time_parser(TranscriptParser(use_scanner=True), corpus, args.repeats)
+
+    print(f"\n{'parser':<10} {'seconds':>9} {'episodes/s':>12} {'MB/s':>8} {'turns':>8}")
+    for name, seconds, result in (
+        ("legacy", legacy_time, legacy),
+        ("scanner", scanner_time, scanned),
+    ):
+        turns = sum(len(t.turns) for t in result.values())
+        print(f"{name:<10} {seconds:>9.3f} {len(result) / seconds:>12.1f} {total_mb / seconds:>8.1f} {turns:>8}")
+    print(f"\nSpeedup: {legacy_time / scanner_time:.2f}x")
+
+    # Parity report
+    metadata_mismatches = [
+        episode_id for episode_id in legacy
+        if episode_id in scanned and legacy[episode_id].metadata != scanned[episode_id].metadata
+    ]
+    turn_count_diffs = [
+        (episode_id, len(legacy[episode_id].turns), len(scanned[episode_id].turns))
+        for episode_id in legacy
+        if episode_id in scanned and len(legacy[episode_id].turns) != len(scanned[episode_id].turns)
+    ]
+    print(f"Metadata mismatches: {len(metadata_mismatches)}")
+    print(f"Episodes with different turn counts: {len(turn_count_diffs)}")
+    for episode_id, legacy_turns, scanner_turns in turn_count_diffs[:10]:
+        print(f"  {episode_id}: legacy={legacy_turns} scanner={scanner_turns}")
+
+
+if __name__ == "__main__":
+    main()
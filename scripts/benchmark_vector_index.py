@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+"""
+Compare ANN index types and vector storage (float32, float16, sq8, pq) on
+a built vector store: recall@k against exact (flat) search after
+re-ranking, per-query latency, build time and code bytes per vector.
+
+The store's raw vectors are reused, so nothing is re-embedded. The saved
+store is left untouched unless --save-as is given.
+"""
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.knowledge.vector_store import VectorStore, INDEX_DEFAULTS, INDEX_STORAGE, PARTITION_FIELDS, code_bytes
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall/latency report for vector index types")
+    parser.add_argument("--index-path", default="knowledge_base/vector_store", help="Saved vector store")
+    parser.add_argument("--types", nargs="+", default=list(INDEX_DEFAULTS), choices=list(INDEX_DEFAULTS), help="Index types to compare")
+    parser.add_argument("--storages", nargs="+", default=["float32"], choices=list(INDEX_STORAGE), help="Vector code storages to compare")
+    parser.add_argument("--rerank-factor", type=int, default=4, help="Candidates per result re-ranked exactly for lossy storage")
+    parser.add_argument("--partition-by", default=None, choices=list(PARTITION_FIELDS), help="Compare with one sub-index per guest/episode")
+    parser.add_argument("-k", type=int, default=10, help="Neighbours per query for recall@k")
+    parser.add_argument("--queries", type=int, default=500, help="Number of sampled queries")
+    parser.add_argument("--save-as", default=None, choices=list(INDEX_DEFAULTS), help="Rebuild and save the store with this index type afterwards")
+    parser.add_argument("--save-storage", default=None, choices=list(INDEX_STORAGE), help="Storage for --save-as (default: the saved store's)")
+    args = parser.parse_args()
+
+    store = VectorStore(index_path=args.index_path)
+    saved_storage = store.storage
+    store.rerank_factor = args.rerank_factor
+    saved_partition_by = store.partition_by
+    store.partition_by = args.partition_by
+    print(f"Vectors: {len(store.vectors)} x {store.dimension}")
+
+    print(f"\n{'index':<10} {'storage':<8} {'B/vec':>6} {'build s':>8} {'recall@' + str(args.k):>10} {'ms/query':>9} {'flat ms':>8}  params")
+    for index_type in args.types:
+        for storage in args.storages:
+            if index_type == "ivf_pq" and storage not in ("float32", "pq"):
+                continue
+            start = time.perf_counter()
+            store.rebuild_index(index_type, measure=False, storage=storage)
+            build_seconds = time.perf_counter() - start
+            report = store.measure_recall(k=args.k, num_queries=args.queries)
+            bytes_per_vector = code_bytes(index_type, storage, store.dimension, store.index_params)
+            print(f"{index_type:<10} {storage:<8} {bytes_per_vector:>6.0f} {build_seconds:>8.2f} {report['recall_at_k']:>10.3f} "
+                  f"{report['latency_ms']:>9.3f} {report['flat_latency_ms']:>8.3f}  {store.index_params}")
+
+    if args.save_as:
+        store.partition_by = saved_partition_by
+        store.rebuild_index(args.save_as, storage=args.save_storage or saved_storage)
+        store.save()
+        print(f"\nSaved {args.index_path} with a {args.save_as} index")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,29 +4,53 @@ Build Knowledge Base - Complete pipeline to build the knowledge substrate.
 This runs offline to process all transcripts and create the RAG system.
 """
 import sys
+import shutil
 from pathlib import Path
 import json
 import pickle
+from typing import Optional
 from tqdm import tqdm
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent))
 
-from src.knowledge.transcript_parser import TranscriptParser
+from src.knowledge.transcript_parser import TranscriptParser, speaker_role
+from src.knowledge.turn_store import TurnStore
+from src.knowledge.corpus_manifest import CorpusManifest
+from src.knowledge.dedup import CorpusDeduplicator
+from src.knowledge.embedding_cache import EmbeddingCache
 from src.knowledge.chunker import IntelligentChunker
 from src.knowledge.theme_extractor import ThemeExtractor
 from src.knowledge.theme_clusterer import ThemeClusterer
 from src.knowledge.guest_theme_mapper import GuestThemeMapper
-from src.knowledge.vector_store import VectorStore, ChunkMetadata
+from src.knowledge.vector_store import VectorStore, ChunkMetadata, INDEX_DEFAULTS, INDEX_STORAGE, PARTITION_FIELDS
 from src.knowledge.supabase_store import SupabaseStore
 
 
+def replace_directory(source: Path, target: Path):
+    """Move `source` to `target`, replacing (and then deleting) any directory there."""
+    previous = target.with_name(target.name + ".previous")
+    shutil.rmtree(previous, ignore_errors=True)
+    if target.exists():
+        target.rename(previous)
+    source.rename(target)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
 def build_knowledge_base(
     episodes_dir: str = "episodes",
     output_dir: str = "knowledge_base",
     batch_size: int = 10,
     skip_extraction: bool = False,
-    use_supabase: bool = True
+    use_supabase: bool = True,
+    parse_workers: int = 0,
+    parse_cache_dir: Optional[str] = None,
+    full_rebuild: bool = False,
+    index_type: str = "flat",
+    embedding_cache_mb: float = 2048,
+    index_storage: str = "float32",
+    partition_by: Optional[str] = None,
+    text_compression: Optional[str] = None
 ):
     """
     Build the complete knowledge base.
@@ -36,8 +60,17 @@ def build_knowledge_base(
     2. Chunk transcripts intelligently
     3. Extract themes from chunks (offline LLM pass)
     4. Cluster themes into intent ontology
-    5. Map guest-theme strengths
-    6. Build vector store with RAG
+    5. Build vector store with RAG and assign chunks to themes
+    6. Map guest-theme strengths
+    
+    Episodes are streamed through parse -> chunk -> extract -> embed one at a
+    time, so memory stays bounded by one episode plus per-chunk metadata.
+    
+    Every stage consults the corpus manifest and only processes episodes that
+    were added or changed since the last build; chunks from deleted or changed
+    episodes are retracted. Near-duplicate episodes and chunks (MinHash/LSH)
+    are dropped after chunking, so they are never extracted or embedded.
+    Pass full_rebuild=True to ignore previous outputs.
     """
     output_path = Path(output_dir)
     output_path.mkdir(exist_ok=True)
@@ -59,31 +92,127 @@ def build_knowledge_base(
     
     # Step 1: Parse transcripts
     print("\n[1/6] Parsing transcripts...")
-    parser = TranscriptParser(episodes_dir=episodes_dir)
-    transcripts = parser.parse_all_episodes()
-    print(f"  Parsed {len(transcripts)} episodes")
+    parser = TranscriptParser(
+        episodes_dir=episodes_dir,
+        cache_dir=parse_cache_dir or str(output_path / "transcript_cache"),
+        workers=parse_workers
+    )
+    # Write every turn to the columnar turn store; later stages stream from it.
+    # It is built next to the previous one and swapped in once the vector store
+    # whose chunk spans point into it is saved, so a failed build leaves the
+    # saved store and its turn store consistent
+    turn_store_path = output_path / "turn_store"
+    building_path = output_path / "turn_store.building"
+    shutil.rmtree(building_path, ignore_errors=True)
+    turn_store = TurnStore.build(parser.iter_episodes(), str(building_path))
+    num_episodes = turn_store.num_episodes
+    print(f"  Parsed {num_episodes} episodes ({len(turn_store)} turns)")
+    
+    # Diff the corpus against the manifest of the previous build
+    manifest = CorpusManifest(str(output_path / "manifest.json"))
+    if full_rebuild:
+        manifest.episodes.clear()
+    diff = manifest.refresh(parser.get_all_episodes())
+    retracted_chunk_ids = manifest.retract_removed(diff)
+    retracted = set(retracted_chunk_ids)
+    print(f"  Corpus delta: {diff.summary()}")
+    if retracted_chunk_ids:
+        print(f"  Retracting {len(retracted_chunk_ids)} chunks from removed/changed episodes")
+        if use_supabase and supabase_store:
+            supabase_store.delete_chunks(retracted_chunk_ids)
     
-    # Step 2: Chunk transcripts
-    print("\n[2/6] Chunking transcripts...")
     chunker = IntelligentChunker()
-    all_chunks = []
-    chunk_metadata_dict = {}
     
-    for transcript in tqdm(transcripts, desc="Chunking"):
-        chunks = chunker.chunk_transcript(transcript)
-        all_chunks.extend(chunks)
+    # Chunk ids that survive near-duplicate detection (set after chunking)
+    kept = set()
+    
+    def missing(chunk_id, done):
+        return done is None or (chunk_id in kept and chunk_id not in done)
+    
+    def pending_episodes(stage: str, done=None):
+        """
+        Episodes in the turn store that `stage` has not processed yet.
         
-        # Store metadata
-        for chunk in chunks:
-            chunk_metadata_dict[chunk.chunk_id] = {
-                "guest_id": chunk.guest_id,
-                "episode_id": chunk.episode_id,
-                "speaker": chunk.speaker,
-                "timestamp": chunk.timestamp,
-                "token_count": chunk.token_count
+        With `done` (chunk ids the stage already produced), episodes with kept
+        chunks missing from it are included too, e.g. when a chunk stops being
+        a duplicate because its canonical copy was removed.
+        """
+        return [
+            episode_id for episode_id in turn_store.episode_ids
+            if manifest.needs(stage, episode_id) or (
+                done is not None and any(missing(c, done) for c in manifest.chunk_ids(episode_id))
+            )
+        ]
+    
+    def stream_chunks(episode_ids, done=None):
+        """Stream chunks episode by episode from the memory-mapped turn store."""
+        chunks = chunker.iter_chunks(
+            turn_store.get_transcript(episode_id) for episode_id in episode_ids
+        )
+        return (chunk for chunk in chunks if missing(chunk.chunk_id, done))
+    
+    def count_chunks(episode_ids, done=None):
+        return sum(
+            1 for episode_id in episode_ids
+            for chunk_id in manifest.chunk_ids(episode_id) if missing(chunk_id, done)
+        )
+    
+    # Step 2: Chunk transcripts
+    print("\n[2/6] Chunking transcripts...")
+    chunk_metadata_file = output_path / "chunk_metadata.json"
+    chunk_metadata_dict = {}
+    if chunk_metadata_file.exists() and not full_rebuild:
+        with open(chunk_metadata_file, "r") as f:
+            chunk_metadata_dict = {
+                chunk_id: metadata for chunk_id, metadata in json.load(f).items()
+                if chunk_id not in retracted
             }
+    else:
+        manifest.reset_stage("chunk")
+    
+    # MinHash signatures of every episode and chunk, kept across builds
+    deduplicator = CorpusDeduplicator(str(output_path / "dedup"))
+    if full_rebuild or not deduplicator.loaded:
+        deduplicator.clear()
+        manifest.reset_stage("chunk")  # re-chunk to re-hash every chunk
+    deduplicator.remove(diff.removed + diff.changed, retracted_chunk_ids)
+    
+    to_chunk = pending_episodes("chunk")
+    episode_chunk_ids = {episode_id: [] for episode_id in to_chunk}
+    for chunk in tqdm(stream_chunks(to_chunk), desc="Chunking"):
+        # Only the small per-chunk metadata is kept; chunk text is re-streamed when needed
+        chunk_metadata_dict[chunk.chunk_id] = {
+            "guest_id": chunk.guest_id,
+            "episode_id": chunk.episode_id,
+            "speaker": chunk.speaker,
+            "timestamp": chunk.timestamp,
+            "token_count": chunk.token_count,
+            "span": [chunk.start_offset, chunk.end_offset]
+        }
+        episode_chunk_ids[chunk.episode_id].append(chunk.chunk_id)
+        deduplicator.add_chunk(chunk.chunk_id, chunk.episode_id, chunk.text)
+    for episode_id in to_chunk:
+        deduplicator.add_episode(episode_id, turn_store.episode_text(episode_id))
     
-    print(f"  Created {len(all_chunks)} chunks")
+    with open(chunk_metadata_file, "w") as f:
+        json.dump(chunk_metadata_dict, f)
+    for episode_id, chunk_ids in episode_chunk_ids.items():
+        manifest.set_chunk_ids(episode_id, chunk_ids)
+        manifest.mark("chunk", episode_id)
+    manifest.save()
+    
+    num_chunks = len(chunk_metadata_dict)
+    print(f"  Chunked {len(to_chunk)} episodes; {num_chunks} chunks in corpus")
+    
+    # Drop near-duplicate episodes/chunks before any LLM or embedding work
+    print("  Detecting near-duplicates (MinHash/LSH)...")
+    deduplicator.save()
+    duplicates = deduplicator.detect()
+    duplicates.save(str(output_path / "duplicates.json"))
+    kept.update(chunk_id for chunk_id in chunk_metadata_dict if not duplicates.is_duplicate(chunk_id))
+    print(f"  Found {duplicates.summary()}; {len(kept)} chunks kept")
+    for duplicate, canonical in sorted(duplicates.episode_links.items()):
+        print(f"    {duplicate} -> {canonical}")
     
     # Step 3: Extract themes (offline LLM pass)
     print("\n[3/6] Extracting themes from chunks...")
@@ -137,12 +266,28 @@ def build_knowledge_base(
             else:
                 print("  No existing extractions found. Run without --skip-extraction first.")
                 return
+        # Chunk ids are positional, so a changed episode reuses them; drop its stale extractions
+        extractions = [e for e in extractions if e["chunk_id"] in kept and e["chunk_id"] not in retracted]
     else:
+        # Reuse extractions of unchanged episodes; only new/changed ones hit the LLM
+        extraction_file = output_path / "theme_extractions.json"
+        if extraction_file.exists() and not full_rebuild:
+            with open(extraction_file, "r") as f:
+                extractions = [
+                    e for e in json.load(f)
+                    if e["chunk_id"] in kept and e["chunk_id"] not in retracted
+                ]
+            print(f"  Reusing {len(extractions)} extractions from previous build")
+        else:
+            manifest.reset_stage("extract")
+        
         # Extract themes and save incrementally
         batch_size = 100  # Save to Supabase every 100 extractions
         extraction_batch = []
+        extracted = {e["chunk_id"] for e in extractions}
+        to_extract = pending_episodes("extract", extracted)
         
-        for chunk in tqdm(all_chunks, desc="Extracting themes"):
+        for chunk in tqdm(stream_chunks(to_extract, extracted), total=count_chunks(to_extract, extracted), desc="Extracting themes"):
             extraction = extractor.extract_theme(
                 chunk_text=chunk.text,
                 chunk_id=chunk.chunk_id,
@@ -202,29 +347,26 @@ def build_knowledge_base(
                     print(f"  ⚠️  Error saving final batch to Supabase: {e}")
         
         # Also save to local file as backup
-        extraction_file = output_path / "theme_extractions.json"
         with open(extraction_file, "w") as f:
             json.dump(extractions, f, indent=2)
+        for episode_id in to_extract:
+            manifest.mark("extract", episode_id)
+        manifest.save()
         print(f"  Saved {len(extractions)} extractions (local backup)")
     
     # Step 4: Cluster themes
     print("\n[4/6] Clustering themes into intent ontology...")
-    clusterer = ThemeClusterer()
+    # Embeddings persist across builds; only new or changed texts are encoded
+    embedding_model = "all-MiniLM-L6-v2"
+    embedding_cache = EmbeddingCache(
+        str(output_path / "embedding_cache"),
+        embedding_model,
+        max_size_mb=embedding_cache_mb
+    )
+    clusterer = ThemeClusterer(embedding_model=embedding_model, embedding_cache=embedding_cache)
     themes = clusterer.cluster_themes(extractions, max_themes=60)
     print(f"  Created {len(themes)} themes")
     
-    # Assign chunks to themes
-    chunk_dicts = [
-        {
-            "chunk_id": chunk.chunk_id,
-            "text": chunk.text,
-            "guest_id": chunk.guest_id
-        }
-        for chunk in all_chunks
-    ]
-    chunk_theme_assignments = clusterer.assign_chunks_to_themes(chunk_dicts, themes)
-    print(f"  Assigned {len(chunk_theme_assignments)} chunks to themes")
-    
     # Save themes
     if use_supabase and supabase_store:
         supabase_store.save_themes(themes)
@@ -249,76 +391,130 @@ def build_knowledge_base(
     with open(centroids_file, "wb") as f:
         pickle.dump(centroids_dict, f)
     
-    # Step 5: Map guest-theme strengths
-    print("\n[5/6] Computing guest-theme strength mappings...")
-    mapper = GuestThemeMapper()
-    guest_strengths = mapper.compute_strengths(
-        themes=themes,
-        chunk_theme_assignments=chunk_theme_assignments,
-        chunk_metadata=chunk_metadata_dict
-    )
-    
-    # Save guest strengths
-    strengths_dict = mapper.get_guest_strength_dict(guest_strengths)
-    if use_supabase and supabase_store:
-        supabase_store.save_guest_theme_strengths(strengths_dict)
-    else:
-        strengths_file = output_path / "guest_theme_strengths.json"
-    with open(strengths_file, "w") as f:
-        json.dump(strengths_dict, f, indent=2)
-    print(f"  Mapped {len(guest_strengths)} guests to themes")
-    
-    # Step 6: Build vector store
-    print("\n[6/6] Building vector store (RAG)...")
+    # Step 5: Build vector store
+    print("\n[5/6] Building vector store (RAG)...")
+    vector_store_path = output_path / "vector_store"
+    if full_rebuild or not vector_store_path.exists():
+        manifest.reset_stage("embed")
     vector_store = VectorStore(
-        embedding_model="all-MiniLM-L6-v2",
-        index_path=str(output_path / "vector_store")
+        embedding_model=embedding_model,
+        index_path=None if full_rebuild else str(vector_store_path),
+        turn_store=turn_store,  # chunk texts are stored as spans into it
+        index_type=index_type,
+        embedding_cache=embedding_cache,
+        storage=index_storage,
+        partition_by=partition_by,
+        text_compression=text_compression
     )
+    vector_store.index_path = str(vector_store_path)
+    # Chunks of removed/changed episodes, and chunks that are now duplicates,
+    # leave the index as tombstones (compacted in the background)
+    removed = sum(vector_store.remove_episode(episode_id) for episode_id in diff.removed + diff.changed)
+    stale_chunk_ids = [chunk_id for chunk_id in vector_store.chunks if chunk_id not in kept]
+    removed += vector_store.remove_chunks(stale_chunk_ids)
+    if removed:
+        print(f"  Removed {removed} retracted/duplicate chunks from vector store")
+        if use_supabase and supabase_store:
+            supabase_store.delete_chunks([c for c in stale_chunk_ids if c not in retracted])
     
-    # Prepare chunks for vector store
-    chunks_for_store = []
-    for chunk in tqdm(all_chunks, desc="Adding to vector store"):
-        theme_id = chunk_theme_assignments.get(chunk.chunk_id)
+    # Stream new chunks into the store in batches; each chunk is embedded exactly once
+    store_batch_size = 100
+    store_batch = []
+    embedded = set(vector_store.chunks)
+    newly_embedded = []
+    to_embed = pending_episodes("embed", embedded)
+    for chunk in tqdm(stream_chunks(to_embed, embedded), total=count_chunks(to_embed, embedded), desc="Adding to vector store"):
         metadata = ChunkMetadata(
             chunk_id=chunk.chunk_id,
             guest_id=chunk.guest_id,
             episode_id=chunk.episode_id,
-            theme_id=theme_id,
+            theme_id=None,  # Assigned below from the stored embeddings
             speaker=chunk.speaker,
             timestamp=chunk.timestamp,
-            token_count=chunk.token_count
+            token_count=chunk.token_count,
+            speaker_role=speaker_role(chunk.speaker),
+            publish_date=turn_store.get_episode_metadata(chunk.episode_id).get("publish_date")
         )
-        
-        chunks_for_store.append({
+        store_batch.append({
             "chunk_id": chunk.chunk_id,
             "text": chunk.text,
-            "metadata": metadata
+            "metadata": metadata,
+            "span": (chunk.episode_id, chunk.start_offset, chunk.end_offset)
         })
+        newly_embedded.append(chunk.chunk_id)
+        if len(store_batch) >= store_batch_size:
+            vector_store.upsert_chunks(store_batch)
+            store_batch = []
+    if store_batch:
+        vector_store.upsert_chunks(store_batch)
+    for episode_id in to_embed:
+        manifest.mark("embed", episode_id)
+    
+    # Assign chunks to themes using the embeddings already in the index
+    chunk_theme_assignments = clusterer.assign_embeddings_to_themes(
+        vector_store.iter_embeddings,
+        themes
+    )
+    vector_store.set_theme_ids(chunk_theme_assignments)
+    print(f"  Assigned {len(chunk_theme_assignments)} chunks to themes")
+    
+    # Repartition (one sub-index per guest/episode) if requested differently than saved
+    if vector_store.partition_by != partition_by:
+        vector_store.set_partitioning(partition_by)
     
-    # Add in batches and save
-    batch_size = 100
-    all_embeddings = []
+    # Rebuild the ANN index if its type or storage changed, and measure its recall against exact search
+    if vector_store.index_type != index_type or vector_store.storage != index_storage:
+        report = vector_store.rebuild_index(index_type, storage=index_storage)
+    else:
+        report = vector_store.measure_recall()
+    if report:
+        print(f"  {index_type}/{index_storage} index: recall@{report['k']} = {report['recall_at_k']:.3f}, "
+              f"{report['latency_ms']:.2f} ms/query (flat: {report['flat_latency_ms']:.2f} ms)")
     
-    # Generate embeddings for all chunks
+    # Save vector store (kept locally so the next build can apply deltas to it),
+    # with its texts compressed as requested rather than as previously saved
+    vector_store.text_compression = text_compression
+    turn_store.path = str(turn_store_path)  # record where the turn store ends up
+    vector_store.save()
+    replace_directory(building_path, turn_store_path)
+    manifest.save()
+    embedding_cache.flush()
+    cache_stats = embedding_cache.get_stats()
+    print(f"  Embedding cache: {cache_stats['hits']} hits, {cache_stats['misses']} encoded, "
+          f"{cache_stats['entries']} entries ({cache_stats['size_mb']} MB)")
     if use_supabase and supabase_store:
-        print("  Generating embeddings for Supabase...")
-        all_texts = [chunk["text"] for chunk in chunks_for_store]
-        all_embeddings = vector_store.encoder.encode(all_texts, show_progress_bar=True)
+        # Save the embeddings of this build's new chunks to Supabase (retracted
+        # and duplicate chunks were deleted there above), one batch at a time
+        for chunk_ids, embeddings in vector_store.iter_embeddings(batch_size=1000, chunk_ids=newly_embedded):
+            records = [
+                {
+                    "chunk_id": chunk_id,
+                    "text": vector_store.chunks[chunk_id],
+                    "metadata": vector_store.metadata[chunk_id]
+                }
+                for chunk_id in chunk_ids
+            ]
+            supabase_store.save_chunk_embeddings(records, embeddings)
+    print(f"  Vector store saved with {vector_store.index.ntotal} chunks")
     
-    # Add to vector store (for local backup or if not using Supabase)
-    for i in tqdm(range(0, len(chunks_for_store), batch_size), desc="Adding to vector store"):
-        batch = chunks_for_store[i:i + batch_size]
-        vector_store.add_chunks_batch(batch)
+    # Step 6: Map guest-theme strengths
+    print("\n[6/6] Computing guest-theme strength mappings...")
+    mapper = GuestThemeMapper()
+    guest_strengths = mapper.compute_strengths(
+        themes=themes,
+        chunk_theme_assignments=chunk_theme_assignments,
+        chunk_metadata=chunk_metadata_dict
+    )
     
-    # Save vector store
+    # Save guest strengths
+    strengths_dict = mapper.get_guest_strength_dict(guest_strengths)
     if use_supabase and supabase_store:
-        # Save embeddings to Supabase
-        import numpy as np
-        embeddings_array = np.array(all_embeddings)
-        supabase_store.save_chunk_embeddings(chunks_for_store, embeddings_array)
+        supabase_store.save_guest_theme_strengths(strengths_dict)
     else:
-        vector_store.save()
-    print(f"  Vector store saved with {len(chunks_for_store)} chunks")
+        strengths_file = output_path / "guest_theme_strengths.json"
+    with open(strengths_file, "w") as f:
+        json.dump(strengths_dict, f, indent=2)
+    print(f"  Mapped {len(guest_strengths)} guests to themes")
     
     # Save chunk assignments
     if use_supabase and supabase_store:
@@ -353,11 +549,11 @@ def build_knowledge_base(
     print("\n" + "=" * 60)
     print("Knowledge Base Build Complete!")
     print("=" * 60)
-    print(f"  Episodes: {len(transcripts)}")
-    print(f"  Chunks: {len(all_chunks)}")
+    print(f"  Episodes: {num_episodes}")
+    print(f"  Chunks: {num_chunks}")
     print(f"  Themes: {len(themes)}")
     print(f"  Guests: {len(guest_strengths)}")
-    print(f"  Vector Store: {len(chunks_for_store)} chunks")
+    print(f"  Vector Store: {vector_store.index.ntotal} chunks")
     if use_supabase and supabase_store:
         try:
             panel_count = len(panels) if 'panels' in locals() else 0
@@ -376,6 +572,14 @@ if __name__ == "__main__":
     parser.add_argument("--skip-extraction", action="store_true", help="Skip theme extraction (use existing)")
     parser.add_argument("--use-supabase", action="store_true", default=True, help="Use Supabase for storage (default: True)")
     parser.add_argument("--no-supabase", dest="use_supabase", action="store_false", help="Use local file storage instead of Supabase")
+    parser.add_argument("--parse-workers", type=int, default=0, help="Processes for transcript parsing (0 = all cores)")
+    parser.add_argument("--parse-cache-dir", default=None, help="Parsed transcript cache (default: <output-dir>/transcript_cache)")
+    parser.add_argument("--full-rebuild", action="store_true", help="Ignore the corpus manifest and previous outputs; reprocess every episode")
+    parser.add_argument("--index-type", default="flat", choices=list(INDEX_DEFAULTS), help="ANN index type for the vector store")
+    parser.add_argument("--index-storage", default="float32", choices=list(INDEX_STORAGE), help="Vector code storage in the index (lossy types are re-ranked exactly)")
+    parser.add_argument("--partition-by", default=None, choices=list(PARTITION_FIELDS), help="Keep one sub-index per guest/episode (scoped searches touch one shard)")
+    parser.add_argument("--compress-texts", action="store_true", help="Save chunk texts zstd-compressed (held compressed in memory when served)")
+    parser.add_argument("--embedding-cache-mb", type=float, default=2048, help="Size limit of the persistent embedding cache")
     
     args = parser.parse_args()
     
@@ -383,6 +587,14 @@ if __name__ == "__main__":
         episodes_dir=args.episodes_dir,
         output_dir=args.output_dir,
         skip_extraction=args.skip_extraction,
-        use_supabase=args.use_supabase
+        use_supabase=args.use_supabase,
+        parse_workers=args.parse_workers,
+        parse_cache_dir=args.parse_cache_dir,
+        full_rebuild=args.full_rebuild,
+        index_type=args.index_type,
+        embedding_cache_mb=args.embedding_cache_mb,
+        index_storage=args.index_storage,
+        partition_by=args.partition_by,
+        text_compression="zstd" if args.compress_texts else None
     )
 
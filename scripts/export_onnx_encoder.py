@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""
+Export an embedding model to int8 ONNX for the "onnx" query encoder backend,
+then check it against the PyTorch SentenceTransformer:
+
+- parity: cosine between the two embeddings of each text, and how much
+  query -> passage cosine scores and top-k rankings move
+- latency: ms per text for single queries and for batches, both backends
+
+Texts are sampled from a saved vector store if one exists (queries are
+passage prefixes), otherwise a small built-in set is used. Exits non-zero
+if the minimum embedding cosine is below --min-cosine.
+
+Usage:
+    python scripts/export_onnx_encoder.py
+    QUERY_ENCODER_BACKEND=onnx uvicorn src.api.main:app
+"""
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+# Add src to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from src.knowledge.encoders import OnnxEncoder, export_onnx
+from src.knowledge.model_registry import DEFAULT_MODEL, get_encoder, onnx_model_dir
+
+
+SAMPLE_TEXTS = [
+    "How do you find product-market fit?",
+    "What should a first-time manager focus on in their first 90 days?",
+    "Pricing is the most underrated growth lever most startups have.",
+    "We hired our first PM when the founders could no longer hold the roadmap in their heads.",
+    "How do you run a good weekly business review?",
+    "Retention curves that flatten are the clearest signal you have something people want.",
+    "When is the right time to build a growth team?",
+    "The best onboarding gets users to the aha moment in their first session.",
+]
+
+
+def load_texts(index_path: str, count: int, seed: int):
+    if not Path(index_path).exists():
+        return SAMPLE_TEXTS
+    from src.knowledge.vector_store import VectorStore
+    store = VectorStore(index_path=index_path)
+    chunk_ids = [chunk_id for chunk_id in store.chunk_id_order if chunk_id in store.chunks]
+    rng = random.Random(seed)
+    return [store.chunks[chunk_id] for chunk_id in rng.sample(chunk_ids, min(count, len(chunk_ids)))]
+
+
+def parity(reference, candidate, texts, k: int = 10):
+    """Embedding cosines and query -> passage score/ranking drift between two encoders."""
+    queries = [" ".join(text.split()[:12]) for text in texts]
+    ref_passages = reference.encode(texts, normalize_embeddings=True)
+    cand_passages = candidate.encode(texts, normalize_embeddings=True)
+    ref_queries = reference.encode(queries, normalize_embeddings=True)
+    cand_queries = candidate.encode(queries, normalize_embeddings=True)
+
+    cosines = np.concatenate([
+        np.sum(ref_passages * cand_passages, axis=1),
+        np.sum(ref_queries * cand_queries, axis=1)
+    ])
+    # Candidate queries against reference passages: the deployed combination
+    ref_scores = ref_queries @ ref_passages.T
+    cand_scores = cand_queries @ ref_passages.T
+    k = min(k, len(texts))
+    ref_top = np.argsort(-ref_scores, axis=1)[:, :k]
+    cand_top = np.argsort(-cand_scores, axis=1)[:, :k]
+    overlap = np.mean([len(set(a) & set(b)) / k for a, b in zip(ref_top, cand_top)])
+    return {
+        "min_cosine": float(cosines.min()),
+        "mean_cosine": float(cosines.mean()),
+        "max_score_diff": float(np.abs(ref_scores - cand_scores).max()),
+        "mean_score_diff": float(np.abs(ref_scores - cand_scores).mean()),
+        f"top{k}_overlap": float(overlap)
+    }
+
+
+def latency_ms(encoder, texts, batch_size: int, repeats: int) -> float:
+    """Median ms per text over `repeats` passes."""
+    encoder.encode(texts[:batch_size])  # warm-up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        for i in range(0, len(texts), batch_size):
+            encoder.encode(texts[i:i + batch_size], batch_size=batch_size)
+        timings.append((time.perf_counter() - start) * 1000 / len(texts))
+    return float(np.median(timings))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export an int8 ONNX encoder and check parity/latency")
+    parser.add_argument("--model", default=DEFAULT_MODEL, help="Sentence transformer model")
+    parser.add_argument("--output-dir", default=None, help="Export directory (default: the registry's ONNX_MODEL_DIR/{model})")
+    parser.add_argument("--skip-export", action="store_true", help="Only check an existing export")
+    parser.add_argument("--no-quantize", action="store_true", help="Export float32 only")
+    parser.add_argument("--index-path", default="knowledge_base/vector_store", help="Vector store to sample texts from")
+    parser.add_argument("--texts", type=int, default=500, help="Sampled texts")
+    parser.add_argument("--seed", type=int, default=0, help="Sampling seed")
+    parser.add_argument("--repeats", type=int, default=3, help="Latency passes")
+    parser.add_argument("--threads", type=int, default=None, help="ONNX Runtime threads (default: all cores)")
+    parser.add_argument("--min-cosine", type=float, default=0.98, help="Fail below this embedding cosine")
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir) if args.output_dir else onnx_model_dir(args.model)
+    if not args.skip_export:
+        start = time.perf_counter()
+        config = export_onnx(args.model, output_dir, quantize=not args.no_quantize)
+        print(f"Exported {args.model} to {output_dir} in {time.perf_counter() - start:.1f}s: {config}")
+        for model_file in sorted(output_dir.glob("*.onnx")):
+            print(f"  {model_file.name}: {model_file.stat().st_size / (1024 * 1024):.1f} MB")
+
+    texts = load_texts(args.index_path, args.texts, args.seed)
+    reference = get_encoder(args.model, "torch")
+    candidates = {}
+    if (output_dir / "model.int8.onnx").exists():
+        candidates["onnx_int8"] = OnnxEncoder(output_dir, num_threads=args.threads)
+    candidates["onnx_fp32"] = OnnxEncoder(output_dir, num_threads=args.threads, quantized=False)
+
+    print(f"\nParity on {len(texts)} texts (vs torch)")
+    reports = {}
+    for name, encoder in candidates.items():
+        reports[name] = parity(reference, encoder, texts)
+        print(f"  {name:<10} " + "  ".join(f"{key}={value:.4f}" for key, value in reports[name].items()))
+
+    print(f"\n{'backend':<10} {'ms/query (1)':>13} {'ms/text (32)':>13}")
+    for name, encoder in [("torch", reference), *candidates.items()]:
+        single = latency_ms(encoder, texts[:100], 1, args.repeats)
+        batched = latency_ms(encoder, texts, 32, args.repeats)
+        print(f"{name:<10} {single:>13.2f} {batched:>13.2f}")
+
+    deployed = next(iter(candidates))
+    if reports[deployed]["min_cosine"] < args.min_cosine:
+        print(f"\nFAIL: {deployed} min cosine {reports[deployed]['min_cosine']:.4f} < {args.min_cosine}")
+        sys.exit(1)
+    print(f"\nOK: set QUERY_ENCODER_BACKEND=onnx (ONNX_MODEL_DIR={output_dir.parent}) to serve queries with it")
+
+
+if __name__ == "__main__":
+    main()
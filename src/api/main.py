@@ -4,6 +4,8 @@ Provides endpoints for group chat and split chat interactions.
 """
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Header
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
 from pydantic import BaseModel
 from typing import List, Optional, Dict
 import json
@@ -17,6 +19,8 @@ from src.runtime.intelligence import RuntimeIntelligence
 from src.runtime.rag_engine import RAGEngine
 from src.runtime.lenny_moderator import LennyModerator
 from src.knowledge.vector_store import VectorStore
+from src.knowledge import model_registry
+from src.knowledge.model_registry import warm_up
 from src.knowledge.theme_clusterer import Theme
 import numpy as np
 import pickle
@@ -53,19 +57,41 @@ for theme_data in themes_data:
 with open(KNOWLEDGE_BASE_DIR / "guest_theme_strengths.json", "r") as f:
     guest_theme_strengths = json_lib.load(f)
 
-# Load vector store
-vector_store = VectorStore(index_path=str(KNOWLEDGE_BASE_DIR / "vector_store"))
+# Query encoder backend: "torch" or "onnx" (int8 export from
+# scripts/export_onnx_encoder.py, for CPU-only deployments)
+QUERY_ENCODER_BACKEND = os.getenv("QUERY_ENCODER_BACKEND", "torch")
+
+# Load vector store. VECTOR_THREADING_POLICY (opt-in) sets FAISS/BLAS threading:
+# "inter_query" keeps each search single-threaded so the threadpool's concurrent
+# searches don't oversubscribe the cores, "intra_query" gives every search all
+# cores; unset leaves the library defaults alone
+vector_store = VectorStore(
+    index_path=str(KNOWLEDGE_BASE_DIR / "vector_store"),
+    threading_policy=os.getenv("VECTOR_THREADING_POLICY"),
+    query_backend=QUERY_ENCODER_BACKEND
+)
 
 # Initialize runtime components
 runtime_intelligence = RuntimeIntelligence(
     themes=themes,
     guest_theme_strengths=guest_theme_strengths,
-    vector_store=vector_store
+    vector_store=vector_store,
+    encoder_backend=QUERY_ENCODER_BACKEND
 )
 
-rag_engine = RAGEngine(vector_store=vector_store, provider="gemini")
+# RETRIEVAL_MODE=hybrid fuses BM25 with embedding search, so names and frameworks
+# match literally (opt-in: fused chunk scores are rank-based, not similarities)
+rag_engine = RAGEngine(
+    vector_store=vector_store,
+    provider="gemini",
+    retrieval_mode=os.getenv("RETRIEVAL_MODE", "vector")
+)
 lenny_moderator = LennyModerator(provider="gemini")
 
+# One shared embedding model for the store and theme matching; load it and run
+# a first encode now rather than on the first request
+warm_up([vector_store.embedding_model_name], backend=QUERY_ENCODER_BACKEND)
+
 # FastAPI app
 app = FastAPI(title="Lenny and Friends API")
 
@@ -132,14 +158,77 @@ async def health_check():
     """Health check endpoint for frontend status monitoring."""
     # Check if knowledge base is loaded
     kb_ready = KNOWLEDGE_BASE_DIR.exists() and (KNOWLEDGE_BASE_DIR / "themes.json").exists()
+    # Maintained incrementally, so cheap on every poll (off the event loop in case a write holds the store)
+    stats = await run_in_threadpool(vector_store.get_stats)
     
     return {
         "status": "ok" if kb_ready else "building",
         "knowledge_base_ready": kb_ready,
-        "message": "Knowledge base ready" if kb_ready else "Knowledge base is still being built"
+        "message": "Knowledge base ready" if kb_ready else "Knowledge base is still being built",
+        "vector_store": {
+            "chunks": stats["total_chunks"],
+            "tombstones": stats["tombstones"],
+            "guests": stats["unique_guests"],
+            "themes": stats["unique_themes"],
+            "episodes": stats["unique_episodes"],
+            "index_type": stats["index"]["type"],
+            "index_built": stats["index"]["built"],
+            "shards": stats["index"]["shards"]
+        }
     }
 
 
+def prometheus_metrics(stats: Dict) -> str:
+    """Render VectorStore.get_stats() in the Prometheus text exposition format."""
+    index = stats["index"]
+    labels = f'index_type="{index["type"]}",storage="{index["storage"]}"'
+    gauges = [
+        ("vector_store_chunks", "Live chunks in the vector store", [("", stats["total_chunks"])]),
+        ("vector_store_tombstones", "Removed chunks awaiting compaction", [("", stats["tombstones"])]),
+        ("vector_store_guests", "Guests with at least one chunk", [("", stats["unique_guests"])]),
+        ("vector_store_themes", "Themes with at least one chunk", [("", stats["unique_themes"])]),
+        ("vector_store_episodes", "Episodes with at least one chunk", [("", stats["unique_episodes"])]),
+        ("vector_store_index_vectors", "Vectors in the ANN index", [(labels, index["ntotal"])]),
+        ("vector_store_index_built", "Whether the ANN index is built and trained", [(labels, int(index["built"]))]),
+        ("vector_store_vector_bytes", "Raw vector bytes (including memory-mapped)", [("", stats["memory"]["vector_bytes"])]),
+        ("vector_store_vector_mapped_bytes", "Raw vector bytes memory-mapped from disk", [("", stats["memory"]["vector_bytes_mapped"])]),
+        ("vector_store_index_code_bytes", "Estimated ANN index code bytes", [(labels, stats["memory"]["index_code_bytes"])]),
+    ]
+    if index["shard_sizes"] is not None:
+        gauges.append((
+            "vector_store_shard_vectors",
+            f"Vectors per {index['partition_by']} shard",
+            [(f'shard="{key}"', size) for key, size in sorted(index["shard_sizes"].items())]
+        ))
+    if index["recall"]:
+        gauges.append(("vector_store_recall_at_k", "Last measured ANN recall@k", [(labels, index["recall"]["recall_at_k"])]))
+    if stats["lexical"]:
+        gauges.append(("vector_store_lexical_terms", "Terms in the BM25 index", [("", stats["lexical"]["terms"])]))
+        gauges.append(("vector_store_lexical_postings", "Postings in the BM25 index", [("", stats["lexical"]["postings"])]))
+    if stats["text_store"]:
+        text_store = stats["text_store"]
+        gauges.append(("vector_store_text_raw_bytes", "Uncompressed bytes of the saved chunk texts", [("", text_store["raw_bytes"])]))
+        gauges.append(("vector_store_text_compressed_bytes", "Compressed chunk text bytes held in memory", [("", text_store["compressed_bytes"])]))
+        gauges.append(("vector_store_text_cache_hits", "Chunk text reads served by the decompressed LRU", [("", text_store["cache_hits"])]))
+        gauges.append(("vector_store_text_cache_misses", "Chunk text reads that decompressed a block", [("", text_store["cache_misses"])]))
+    gauges.append(("embedding_models_loaded", "Embedding models loaded in this process", [("", len(model_registry.get_stats()["loaded"]))]))
+
+    lines = []
+    for name, help_text, samples in gauges:
+        lines.append(f"# HELP {name} {help_text}")
+        lines.append(f"# TYPE {name} gauge")
+        for sample_labels, value in samples:
+            lines.append(f"{name}{{{sample_labels}}} {value}" if sample_labels else f"{name} {value}")
+    return "\n".join(lines) + "\n"
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus scrape endpoint."""
+    stats = await run_in_threadpool(vector_store.get_stats)
+    return prometheus_metrics(stats)
+
+
 @app.post("/query", response_model=QueryResponse)
 async def handle_query(request: QueryRequest):
     """
@@ -189,7 +278,8 @@ async def handle_query(request: QueryRequest):
     contextual_query = f"{context_prefix}{query}" if context_prefix else query
     
     # Step 1: Match themes (use contextual query for better matching)
-    active_themes = runtime_intelligence.match_themes(contextual_query, top_n=5)
+    # Encoding, search and LLM calls block, so run them off the event loop
+    active_themes = await run_in_threadpool(runtime_intelligence.match_themes, contextual_query, top_n=5)
     
     # Step 2: Check ambiguity
     is_ambiguous, reason = runtime_intelligence.check_ambiguity(active_themes)
@@ -207,7 +297,8 @@ async def handle_query(request: QueryRequest):
             if context_parts:
                 user_context_str = ", ".join(context_parts)
         
-        questions = lenny_moderator.generate_clarification_questions(
+        questions = await run_in_threadpool(
+            lenny_moderator.generate_clarification_questions,
             user_query=request.query,
             active_themes=active_themes,
             ambiguity_reason=reason,
@@ -236,7 +327,8 @@ async def handle_query(request: QueryRequest):
     ]
     
     theme_ids = [t.theme_id for t in active_themes]
-    responses = rag_engine.generate_batch_responses(
+    responses = await run_in_threadpool(
+        rag_engine.generate_batch_responses,
         query=contextual_query,  # Use contextual query for better responses
         guest_configs=guest_configs,
         theme_ids=theme_ids
@@ -308,7 +400,8 @@ async def handle_split_chat(request: SplitChatRequest):
     guest_name = request.guest_id.replace("-", " ").title()
     
     # Generate response (no theme filtering in split chat, just guest filtering)
-    response = rag_engine.generate_guest_response(
+    response = await run_in_threadpool(
+        rag_engine.generate_guest_response,
         query=context_query,
         guest_id=request.guest_id,
         guest_name=guest_name,
@@ -0,0 +1,219 @@
+"""
+BM25 - In-process lexical index over chunk text.
+
+Queries that name a framework, company or person ("RICE", "Airbnb", "Jobs to
+be done") are matched poorly by embedding similarity alone. The vector store
+keeps this inverted index next to its FAISS index, keyed by the same stable
+vector ids, and fuses both rankings (see VectorStore.hybrid_search).
+
+Postings are kept in CSR form: the postings of term t are
+doc_ids[offsets[t]:offsets[t + 1]] with their term frequencies in freqs.
+Added and removed documents are buffered and merged into the arrays on the
+next search, so bulk upserts do not rebuild the postings per batch.
+
+Layout ({path}/{prefix}...):
+    offsets.npy, doc_ids.npy, freqs.npy   postings (CSR by term id)
+    ids.npy, lengths.npy                  indexed doc ids (ascending) and token counts
+    terms.bin, terms.offsets.npy          term id -> term (see columnar.write_blob)
+    bm25.json                             k1, b
+"""
+import json
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from .columnar import Blob, atomic_write, load_array, save_array, write_blob
+
+
+TOKEN_PATTERN = re.compile(r"\w+")
+STOPWORDS = frozenset("""
+    a about all also an and any are as at be been but by can could did do does for from
+    had has have he her him his how i if in into is it its just me my no not of on or our
+    out she so than that the their them then there these they this those to too up us was
+    we were what when where which who why will with would you your
+""".split())
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased word tokens without stopwords."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """Okapi BM25 over documents identified by int64 ids (ascending as added)."""
+
+    def __init__(self, k1: float = 1.2, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._terms: Sequence[str] = []  # term id -> term (a Blob when opened)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._doc_ids = np.zeros(0, dtype=np.int64)
+        self._freqs = np.zeros(0, dtype=np.int32)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._lengths = np.zeros(0, dtype=np.int32)
+        self._pending: List[Tuple[int, Counter]] = []
+        self._removed: Set[int] = set()
+        # (vocabulary, offsets, doc_ids, per-posting BM25 term weights, doc count),
+        # rebuilt on the first search after a change
+        self._ready: Optional[Tuple] = None
+        self._lock = threading.Lock()
+
+    def add(self, ids: Sequence[int], texts: Sequence[str]):
+        """Index texts under ids (greater than every id added before)."""
+        for doc_id, text in zip(ids, texts):
+            self._pending.append((int(doc_id), Counter(tokenize(text))))
+        self._ready = None
+
+    def remove(self, ids: Sequence[int]):
+        """Drop documents (unknown ids are ignored)."""
+        self._removed.update(int(doc_id) for doc_id in ids)
+        self._ready = None
+
+    def _merge(self):
+        """Fold buffered additions and removals into the postings arrays."""
+        if not self._pending and not self._removed:
+            return
+        terms = list(self._terms)
+        vocabulary = {term: term_id for term_id, term in enumerate(terms)}
+        term_ids = [np.repeat(np.arange(len(terms), dtype=np.int64), np.diff(self._offsets))]
+        doc_ids = [self._doc_ids]
+        freqs = [self._freqs]
+
+        new_terms: List[int] = []
+        new_docs: List[int] = []
+        new_freqs: List[int] = []
+        for doc_id, counts in self._pending:
+            for term, freq in counts.items():
+                term_id = vocabulary.get(term)
+                if term_id is None:
+                    term_id = vocabulary[term] = len(terms)
+                    terms.append(term)
+                new_terms.append(term_id)
+                new_docs.append(doc_id)
+                new_freqs.append(freq)
+        term_ids = np.concatenate(term_ids + [np.array(new_terms, dtype=np.int64)])
+        doc_ids = np.concatenate(doc_ids + [np.array(new_docs, dtype=np.int64)])
+        freqs = np.concatenate(freqs + [np.array(new_freqs, dtype=np.int32)])
+        ids = np.concatenate([self._ids, np.array([doc_id for doc_id, _ in self._pending], dtype=np.int64)])
+        lengths = np.concatenate([
+            self._lengths,
+            np.array([sum(counts.values()) for _, counts in self._pending], dtype=np.int32)
+        ])
+
+        if self._removed:
+            removed = np.fromiter(self._removed, dtype=np.int64)
+            keep = ~np.isin(doc_ids, removed)
+            term_ids, doc_ids, freqs = term_ids[keep], doc_ids[keep], freqs[keep]
+            keep = ~np.isin(ids, removed)
+            ids, lengths = ids[keep], lengths[keep]
+
+        # Stable sort: each term's postings stay in ascending doc id order
+        order = np.argsort(term_ids, kind="stable")
+        offsets = np.zeros(len(terms) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(term_ids, minlength=len(terms)), out=offsets[1:])
+        self._terms = terms
+        self._offsets = offsets
+        self._doc_ids = doc_ids[order]
+        self._freqs = freqs[order]
+        self._ids = ids
+        self._lengths = lengths
+        self._pending = []
+        self._removed = set()
+
+    def _prepare(self) -> Tuple:
+        self._merge()
+        vocabulary = {self._terms[term_id]: term_id for term_id in range(len(self._terms))}
+        lengths = np.asarray(self._lengths, dtype=np.float32)
+        average_length = float(lengths.mean()) if len(lengths) else 1.0
+        doc_lengths = lengths[np.searchsorted(self._ids, self._doc_ids)]
+        freqs = np.asarray(self._freqs, dtype=np.float32)
+        norm = self.k1 * (1 - self.b + self.b * doc_lengths / max(average_length, 1e-9))
+        weights = freqs * (self.k1 + 1) / (freqs + norm)
+        return vocabulary, np.asarray(self._offsets), np.asarray(self._doc_ids), weights, len(self._ids)
+
+    def scores(self, query: str) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        BM25 score of every document containing a query term.
+
+        Safe to call from several threads at once (but not concurrently with
+        add/remove).
+
+        Returns:
+            (doc ids ascending, scores)
+        """
+        ready = self._ready
+        if ready is None:
+            with self._lock:
+                if self._ready is None:
+                    self._ready = self._prepare()
+                ready = self._ready
+        vocabulary, offsets, doc_ids, weights, num_docs = ready
+
+        matched_ids = []
+        matched_scores = []
+        for term in dict.fromkeys(tokenize(query)):
+            term_id = vocabulary.get(term)
+            if term_id is None:
+                continue
+            start, end = offsets[term_id], offsets[term_id + 1]
+            df = end - start
+            if not df:
+                continue
+            idf = np.log(1 + (num_docs - df + 0.5) / (df + 0.5))
+            matched_ids.append(doc_ids[start:end])
+            matched_scores.append(weights[start:end] * idf)
+        if not matched_ids:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        unique_ids, inverse = np.unique(np.concatenate(matched_ids), return_inverse=True)
+        return unique_ids, np.bincount(inverse, weights=np.concatenate(matched_scores)).astype(np.float32)
+
+    def __len__(self) -> int:
+        return len(self._ids) + len(self._pending) - len(self._removed)
+
+    def get_stats(self) -> Dict:
+        return {
+            "documents": len(self),
+            "terms": len(self._terms),
+            "postings": len(self._doc_ids),
+            "pending": len(self._pending) + len(self._removed)
+        }
+
+    def write(self, path: str, prefix: str = "bm25_"):
+        """Merge buffered changes and write the postings (see module docstring)."""
+        path = Path(path)
+        with self._lock:
+            self._merge()
+            save_array(path / f"{prefix}offsets.npy", np.asarray(self._offsets))
+            save_array(path / f"{prefix}doc_ids.npy", np.asarray(self._doc_ids))
+            save_array(path / f"{prefix}freqs.npy", np.asarray(self._freqs))
+            save_array(path / f"{prefix}ids.npy", np.asarray(self._ids))
+            save_array(path / f"{prefix}lengths.npy", np.asarray(self._lengths))
+            write_blob(path / f"{prefix}terms", (self._terms[term_id] for term_id in range(len(self._terms))))
+
+        def write_spec(tmp_path: str):
+            with open(tmp_path, "w") as f:
+                json.dump({"k1": self.k1, "b": self.b}, f)
+        atomic_write(path / f"{prefix}bm25.json", write_spec)
+
+    @classmethod
+    def open(cls, path: str, prefix: str = "bm25_") -> "BM25Index":
+        """Memory-map postings written by write()."""
+        path = Path(path)
+        with open(path / f"{prefix}bm25.json", "r") as f:
+            spec = json.load(f)
+        index = cls(k1=spec["k1"], b=spec["b"])
+        index._terms = Blob(path / f"{prefix}terms")
+        index._offsets = load_array(path / f"{prefix}offsets.npy")
+        index._doc_ids = load_array(path / f"{prefix}doc_ids.npy")
+        index._freqs = load_array(path / f"{prefix}freqs.npy")
+        index._ids = load_array(path / f"{prefix}ids.npy")
+        index._lengths = load_array(path / f"{prefix}lengths.npy")
+        return index
+
+    @staticmethod
+    def exists(path: str, prefix: str = "bm25_") -> bool:
+        return (Path(path) / f"{prefix}bm25.json").exists()
@@ -2,12 +2,22 @@
 Intelligent Chunking - Chunks by idea/speaker turn, not just token count.
 This is critical for semantic self-containment.
 """
-import tiktoken
-from typing import List, Dict, Optional
+import re
+from itertools import islice
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple
 from dataclasses import dataclass
+from .tokenization import get_tokenizer
 from .transcript_parser import Transcript, SpeakerTurn
 
 
+# A run of non-terminators followed by sentence-ending punctuation (or the end of text)
+_SENTENCE_RE = re.compile(r'[^.!?]*(?:[.!?]+|$)')
+
+
+def _utf8_len(text: str) -> int:
+    return len(text) if text.isascii() else len(text.encode("utf-8"))
+
+
 @dataclass
 class Chunk:
     """A semantically self-contained chunk of transcript."""
@@ -20,6 +30,9 @@ class Chunk:
     token_count: int
     turn_indices: List[int]  # Which speaker turns are in this chunk
     metadata: Dict
+    # UTF-8 byte span of the text within its episode in the TurnStore buffer
+    start_offset: int = 0
+    end_offset: int = 0
 
 
 class IntelligentChunker:
@@ -44,7 +57,8 @@ class IntelligentChunker:
         self.overlap = overlap_tokens
         self.min_tokens = min_chunk_tokens
         self.max_tokens = max_chunk_tokens
-        self.encoding = tiktoken.get_encoding("cl100k_base")
+        self.tokenizer = get_tokenizer("cl100k_base")
+        self.encoding = self.tokenizer.encoding
     
     def chunk_transcript(self, transcript: Transcript) -> List[Chunk]:
         """
@@ -55,6 +69,9 @@ class IntelligentChunker:
         2. If a single turn exceeds target, split it intelligently
         3. Ensure overlap between chunks
         4. Never break mid-sentence
+        
+        Every turn is encoded exactly once; chunk token counts are derived from
+        prefix sums over the per-turn counts.
         """
         chunks = []
         turns = transcript.turns
@@ -63,47 +80,53 @@ class IntelligentChunker:
         # Normalize guest name to guest_id (slug format)
         guest_id = self._normalize_guest_id(guest_name)
         
+        # token_prefix[j] = tokens in turns[:j]
+        turn_tokens = self._count_tokens([turn.text for turn in turns])
+        token_prefix = [0]
+        for count in turn_tokens:
+            token_prefix.append(token_prefix[-1] + count)
+        
+        # byte_prefix[j] = episode byte offset of turns[j] (turns are joined by one space)
+        byte_prefix = [0]
+        for turn in turns:
+            byte_prefix.append(byte_prefix[-1] + _utf8_len(turn.text) + 1)
+        
         i = 0
         chunk_idx = 0
         
         while i < len(turns):
             # Start a new chunk
-            chunk_turns = []
-            chunk_tokens = 0
             start_idx = i
             
             # Strategy 1: Try to get a complete speaker argument (consecutive turns by same speaker)
             current_speaker = turns[i].speaker
             while i < len(turns) and turns[i].speaker == current_speaker:
-                turn = turns[i]
-                turn_tokens = len(self.encoding.encode(turn.text))
+                chunk_tokens = token_prefix[i] - token_prefix[start_idx]
                 
                 # If adding this turn would exceed max, stop
-                if chunk_tokens + turn_tokens > self.max_tokens and chunk_tokens > 0:
+                if chunk_tokens + turn_tokens[i] > self.max_tokens and chunk_tokens > 0:
                     break
                 
-                chunk_turns.append(turn)
-                chunk_tokens += turn_tokens
                 i += 1
+                chunk_tokens = token_prefix[i] - token_prefix[start_idx]
                 
                 # If we've reached target size, consider stopping
                 if chunk_tokens >= self.target_size:
                     # But continue if next turn is same speaker and small
                     if i < len(turns) and turns[i].speaker == current_speaker:
-                        next_turn_tokens = len(self.encoding.encode(turns[i].text))
-                        if chunk_tokens + next_turn_tokens <= self.max_tokens:
+                        if chunk_tokens + turn_tokens[i] <= self.max_tokens:
                             continue
                     break
             
             # Strategy 2: If chunk is too small, try to add more turns
+            chunk_tokens = token_prefix[i] - token_prefix[start_idx]
             if chunk_tokens < self.min_tokens and i < len(turns):
                 # Add next speaker's turn if it's small enough
-                next_turn = turns[i]
-                next_tokens = len(self.encoding.encode(next_turn.text))
-                if chunk_tokens + next_tokens <= self.max_tokens:
-                    chunk_turns.append(next_turn)
-                    chunk_tokens += next_tokens
+                if chunk_tokens + turn_tokens[i] <= self.max_tokens:
                     i += 1
+                    chunk_tokens = token_prefix[i] - token_prefix[start_idx]
+            
+            chunk_turns = turns[start_idx:i]
             
             # Strategy 3: If a single turn is too large, split it
             if len(chunk_turns) == 1 and chunk_tokens > self.max_tokens:
@@ -112,7 +135,8 @@ class IntelligentChunker:
                     chunk_turns[0],
                     guest_id,
                     transcript.episode_id,
-                    chunk_idx
+                    chunk_idx,
+                    byte_prefix[start_idx]
                 )
                 chunks.extend(split_chunks)
                 chunk_idx += len(split_chunks)
@@ -125,8 +149,11 @@ class IntelligentChunker:
                     guest_id,
                     transcript.episode_id,
                     chunk_idx,
-                    transcript.metadata
+                    transcript.metadata,
+                    chunk_tokens
                 )
+                chunk.start_offset = byte_prefix[start_idx]
+                chunk.end_offset = byte_prefix[i] - 1
                 chunks.append(chunk)
                 chunk_idx += 1
             
@@ -141,73 +168,96 @@ class IntelligentChunker:
         
         return chunks
     
+    def iter_chunks(
+        self,
+        transcripts: Iterable[Transcript],
+        prefetch_episodes: int = 16
+    ) -> Iterator[Chunk]:
+        """
+        Stream chunks for a sequence of transcripts.
+        
+        Pairs with TranscriptParser.iter_episodes() so parse -> chunk -> embed
+        only ever holds a small window of episodes in memory. The turns of
+        each window are token-counted in one multi-threaded batch up front.
+        """
+        transcripts = iter(transcripts)
+        while True:
+            window = list(islice(transcripts, prefetch_episodes))
+            if not window:
+                return
+            self.tokenizer.count_batch([turn.text for t in window for turn in t.turns])
+            for transcript in window:
+                yield from self.chunk_transcript(transcript)
+    
+    def _count_tokens(self, texts: List[str]) -> List[int]:
+        """Token count of each text (batched and cached by the shared tokenizer)."""
+        return self.tokenizer.count_batch(texts)
+    
     def _split_large_turn(
         self,
         turn: SpeakerTurn,
         guest_id: str,
         episode_id: str,
-        start_chunk_idx: int
+        start_chunk_idx: int,
+        turn_offset: int = 0
     ) -> List[Chunk]:
-        """Split a single large turn into multiple chunks."""
-        chunks = []
-        sentences = self._split_into_sentences(turn.text)
+        """
+        Split a single large turn into multiple chunks.
         
-        current_chunk_sentences = []
-        current_tokens = 0
-        chunk_idx = start_chunk_idx
+        Sentences are encoded once; chunk sizes and overlaps come from prefix
+        sums over the per-sentence counts, so the split is linear in the
+        number of sentences. Each chunk's text is a slice of the turn text.
         
-        for sentence in sentences:
-            sentence_tokens = len(self.encoding.encode(sentence))
-            
-            if current_tokens + sentence_tokens > self.max_tokens and current_tokens > 0:
-                # Create chunk from accumulated sentences
-                chunk_text = " ".join(current_chunk_sentences)
-                chunk = Chunk(
-                    chunk_id=f"{episode_id}_c_{chunk_idx:05d}",
-                    guest_id=guest_id,
-                    episode_id=episode_id,
-                    text=chunk_text,
-                    speaker=turn.speaker,
-                    timestamp=turn.timestamp,
-                    token_count=current_tokens,
-                    turn_indices=[turn.turn_index],
-                    metadata={
-                        "is_split": True,
-                        "split_index": chunk_idx - start_chunk_idx
-                    }
-                )
-                chunks.append(chunk)
-                chunk_idx += 1
-                
-                # Start new chunk with overlap
-                overlap_sentences = self._get_overlap_sentences(
-                    current_chunk_sentences,
-                    self.overlap
-                )
-                current_chunk_sentences = overlap_sentences
-                current_tokens = len(self.encoding.encode(" ".join(overlap_sentences)))
-            
-            current_chunk_sentences.append(sentence)
-            current_tokens += sentence_tokens
+        Args:
+            turn_offset: Episode byte offset of the turn, for chunk spans
+        """
+        chunks = []
+        text = turn.text
+        spans = self._sentence_spans(text)
+        sentence_tokens = self._count_tokens([text[a:b] for a, b in spans])
+        # token_prefix[j] = tokens in sentences[:j]
+        token_prefix = [0]
+        for count in sentence_tokens:
+            token_prefix.append(token_prefix[-1] + count)
+        ascii_only = text.isascii()
         
-        # Add final chunk
-        if current_chunk_sentences:
-            chunk_text = " ".join(current_chunk_sentences)
-            chunk = Chunk(
+        def byte_offset(char_offset: int) -> int:
+            if ascii_only:
+                return turn_offset + char_offset
+            return turn_offset + _utf8_len(text[:char_offset])
+        
+        def add_chunk(start: int, end: int):
+            chunk_idx = start_chunk_idx + len(chunks)
+            char_start, char_end = spans[start][0], spans[end - 1][1]
+            chunks.append(Chunk(
                 chunk_id=f"{episode_id}_c_{chunk_idx:05d}",
                 guest_id=guest_id,
                 episode_id=episode_id,
-                text=chunk_text,
+                text=text[char_start:char_end],
                 speaker=turn.speaker,
                 timestamp=turn.timestamp,
-                token_count=current_tokens,
+                token_count=token_prefix[end] - token_prefix[start],
                 turn_indices=[turn.turn_index],
                 metadata={
                     "is_split": True,
-                    "split_index": chunk_idx - start_chunk_idx
-                }
-            )
-            chunks.append(chunk)
+                    "split_index": len(chunks)
+                },
+                start_offset=byte_offset(char_start),
+                end_offset=byte_offset(char_end)
+            ))
+        
+        # The current chunk is sentences[start:j]
+        start = 0
+        for j, tokens in enumerate(sentence_tokens):
+            current_tokens = token_prefix[j] - token_prefix[start]
+            if current_tokens + tokens > self.max_tokens and current_tokens > 0:
+                add_chunk(start, j)
+                # Start new chunk with overlap
+                start = self._overlap_start(sentence_tokens, start, j, self.overlap)
+        
+        # Add final chunk
+        if spans:
+            add_chunk(start, len(spans))
         
         return chunks
     
@@ -217,11 +267,16 @@ class IntelligentChunker:
         guest_id: str,
         episode_id: str,
         chunk_idx: int,
-        metadata
+        metadata,
+        token_count: int
     ) -> Chunk:
-        """Create a Chunk object from speaker turns."""
+        """
+        Create a Chunk object from speaker turns.
+        
+        `token_count` is the sum of the turns' memoized counts, so the joined
+        text is not re-encoded.
+        """
         chunk_text = " ".join(turn.text for turn in turns)
-        token_count = len(self.encoding.encode(chunk_text))
         turn_indices = [turn.turn_index for turn in turns]
         
         # Use first turn's speaker and timestamp
@@ -257,42 +312,44 @@ class IntelligentChunker:
         
         return " ".join(overlap_words)
     
-    def _get_overlap_sentences(
+    def _overlap_start(
         self,
-        sentences: List[str],
+        sentence_tokens: List[int],
+        start: int,
+        end: int,
         overlap_tokens: int
-    ) -> List[str]:
-        """Get overlap sentences from the end."""
-        if not sentences:
-            return []
-        
-        overlap_text = ""
-        overlap_sentences = []
-        
-        # Add sentences from the end until we reach overlap_tokens
-        for sentence in reversed(sentences):
-            sentence_tokens = len(self.encoding.encode(sentence))
-            if len(self.encoding.encode(overlap_text)) + sentence_tokens <= overlap_tokens:
-                overlap_sentences.insert(0, sentence)
-                overlap_text = sentence + " " + overlap_text
-            else:
-                break
+    ) -> int:
+        """
+        Index of the first sentence of the overlap carried over from sentences[start:end].
         
-        return overlap_sentences
+        Walks back from the end while the overlap stays within overlap_tokens,
+        so it only ever visits the overlap sentences plus one.
+        """
+        total = 0
+        k = end
+        while k > start and total + sentence_tokens[k - 1] <= overlap_tokens:
+            k -= 1
+            total += sentence_tokens[k]
+        return k
     
-    def _split_into_sentences(self, text: str) -> List[str]:
-        """Split text into sentences (simple approach)."""
-        import re
-        # Split on sentence endings, keeping the punctuation
-        sentences = re.split(r'([.!?]+)', text)
-        # Recombine sentences with their punctuation
-        result = []
-        for i in range(0, len(sentences) - 1, 2):
-            if i + 1 < len(sentences):
-                result.append(sentences[i] + sentences[i + 1])
-            else:
-                result.append(sentences[i])
-        return [s.strip() for s in result if s.strip()]
+    def _sentence_spans(self, text: str) -> List[Tuple[int, int]]:
+        """
+        (start, end) character spans of the sentences in text (simple approach).
+        
+        A sentence runs up to and including its closing punctuation; spans
+        exclude surrounding whitespace, and a trailing fragment without
+        closing punctuation is kept as the last sentence.
+        """
+        spans = []
+        for match in _SENTENCE_RE.finditer(text):
+            start, end = match.span()
+            while start < end and text[start].isspace():
+                start += 1
+            while end > start and text[end - 1].isspace():
+                end -= 1
+            if start < end:
+                spans.append((start, end))
+        return spans
     
     def _normalize_guest_id(self, guest_name: str) -> str:
         """Convert guest name to slug format (guest_id)."""
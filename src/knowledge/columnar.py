@@ -0,0 +1,318 @@
+"""
+Columnar Storage - Memory-mappable on-disk columns for the vector store.
+
+Strings are stored as one UTF-8 blob plus an int64 offsets array, and
+categorical fields as int32 codes into a vocabulary, so a saved store opens
+with a handful of mmaps instead of parsing JSON or unpickling one object per
+chunk. Rows are decoded only when they are accessed.
+"""
+import json
+import os
+from collections.abc import MutableMapping
+from dataclasses import fields as dataclass_fields
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+
+def atomic_write(path: Path, write: Callable[[str], None]):
+    """
+    Write a file through a temporary sibling and rename it into place.
+
+    Files of a loaded store may be memory-mapped; replacing them (instead of
+    truncating and rewriting) keeps existing mappings valid.
+    """
+    path = Path(path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    write(str(tmp_path))
+    os.replace(tmp_path, path)
+
+
+def save_array(path: Path, array: np.ndarray):
+    """np.save without the implicit ".npy" suffix on the temporary file."""
+    def write(tmp_path: str):
+        with open(tmp_path, "wb") as f:
+            np.save(f, array)
+    atomic_write(path, write)
+
+
+def load_array(path: Path) -> np.ndarray:
+    """Memory-map a saved array read-only."""
+    return np.load(path, mmap_mode="r")
+
+
+def write_blob(path: Path, strings: Iterable[str]):
+    """
+    Write strings as {path}.bin (UTF-8 blob) and {path}.offsets.npy.
+
+    String i is blob[offsets[i]:offsets[i + 1]].
+    """
+    path = Path(path)
+    offsets = [0]
+
+    def write(tmp_path: str):
+        with open(tmp_path, "wb") as f:
+            for text in strings:
+                data = text.encode("utf-8")
+                f.write(data)
+                offsets.append(offsets[-1] + len(data))
+    atomic_write(path.with_name(path.name + ".bin"), write)
+    save_array(path.with_name(path.name + ".offsets.npy"), np.array(offsets, dtype=np.int64))
+
+
+class Blob:
+    """Read side of write_blob: strings decoded on access from a memory-mapped blob."""
+
+    def __init__(self, path: Path):
+        path = Path(path)
+        self.offsets = load_array(path.with_name(path.name + ".offsets.npy"))
+        blob_file = path.with_name(path.name + ".bin")
+        if os.path.getsize(blob_file):
+            self.data = np.memmap(blob_file, dtype=np.uint8, mode="r")
+        else:
+            self.data = np.zeros(0, dtype=np.uint8)  # zero-length files cannot be mapped
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row: int) -> str:
+        return self.data[self.offsets[row]:self.offsets[row + 1]].tobytes().decode("utf-8")
+
+
+class RecordView:
+    """
+    Live view of one row of a CategoricalTable, read and written through
+    attributes like the record it stands for.
+
+    Views hold no values of their own, so handing one out per search result
+    costs one small object; to_record() materializes a real record.
+    """
+
+    __slots__ = ("_table", "_row", "_key")
+
+    def __init__(self, table: "CategoricalTable", row: int, key: str):
+        object.__setattr__(self, "_table", table)
+        object.__setattr__(self, "_row", row)
+        object.__setattr__(self, "_key", key)
+
+    def __getattr__(self, name: str):
+        if name == self._table.key_field:
+            return self._key
+        return self._table.value(self._row, name)
+
+    def __setattr__(self, name: str, value):
+        self._table.set_value(self._row, name, value)
+
+    def to_record(self):
+        return self._table.record_type(**{
+            self._table.key_field: self._key,
+            **{name: self._table.value(self._row, name) for name in self._table.names}
+        })
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, RecordView):
+            other = other.to_record()
+        return self.to_record() == other
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return repr(self.to_record())
+
+    def __reduce__(self):
+        # Pickles (and copies) as the plain record
+        record = self.to_record()
+        return (type(record), tuple(getattr(record, f.name) for f in dataclass_fields(record)))
+
+
+class CategoricalTable(MutableMapping):
+    """
+    key -> record mapping stored as one integer column per field.
+
+    String fields hold int32 codes into a per-field vocabulary (-1 = None),
+    integer fields their values (-1 = None). Memory and load time grow with
+    the number of distinct values, not with one Python object per record;
+    rows are read and written through RecordView. Columns opened from disk
+    stay memory-mapped until the first write copies them into memory.
+
+    Layout ({path}/{prefix}...):
+        {prefix}{field}.npy   int32 codes (int64 values for integer fields)
+        {prefix}columns.json  field names, integer fields and vocabularies
+    """
+
+    def __init__(
+        self,
+        record_type: type,
+        key_field: str,
+        integer_fields: Sequence[str] = (),
+        rows: Optional[Dict[str, int]] = None,
+        columns: Optional[Dict[str, np.ndarray]] = None,
+        vocabularies: Optional[Dict[str, List]] = None
+    ):
+        """
+        Args:
+            record_type: Dataclass the rows stand for
+            key_field: Field holding the key (not stored as a column)
+            integer_fields: Fields stored as raw integers
+            rows: key -> row (only for tables opened from disk)
+            columns: field -> saved column (only for tables opened from disk)
+            vocabularies: field -> values of the codes (only for tables opened from disk)
+        """
+        self.record_type = record_type
+        self.key_field = key_field
+        self.names = [f.name for f in dataclass_fields(record_type) if f.name != key_field]
+        self._integer_fields = set(integer_fields)
+        self._rows: Dict[str, int] = rows if rows is not None else {}
+        if columns is None:
+            columns = {name: np.zeros(0, dtype=self._dtype(name)) for name in self.names}
+        self._columns = columns
+        self._size = len(next(iter(columns.values()))) if columns else 0
+        self._vocabularies = vocabularies or {name: [] for name in self.names if name not in self._integer_fields}
+        self._codes: Dict[str, Dict] = {}  # field -> value -> code, built on first write
+        self._writable = False
+
+    def _dtype(self, name: str):
+        return np.int64 if name in self._integer_fields else np.int32
+
+    def _code(self, name: str, value) -> int:
+        if value is None:
+            return -1
+        if name in self._integer_fields:
+            return int(value)
+        codes = self._codes.get(name)
+        if codes is None:
+            codes = self._codes[name] = {v: code for code, v in enumerate(self._vocabularies[name])}
+        code = codes.get(value)
+        if code is None:
+            code = codes[value] = len(self._vocabularies[name])
+            self._vocabularies[name].append(value)
+        return code
+
+    def _reserve(self, rows: int):
+        """Make the columns writable in memory with room for `rows` rows."""
+        capacity = len(next(iter(self._columns.values()))) if self._columns else 0
+        if self._writable and capacity >= rows:
+            return
+        capacity = max(rows, 2 * capacity, 1024) if capacity < rows else capacity
+        for name, column in self._columns.items():
+            grown = np.full(capacity, -1, dtype=self._dtype(name))
+            grown[:self._size] = column[:self._size]
+            self._columns[name] = grown
+        self._writable = True
+
+    def value(self, row: int, name: str):
+        column = self._columns.get(name)
+        if column is None:
+            raise AttributeError(name)
+        code = int(column[row])
+        if code < 0:
+            return None
+        return code if name in self._integer_fields else self._vocabularies[name][code]
+
+    def set_value(self, row: int, name: str, value):
+        if name not in self._columns:
+            raise AttributeError(name)
+        self._reserve(self._size)
+        self._columns[name][row] = self._code(name, value)
+
+    def column(self, name: str, keys: Sequence[str]) -> np.ndarray:
+        """Values of one field for `keys` (object array; None for None or missing keys)."""
+        rows = np.array([-1 if key is None else self._rows.get(key, -1) for key in keys], dtype=np.int64)
+        found = rows >= 0
+        values = np.full(len(keys), None, dtype=object)
+        codes = np.asarray(self._columns[name])[rows[found]]
+        if name in self._integer_fields:
+            values[found] = [None if code < 0 else int(code) for code in codes.tolist()]
+        else:
+            # Code -1 (None) picks the trailing None
+            vocabulary = np.array(list(self._vocabularies[name]) + [None], dtype=object)
+            values[found] = vocabulary[codes]
+        return values
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes of the code columns (memory-mapped or in memory)."""
+        return sum(column.nbytes for column in self._columns.values())
+
+    def __getitem__(self, key: str) -> RecordView:
+        return RecordView(self, self._rows[key], key)
+
+    def __setitem__(self, key: str, record):
+        values = [getattr(record, name) for name in self.names]  # record may be a view of this table
+        row = self._rows.get(key)
+        if row is None:
+            self._reserve(self._size + 1)
+            row = self._rows[key] = self._size
+            self._size += 1
+        else:
+            self._reserve(self._size)
+        for name, value in zip(self.names, values):
+            self._columns[name][row] = self._code(name, value)
+
+    def __delitem__(self, key: str):
+        # The row stays unused until the next write()
+        del self._rows[key]
+
+    def __contains__(self, key) -> bool:
+        return key in self._rows
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._rows)
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    @classmethod
+    def from_records(
+        cls,
+        record_type: type,
+        key_field: str,
+        records: Dict[str, object],
+        integer_fields: Sequence[str] = ()
+    ) -> "CategoricalTable":
+        table = cls(record_type, key_field, integer_fields)
+        table._reserve(len(records))
+        for key, record in records.items():
+            table[key] = record
+        return table
+
+    def write(self, path: str, keys: Sequence[str], prefix: str = ""):
+        """Write the rows of `keys` (in that order) as columns, keeping only used vocabulary."""
+        path = Path(path)
+        rows = np.array([self._rows[key] for key in keys], dtype=np.int64)
+        vocabularies = {}
+        for name in self.names:
+            codes = np.asarray(self._columns[name])[rows]
+            if name not in self._integer_fields:
+                used = np.unique(codes[codes >= 0])
+                remap = np.full(len(self._vocabularies[name]) + 1, -1, dtype=np.int32)
+                remap[used] = np.arange(len(used), dtype=np.int32)
+                codes = remap[codes]  # -1 maps through the trailing -1
+                vocabularies[name] = [self._vocabularies[name][code] for code in used.tolist()]
+            save_array(path / f"{prefix}{name}.npy", codes.astype(self._dtype(name)))
+
+        def write_spec(tmp_path: str):
+            with open(tmp_path, "w") as f:
+                json.dump({
+                    "fields": self.names,
+                    "integer_fields": [name for name in self.names if name in self._integer_fields],
+                    "vocabularies": vocabularies
+                }, f)
+        atomic_write(path / f"{prefix}columns.json", write_spec)
+
+    @classmethod
+    def open(
+        cls,
+        path: str,
+        record_type: type,
+        key_field: str,
+        rows: Dict[str, int],
+        prefix: str = ""
+    ) -> "CategoricalTable":
+        """Memory-map columns written by write()."""
+        path = Path(path)
+        with open(path / f"{prefix}columns.json", "r") as f:
+            spec = json.load(f)
+        columns = {name: load_array(path / f"{prefix}{name}.npy") for name in spec["fields"]}
+        return cls(record_type, key_field, spec["integer_fields"], rows, columns, spec["vocabularies"])
@@ -0,0 +1,138 @@
+"""
+Concurrency - Reader-writer locking and the FAISS/BLAS threading policy.
+
+Searches only read the vector store and may run concurrently (FAISS and
+the encoder release the GIL while they compute), while upserts, removals
+and compaction swaps need exclusive access. How the CPU cores are shared
+is a separate choice:
+
+    intra_query   one search at a time, each using every core (OpenMP
+                  inside FAISS, BLAS/torch threads inside the encoder);
+                  lowest latency for a single caller
+    inter_query   single-threaded FAISS/BLAS/torch and up to one search
+                  per core in parallel; highest throughput under a
+                  concurrent server such as uvicorn
+
+Without a policy every search spawns OpenMP threads for all cores, so
+concurrent requests oversubscribe the CPU.
+"""
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import faiss
+
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+try:
+    from threadpoolctl import threadpool_limits
+    THREADPOOLCTL_AVAILABLE = True
+except ImportError:
+    THREADPOOLCTL_AVAILABLE = False
+
+
+THREADING_POLICIES = ("intra_query", "inter_query")
+
+_applied: Optional[Dict] = None
+
+
+class ReadWriteLock:
+    """
+    Many concurrent readers or one writer, writers preferred.
+
+    The writing thread may re-enter write() and read(); readers must not
+    upgrade to write().
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer: Optional[int] = None
+        self._write_depth = 0
+        self._waiting_writers = 0
+
+    @contextmanager
+    def read(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer == me:
+                # Reads inside our own write section need no extra locking
+                nested = True
+            else:
+                nested = False
+                while self._writer is not None or self._waiting_writers:
+                    self._condition.wait()
+                self._readers += 1
+        try:
+            yield
+        finally:
+            if not nested:
+                with self._condition:
+                    self._readers -= 1
+                    if not self._readers:
+                        self._condition.notify_all()
+
+    @contextmanager
+    def write(self):
+        me = threading.get_ident()
+        with self._condition:
+            if self._writer != me:
+                self._waiting_writers += 1
+                while self._writer is not None or self._readers:
+                    self._condition.wait()
+                self._waiting_writers -= 1
+                self._writer = me
+            self._write_depth += 1
+        try:
+            yield
+        finally:
+            with self._condition:
+                self._write_depth -= 1
+                if not self._write_depth:
+                    self._writer = None
+                    self._condition.notify_all()
+
+
+def apply_threading_policy(policy: str, num_threads: Optional[int] = None) -> Dict:
+    """
+    Set FAISS OpenMP, BLAS and torch thread counts for a policy.
+
+    The settings are process-wide. BLAS limits need threadpoolctl and
+    torch limits need torch; either is skipped if not installed.
+
+    Args:
+        policy: One of THREADING_POLICIES
+        num_threads: Cores to use (default: all)
+
+    Returns:
+        Dict with the applied per-search thread count and the number of
+        searches that may run concurrently
+    """
+    if policy not in THREADING_POLICIES:
+        raise ValueError(f"Unknown threading policy: {policy} (expected one of {list(THREADING_POLICIES)})")
+    cores = num_threads or os.cpu_count() or 1
+    per_search = cores if policy == "intra_query" else 1
+
+    global _applied
+    faiss.omp_set_num_threads(per_search)
+    if THREADPOOLCTL_AVAILABLE:
+        threadpool_limits(limits=per_search, user_api="blas")
+    if TORCH_AVAILABLE:
+        torch.set_num_threads(per_search)
+
+    _applied = {
+        "policy": policy,
+        "threads_per_search": per_search,
+        "concurrent_searches": 1 if policy == "intra_query" else cores
+    }
+    return dict(_applied)
+
+
+def threads_per_search() -> Optional[int]:
+    """Per-search thread count of the last applied policy (None if none was applied)."""
+    return _applied["threads_per_search"] if _applied else None
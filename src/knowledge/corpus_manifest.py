@@ -0,0 +1,164 @@
+"""
+Corpus Manifest - Tracks which episodes changed so build stages only redo deltas.
+
+For every episode slug the manifest records the content hash of its
+transcript, the chunk ids derived from it, and which content hash each build
+stage (chunk, extract, embed, ...) last completed for. A stage only needs to
+process an episode whose current hash differs from the one it recorded.
+"""
+import json
+import os
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from .transcript_cache import TranscriptCache
+
+
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class EpisodeEntry:
+    """Manifest record for one episode."""
+    content_hash: str
+    chunk_ids: List[str] = field(default_factory=list)
+    stages: Dict[str, str] = field(default_factory=dict)  # stage -> content_hash it completed for
+
+
+@dataclass
+class ManifestDiff:
+    """Episodes added, changed, removed or unchanged since the last build."""
+    added: List[str]
+    changed: List[str]
+    removed: List[str]
+    unchanged: List[str]
+
+    @property
+    def has_changes(self) -> bool:
+        return bool(self.added or self.changed or self.removed)
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.added)} added, {len(self.changed)} changed, "
+            f"{len(self.removed)} removed, {len(self.unchanged)} unchanged"
+        )
+
+
+class CorpusManifest:
+    """
+    Persistent slug -> content hash -> derived chunk ids mapping.
+
+    Typical use:
+        manifest = CorpusManifest("knowledge_base/manifest.json")
+        diff = manifest.refresh(parser.get_all_episodes())
+        retracted = manifest.retract_removed(diff)
+        ...
+        if manifest.needs("extract", slug): ...
+        manifest.mark("extract", slug)
+        manifest.save()
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self.episodes: Dict[str, EpisodeEntry] = {}
+        # Hashes of the corpus as currently on disk (set by refresh)
+        self.current_hashes: Dict[str, str] = {}
+
+        if self.path.exists():
+            with open(self.path, "r") as f:
+                data = json.load(f)
+            if data.get("version") == MANIFEST_VERSION:
+                self.episodes = {
+                    slug: EpisodeEntry(**entry)
+                    for slug, entry in data.get("episodes", {}).items()
+                }
+
+    def refresh(self, episode_paths: Iterable[Path]) -> ManifestDiff:
+        """
+        Hash the transcripts currently on disk and diff them against the manifest.
+
+        Args:
+            episode_paths: Paths to {slug}/transcript.md files
+
+        Returns:
+            ManifestDiff describing the delta since the last saved build
+        """
+        self.current_hashes = {
+            path.parent.name: TranscriptCache.content_hash(path.read_bytes())
+            for path in episode_paths
+        }
+
+        added, changed, unchanged = [], [], []
+        for slug, content_hash in self.current_hashes.items():
+            entry = self.episodes.get(slug)
+            if entry is None:
+                added.append(slug)
+            elif entry.content_hash != content_hash:
+                changed.append(slug)
+            else:
+                unchanged.append(slug)
+        removed = [slug for slug in self.episodes if slug not in self.current_hashes]
+
+        return ManifestDiff(
+            added=sorted(added),
+            changed=sorted(changed),
+            removed=sorted(removed),
+            unchanged=sorted(unchanged)
+        )
+
+    def retract_removed(self, diff: ManifestDiff) -> List[str]:
+        """
+        Drop removed episodes and return the chunk ids they and changed episodes owned.
+
+        Changed episodes keep their entry (with the new hash) but lose their
+        chunk ids and stage marks, so every stage reprocesses them.
+        """
+        retracted: List[str] = []
+        for slug in diff.removed:
+            retracted.extend(self.episodes.pop(slug).chunk_ids)
+        for slug in diff.changed:
+            entry = self.episodes[slug]
+            retracted.extend(entry.chunk_ids)
+            self.episodes[slug] = EpisodeEntry(content_hash=self.current_hashes[slug])
+        for slug in diff.added:
+            self.episodes[slug] = EpisodeEntry(content_hash=self.current_hashes[slug])
+        return retracted
+
+    def needs(self, stage: str, slug: str) -> bool:
+        """Whether `stage` still has to process `slug` for its current content."""
+        entry = self.episodes.get(slug)
+        if entry is None:
+            return True
+        return entry.stages.get(stage) != entry.content_hash
+
+    def mark(self, stage: str, slug: str):
+        """Record that `stage` has processed the current content of `slug`."""
+        entry = self.episodes[slug]
+        entry.stages[stage] = entry.content_hash
+
+    def reset_stage(self, stage: str):
+        """Force `stage` to reprocess every episode."""
+        for entry in self.episodes.values():
+            entry.stages.pop(stage, None)
+
+    def set_chunk_ids(self, slug: str, chunk_ids: List[str]):
+        self.episodes[slug].chunk_ids = list(chunk_ids)
+
+    def chunk_ids(self, slug: Optional[str] = None) -> List[str]:
+        """Chunk ids for one episode, or for the whole corpus."""
+        if slug is not None:
+            entry = self.episodes.get(slug)
+            return list(entry.chunk_ids) if entry else []
+        return [chunk_id for entry in self.episodes.values() for chunk_id in entry.chunk_ids]
+
+    def save(self):
+        """Write the manifest atomically."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump({
+                "version": MANIFEST_VERSION,
+                "episodes": {slug: asdict(entry) for slug, entry in sorted(self.episodes.items())}
+            }, f, indent=2)
+        os.replace(tmp_path, self.path)
@@ -0,0 +1,286 @@
+"""
+Near-Duplicate Detection - MinHash signatures + LSH banding.
+
+Finds re-published episodes (e.g. `andy-raskin` / `andy-raskin_`) and
+near-identical chunks so they are extracted, embedded and indexed once.
+Signatures are persisted per episode and per chunk, so delta builds only
+hash new chunks; detection itself is a cheap pass over all signatures.
+"""
+import json
+import os
+import re
+import zlib
+from collections import defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+
+_WORD_RE = re.compile(r"\w+")
+# Polynomial base for rolling word hashes into shingle hashes (mod 2^64)
+_SHINGLE_BASE = np.uint64(1000003)
+
+
+class MinHasher:
+    """MinHash signatures over word shingles."""
+
+    def __init__(self, num_perm: int = 128, shingle_size: int = 5, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.RandomState(seed)
+        # Multiply-shift hashing: h -> (a * h + b) >> 32 with odd 64-bit a,
+        # computed with uint64 wraparound (no modulo in the hot loop)
+        self._a = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64) * np.uint64(2) + np.uint64(1)
+        self._b = rng.randint(0, 1 << 63, size=num_perm, dtype=np.uint64)
+
+    def shingle_hashes(self, text: str) -> np.ndarray:
+        """Distinct 64-bit hashes of the word k-shingles (lowercased, punctuation dropped)."""
+        words = _WORD_RE.findall(text.lower())
+        word_hashes = np.fromiter(
+            (zlib.crc32(word.encode("utf-8")) for word in words),
+            dtype=np.uint64,
+            count=len(words)
+        )
+        k = min(self.shingle_size, max(len(words), 1))
+        n = len(words) - k + 1
+        hashes = np.zeros(max(n, 1), dtype=np.uint64)
+        with np.errstate(over="ignore"):
+            for j in range(min(k, len(words))):
+                hashes = hashes * _SHINGLE_BASE + word_hashes[j:j + n]
+        return np.unique(hashes)
+
+    def signature(self, text: str) -> np.ndarray:
+        """uint32[num_perm] MinHash signature of a text."""
+        hashes = self.shingle_hashes(text)
+        with np.errstate(over="ignore"):
+            permuted = (self._a[:, None] * hashes[None, :] + self._b[:, None]) >> np.uint64(32)
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+def jaccard_estimate(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Fraction of matching MinHash slots (unbiased Jaccard estimate)."""
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+class LSHIndex:
+    """
+    Banded LSH over MinHash signatures.
+
+    With b bands of r rows, items with Jaccard s collide in at least one band
+    with probability 1 - (1 - s^r)^b; candidates are verified against the
+    full signature afterwards.
+    """
+
+    def __init__(self, num_perm: int = 128, bands: int = 16):
+        if num_perm % bands:
+            raise ValueError(f"num_perm ({num_perm}) must be divisible by bands ({bands})")
+        self.bands = bands
+        self.rows = num_perm // bands
+        self._buckets: List[Dict[bytes, List[str]]] = [defaultdict(list) for _ in range(bands)]
+        self._signatures: Dict[str, np.ndarray] = {}
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [
+            signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            for band in range(self.bands)
+        ]
+
+    def insert(self, key: str, signature: np.ndarray):
+        self._signatures[key] = signature
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self._buckets[band][band_key].append(key)
+
+    def query(self, signature: np.ndarray, threshold: float) -> Optional[Tuple[str, float]]:
+        """Most similar inserted key with estimated Jaccard >= threshold, if any."""
+        candidates = set()
+        for band, band_key in enumerate(self._band_keys(signature)):
+            candidates.update(self._buckets[band].get(band_key, ()))
+
+        best = None
+        for key in candidates:
+            similarity = jaccard_estimate(signature, self._signatures[key])
+            if similarity >= threshold and (best is None or similarity > best[1]):
+                best = (key, similarity)
+        return best
+
+
+@dataclass
+class DedupResult:
+    """Near-duplicate links found in the corpus."""
+    # duplicate episode_id -> canonical episode_id
+    episode_links: Dict[str, str] = field(default_factory=dict)
+    # duplicate chunk_id -> canonical chunk_id (None: part of a duplicate
+    # episode with no matching chunk in the canonical episode)
+    chunk_links: Dict[str, Optional[str]] = field(default_factory=dict)
+
+    def is_duplicate(self, chunk_id: str) -> bool:
+        return chunk_id in self.chunk_links
+
+    def summary(self) -> str:
+        return (
+            f"{len(self.episode_links)} duplicate episodes, "
+            f"{len(self.chunk_links)} duplicate chunks"
+        )
+
+    def save(self, path: str):
+        with open(path, "w") as f:
+            json.dump({
+                "episode_links": self.episode_links,
+                "chunk_links": self.chunk_links
+            }, f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "DedupResult":
+        with open(path, "r") as f:
+            data = json.load(f)
+        return cls(episode_links=data["episode_links"], chunk_links=data["chunk_links"])
+
+
+class CorpusDeduplicator:
+    """
+    Persistent MinHash signatures for every episode and chunk, plus detection.
+
+    Canonical items are the first in (episode_id, chunk order), so a
+    re-published episode such as `andy-raskin_` links to `andy-raskin`.
+
+    Layout:
+        {path}/signatures.npz   episode and chunk ids, owning episodes, signatures
+        {path}/params.json      MinHash parameters the signatures were built with
+    """
+
+    def __init__(
+        self,
+        path: str,
+        num_perm: int = 128,
+        bands: int = 16,
+        shingle_size: int = 5,
+        episode_threshold: float = 0.9,
+        chunk_threshold: float = 0.8
+    ):
+        """
+        Args:
+            path: Directory for persisted signatures
+            num_perm: MinHash permutations per signature
+            bands: LSH bands (num_perm must be divisible by it)
+            shingle_size: Words per shingle
+            episode_threshold: Jaccard above which two episodes are duplicates
+            chunk_threshold: Jaccard above which two chunks are duplicates
+        """
+        self.path = Path(path)
+        self.params = {"num_perm": num_perm, "shingle_size": shingle_size}
+        self.bands = bands
+        self.episode_threshold = episode_threshold
+        self.chunk_threshold = chunk_threshold
+        self.hasher = MinHasher(num_perm=num_perm, shingle_size=shingle_size)
+
+        self.episode_signatures: Dict[str, np.ndarray] = {}
+        self.chunk_signatures: Dict[str, np.ndarray] = {}
+        self.chunk_episodes: Dict[str, str] = {}
+        self.loaded = self._load()
+
+    def _load(self) -> bool:
+        """Load persisted signatures; False if missing or built with other parameters."""
+        params_file = self.path / "params.json"
+        signatures_file = self.path / "signatures.npz"
+        if not params_file.exists() or not signatures_file.exists():
+            return False
+        with open(params_file, "r") as f:
+            if json.load(f) != self.params:
+                return False
+
+        data = np.load(signatures_file)
+        self.episode_signatures = dict(zip(data["episode_ids"].tolist(), data["episode_signatures"]))
+        self.chunk_signatures = dict(zip(data["chunk_ids"].tolist(), data["chunk_signatures"]))
+        self.chunk_episodes = dict(zip(data["chunk_ids"].tolist(), data["chunk_episode_ids"].tolist()))
+        return True
+
+    def add_episode(self, episode_id: str, text: str):
+        self.episode_signatures[episode_id] = self.hasher.signature(text)
+
+    def add_chunk(self, chunk_id: str, episode_id: str, text: str):
+        self.chunk_signatures[chunk_id] = self.hasher.signature(text)
+        self.chunk_episodes[chunk_id] = episode_id
+
+    def remove(self, episode_ids: Iterable[str] = (), chunk_ids: Iterable[str] = ()):
+        """Forget signatures of removed/changed episodes and retracted chunks."""
+        for episode_id in episode_ids:
+            self.episode_signatures.pop(episode_id, None)
+        for chunk_id in chunk_ids:
+            self.chunk_signatures.pop(chunk_id, None)
+            self.chunk_episodes.pop(chunk_id, None)
+
+    def clear(self):
+        self.episode_signatures.clear()
+        self.chunk_signatures.clear()
+        self.chunk_episodes.clear()
+
+    def detect(self) -> DedupResult:
+        """Link every near-duplicate episode and chunk to its canonical one."""
+        result = DedupResult()
+        num_perm = self.params["num_perm"]
+
+        episode_index = LSHIndex(num_perm, self.bands)
+        for episode_id in sorted(self.episode_signatures):
+            signature = self.episode_signatures[episode_id]
+            match = episode_index.query(signature, self.episode_threshold)
+            if match:
+                result.episode_links[episode_id] = match[0]
+            else:
+                episode_index.insert(episode_id, signature)
+
+        chunk_index = LSHIndex(num_perm, self.bands)
+        ordered = sorted(self.chunk_signatures, key=lambda c: (self.chunk_episodes[c], c))
+        for chunk_id in ordered:
+            signature = self.chunk_signatures[chunk_id]
+            match = chunk_index.query(signature, self.chunk_threshold)
+            if match:
+                result.chunk_links[chunk_id] = match[0]
+            elif self.chunk_episodes[chunk_id] in result.episode_links:
+                # The whole episode is a re-publish: drop its leftovers too
+                result.chunk_links[chunk_id] = None
+            else:
+                chunk_index.insert(chunk_id, signature)
+        return result
+
+    def save(self):
+        """Write signatures atomically."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        num_perm = self.params["num_perm"]
+        episode_ids = list(self.episode_signatures)
+        chunk_ids = list(self.chunk_signatures)
+
+        def stack(signatures):
+            return np.stack(signatures) if signatures else np.zeros((0, num_perm), dtype=np.uint32)
+
+        tmp_file = self.path / "signatures.tmp.npz"
+        np.savez(
+            tmp_file,
+            episode_ids=np.array(episode_ids, dtype=str),
+            episode_signatures=stack([self.episode_signatures[e] for e in episode_ids]),
+            chunk_ids=np.array(chunk_ids, dtype=str),
+            chunk_episode_ids=np.array([self.chunk_episodes[c] for c in chunk_ids], dtype=str),
+            chunk_signatures=stack([self.chunk_signatures[c] for c in chunk_ids])
+        )
+        os.replace(tmp_file, self.path / "signatures.npz")
+        with open(self.path / "params.json", "w") as f:
+            json.dump(self.params, f)
+
+
+if __name__ == "__main__":
+    import sys
+    from .turn_store import TurnStore
+
+    # Report near-duplicate episodes in a built turn store
+    # (from the repo root: python -m src.knowledge.dedup [turn_store_dir])
+    store = TurnStore.open(sys.argv[1] if len(sys.argv) > 1 else "knowledge_base/turn_store")
+    dedup = CorpusDeduplicator("/tmp/dedup")
+    dedup.clear()
+    for episode_id in store.episode_ids:
+        dedup.add_episode(episode_id, store.episode_text(episode_id))
+    result = dedup.detect()
+    print(result.summary())
+    for duplicate, canonical in result.episode_links.items():
+        similarity = jaccard_estimate(dedup.episode_signatures[duplicate], dedup.episode_signatures[canonical])
+        print(f"  {duplicate} -> {canonical} (jaccard ~{similarity:.2f})")
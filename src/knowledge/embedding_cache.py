@@ -0,0 +1,273 @@
+"""
+Embedding Cache - Persistent sentence embeddings keyed by model and text hash.
+
+Rebuilds re-embed the same chunk texts, descriptors and theses every run.
+The cache keeps every embedding it has seen in a memory-mapped vector file,
+one directory per model, addressed by a 128-bit BLAKE2b hash of the text, so
+only new or changed texts reach the encoder. Once the configured size is
+reached the least recently used entries are evicted and their slots reused.
+
+Layout ({path}/{model}/):
+    vectors.f32   float32[capacity, dimension]
+    keys.bin      uint8[capacity, 16]  text hash per slot (all zero = free)
+    ticks.i64     int64[capacity]      last-use tick per slot (for LRU eviction)
+    meta.json     model name, dimension, capacity
+
+The hash index (text hash -> slot) is rebuilt from keys.bin when the cache
+is opened. A slot's key is written after its vector, so an interrupted run
+never leaves a key pointing at a half-written vector.
+"""
+import hashlib
+import json
+import re
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+
+KEY_BYTES = 16
+# Fraction of entries dropped when the cache is full
+EVICT_FRACTION = 0.1
+
+
+def text_hash(text: str) -> bytes:
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=KEY_BYTES).digest()
+
+
+class EmbeddingCache:
+    """Disk-backed, size-bounded embedding cache for one embedding model."""
+
+    def __init__(
+        self,
+        path: str,
+        model_name: str,
+        dimension: Optional[int] = None,
+        max_size_mb: float = 2048,
+        initial_capacity: int = 4096
+    ):
+        """
+        Args:
+            path: Cache root directory (shared by all models)
+            model_name: Embedding model the vectors come from
+            dimension: Embedding dimension (taken from the first stored
+                vectors if None and the cache is new)
+            max_size_mb: Upper bound for the vector file; LRU entries are
+                evicted beyond it
+            initial_capacity: Slots allocated for a new cache (grows by doubling)
+        """
+        self.model_name = model_name
+        self.path = Path(path) / re.sub(r"[^\w.-]+", "_", model_name)
+        self.max_size_mb = max_size_mb
+        self.initial_capacity = initial_capacity
+        self.dimension = dimension
+        self.capacity = 0
+
+        self._slots: Dict[bytes, int] = {}
+        self._free: List[int] = []
+        self._tick = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._vectors: Optional[np.memmap] = None
+        self._keys: Optional[np.memmap] = None
+        self._ticks: Optional[np.memmap] = None
+        self._open()
+
+    def _open(self):
+        meta_file = self.path / "meta.json"
+        if not meta_file.exists():
+            return
+        with open(meta_file, "r") as f:
+            meta = json.load(f)
+        if self.dimension is not None and meta["dimension"] != self.dimension:
+            raise ValueError(
+                f"Embedding cache {self.path} has dimension {meta['dimension']}, expected {self.dimension}"
+            )
+        self.dimension = meta["dimension"]
+        self._map(meta["capacity"])
+
+        used = np.flatnonzero(self._keys.any(axis=1))
+        self._slots = {bytes(self._keys[slot]): int(slot) for slot in used}
+        self._free = sorted(set(range(self.capacity)) - set(used.tolist()), reverse=True)
+        self._tick = int(self._ticks.max()) + 1 if self.capacity else 0
+
+    def _map(self, capacity: int):
+        """(Re)open the memory-mapped files with `capacity` slots, growing them if needed."""
+        self.path.mkdir(parents=True, exist_ok=True)
+        files = [
+            ("vectors.f32", np.float32, (capacity, self.dimension)),
+            ("keys.bin", np.uint8, (capacity, KEY_BYTES)),
+            ("ticks.i64", np.int64, (capacity,))
+        ]
+        arrays = []
+        for name, dtype, shape in files:
+            file = self.path / name
+            size = int(np.prod(shape)) * np.dtype(dtype).itemsize
+            with open(file, "ab") as f:
+                if f.tell() < size:
+                    f.truncate(size)  # new space reads as zeros (free slots)
+            arrays.append(np.memmap(file, dtype=dtype, mode="r+", shape=shape))
+        self._vectors, self._keys, self._ticks = arrays
+
+        self.capacity = capacity
+        with open(self.path / "meta.json", "w") as f:
+            json.dump({"model": self.model_name, "dimension": self.dimension, "capacity": capacity}, f)
+
+    @property
+    def max_entries(self) -> int:
+        """Number of embeddings that fit in max_size_mb."""
+        if not self.dimension:
+            return 0
+        return max(1, int(self.max_size_mb * 1024 * 1024) // (self.dimension * 4))
+
+    def _grow(self, needed: int):
+        """Make at least `needed` free slots available (growing, then evicting)."""
+        if len(self._free) >= needed:
+            return
+        if self.capacity < self.max_entries:
+            target = max(self.initial_capacity, self.capacity)
+            while target - len(self._slots) < needed and target < self.max_entries:
+                target *= 2
+            target = min(target, self.max_entries)
+            old_capacity = self.capacity
+            self._map(target)
+            self._free = list(range(target - 1, old_capacity - 1, -1)) + self._free
+        if len(self._free) < needed:
+            self._evict(needed - len(self._free))
+
+    def _evict(self, needed: int):
+        """Free the least recently used slots (at least `needed`, usually EVICT_FRACTION)."""
+        count = min(len(self._slots), max(needed, int(self.max_entries * EVICT_FRACTION)))
+        used = np.array(sorted(self._slots.values()), dtype=np.int64)
+        oldest = used[np.argpartition(self._ticks[used], count - 1)[:count]] if count < len(used) else used
+        for slot in oldest.tolist():
+            del self._slots[bytes(self._keys[slot])]
+            self._keys[slot] = 0
+            self._free.append(slot)
+        self.evictions += len(oldest)
+
+    def get_many(self, texts: Sequence[str]) -> Tuple[Dict[int, np.ndarray], List[int]]:
+        """
+        Look up cached embeddings.
+
+        Returns:
+            (Dict[position in texts] = embedding, positions that missed)
+        """
+        positions: List[int] = []
+        slots: List[int] = []
+        missing: List[int] = []
+        with self._lock:
+            for i, text in enumerate(texts):
+                slot = self._slots.get(text_hash(text))
+                if slot is None:
+                    missing.append(i)
+                else:
+                    positions.append(i)
+                    slots.append(slot)
+            found: Dict[int, np.ndarray] = {}
+            if slots:
+                found = dict(zip(positions, self._vectors[slots]))
+                self._ticks[slots] = self._tick
+            self._tick += 1
+            self.hits += len(found)
+            self.misses += len(missing)
+        return found, missing
+
+    def put_many(self, texts: Sequence[str], embeddings: np.ndarray):
+        """Store embeddings for texts (already cached texts are overwritten in place)."""
+        embeddings = np.asarray(embeddings, dtype=np.float32)
+        if not len(texts):
+            return
+        with self._lock:
+            if self.dimension is None:
+                self.dimension = embeddings.shape[1]
+            rows = {text_hash(text): i for i, text in enumerate(texts)}
+            cached = [self._slots[key] for key in rows if key in self._slots]
+            # Mark cached keys as most recent so eviction below spares them
+            if cached:
+                self._ticks[cached] = self._tick
+            # A single batch larger than the whole cache keeps only its tail
+            new_keys = [key for key in rows if key not in self._slots][-self.max_entries:]
+            self._grow(len(new_keys))
+            keep = set(new_keys)
+            for key in rows:
+                slot = self._slots.get(key)
+                if slot is None:
+                    if key not in keep:
+                        continue
+                    slot = self._free.pop()
+                self._vectors[slot] = embeddings[rows[key]]
+                self._keys[slot] = np.frombuffer(key, dtype=np.uint8)
+                self._ticks[slot] = self._tick
+                self._slots[key] = slot
+            self._tick += 1
+
+    def encode(self, texts: Sequence[str], encoder, **encode_kwargs) -> np.ndarray:
+        """
+        Embed texts, running `encoder.encode` only on cache misses.
+
+        Args:
+            texts: Texts to embed
+            encoder: Object with a SentenceTransformer-style encode(list) method
+            **encode_kwargs: Passed through to encoder.encode
+
+        Returns:
+            float32 array [len(texts), dimension]
+        """
+        texts = list(texts)
+        found, missing = self.get_many(texts)
+        if missing:
+            unique_missing = list(dict.fromkeys(texts[i] for i in missing))
+            encoded = np.asarray(encoder.encode(unique_missing, **encode_kwargs), dtype=np.float32)
+            self.put_many(unique_missing, encoded)
+            by_text = dict(zip(unique_missing, encoded))
+            for i in missing:
+                found[i] = by_text[texts[i]]
+        if not texts:
+            return np.zeros((0, self.dimension or 0), dtype=np.float32)
+        return np.stack([found[i] for i in range(len(texts))])
+
+    def flush(self):
+        """Write memory-mapped pages to disk."""
+        with self._lock:
+            for array in (self._vectors, self._keys, self._ticks):
+                if array is not None:
+                    array.flush()
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def get_stats(self) -> Dict:
+        return {
+            "model": self.model_name,
+            "entries": len(self._slots),
+            "capacity": self.capacity,
+            "max_entries": self.max_entries,
+            "size_mb": round(self.capacity * (self.dimension or 0) * 4 / (1024 * 1024), 1),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions
+        }
+
+
+if __name__ == "__main__":
+    import sys
+    import time
+    from .model_registry import get_encoder
+    from .transcript_parser import TranscriptParser
+
+    # Embed every turn of the corpus twice; the second pass is served from cache
+    # (from the repo root: python -m src.knowledge.embedding_cache [cache_dir])
+    texts = [turn.text for t in TranscriptParser().iter_episodes() for turn in t.turns]
+    cache = EmbeddingCache(sys.argv[1] if len(sys.argv) > 1 else "/tmp/embedding_cache", "all-MiniLM-L6-v2")
+    encoder = get_encoder("all-MiniLM-L6-v2")
+    for attempt in range(2):
+        start = time.perf_counter()
+        cache.encode(texts, encoder)
+        print(f"Pass {attempt + 1}: {len(texts)} texts in {time.perf_counter() - start:.2f}s")
+    cache.flush()
+    print(cache.get_stats())
@@ -0,0 +1,190 @@
+"""
+Encoders - Embedding backends behind the SentenceTransformer encode() interface.
+
+    torch   sentence_transformers.SentenceTransformer (the reference)
+    onnx    the same transformer exported to ONNX with int8-quantized
+            weights, run by ONNX Runtime on CPU, with mean/CLS pooling and
+            normalization done in numpy
+
+The ONNX backend needs neither torch nor sentence-transformers at runtime
+(only onnxruntime and tokenizers), loads faster and encodes short queries
+several times faster on CPU. Its vectors are close to, not identical with,
+the reference, so it is meant for query encoding against an index built
+with the torch backend; scripts/export_onnx_encoder.py exports a model and
+checks cosine parity and latency before it is deployed.
+
+Export layout ({output_dir}/):
+    model.onnx          float32 export
+    model.int8.onnx     dynamically quantized weights (QInt8)
+    tokenizer.json      fast tokenizer
+    encoder.json        model name, dimension, pooling, normalization, ...
+"""
+import json
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import numpy as np
+
+try:
+    import onnxruntime as ort
+    from tokenizers import Tokenizer
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+
+ENCODER_BACKENDS = ("torch", "onnx")
+
+
+class OnnxEncoder:
+    """ONNX Runtime sentence encoder for a model exported by export_onnx()."""
+
+    def __init__(self, model_dir: str, num_threads: Optional[int] = None, quantized: bool = True):
+        """
+        Args:
+            model_dir: Directory written by export_onnx()
+            num_threads: ONNX Runtime intra-op threads (default: all cores)
+            quantized: Use the int8 model (falls back to float32 if it was
+                not exported)
+        """
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("onnxruntime is not installed. Install with: pip install onnxruntime tokenizers")
+        self.model_dir = Path(model_dir)
+        with open(self.model_dir / "encoder.json", "r") as f:
+            self.config = json.load(f)
+
+        model_file = self.model_dir / "model.int8.onnx"
+        if not quantized or not model_file.exists():
+            model_file = self.model_dir / "model.onnx"
+        options = ort.SessionOptions()
+        if num_threads:
+            options.intra_op_num_threads = num_threads
+            options.inter_op_num_threads = 1
+        self.session = ort.InferenceSession(str(model_file), options, providers=["CPUExecutionProvider"])
+        self.model_file = model_file
+        self._input_names = [model_input.name for model_input in self.session.get_inputs()]
+
+        self.tokenizer = Tokenizer.from_file(str(self.model_dir / "tokenizer.json"))
+        self.tokenizer.enable_truncation(max_length=self.config["max_seq_length"])
+        self.tokenizer.enable_padding(pad_id=self.config["pad_token_id"], pad_token=self.config["pad_token"])
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.config["dimension"]
+
+    def _encode_batch(self, texts: List[str]) -> np.ndarray:
+        encodings = self.tokenizer.encode_batch(texts)
+        inputs = {
+            "input_ids": np.array([e.ids for e in encodings], dtype=np.int64),
+            "attention_mask": np.array([e.attention_mask for e in encodings], dtype=np.int64),
+            "token_type_ids": np.array([e.type_ids for e in encodings], dtype=np.int64)
+        }
+        hidden = self.session.run(None, {name: inputs[name] for name in self._input_names})[0]
+
+        if self.config["pooling"] == "cls":
+            embeddings = hidden[:, 0]
+        else:
+            mask = inputs["attention_mask"][:, :, None].astype(np.float32)
+            embeddings = (hidden * mask).sum(axis=1) / np.clip(mask.sum(axis=1), 1e-9, None)
+        return embeddings.astype(np.float32)
+
+    def encode(
+        self,
+        sentences: Union[str, List[str]],
+        batch_size: int = 32,
+        normalize_embeddings: bool = False,
+        **kwargs
+    ) -> np.ndarray:
+        """
+        Embed texts like SentenceTransformer.encode (numpy output; other
+        SentenceTransformer keyword arguments are accepted and ignored).
+        """
+        single = isinstance(sentences, str)
+        texts = [sentences] if single else list(sentences)
+        if not texts:
+            return np.zeros((0, self.config["dimension"]), dtype=np.float32)
+
+        # Batch texts of similar length together to keep padding small
+        order = np.argsort([len(text) for text in texts], kind="stable")
+        embeddings = np.empty((len(texts), self.config["dimension"]), dtype=np.float32)
+        for start in range(0, len(texts), batch_size):
+            rows = order[start:start + batch_size]
+            embeddings[rows] = self._encode_batch([texts[row] for row in rows])
+
+        if self.config["normalize"] or normalize_embeddings:
+            embeddings /= np.clip(np.linalg.norm(embeddings, axis=1, keepdims=True), 1e-12, None)
+        return embeddings[0] if single else embeddings
+
+
+def export_onnx(model_name: str, output_dir: str, quantize: bool = True, opset: int = 14) -> Dict:
+    """
+    Export a sentence-transformers model for OnnxEncoder.
+
+    Needs torch, sentence-transformers and onnxruntime (for quantization).
+
+    Args:
+        model_name: Sentence transformer model name
+        output_dir: Directory to write (see module docstring for the layout)
+        quantize: Also write the int8 model
+        opset: ONNX opset version
+
+    Returns:
+        The encoder.json config
+    """
+    import torch
+    from sentence_transformers import SentenceTransformer
+    from sentence_transformers.models import Normalize, Pooling
+
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    model = SentenceTransformer(model_name, device="cpu")
+    transformer = model[0]
+    tokenizer = transformer.tokenizer
+    pooling = next(module for module in model if isinstance(module, Pooling))
+    pooling_mode = pooling.get_pooling_mode_str()
+    if pooling_mode not in ("mean", "cls"):
+        raise ValueError(f"Unsupported pooling for ONNX export: {pooling_mode}")
+
+    sample = tokenizer(["An example sentence to trace the export."], return_tensors="pt")
+    input_names = [name for name in ("input_ids", "attention_mask", "token_type_ids") if name in sample]
+
+    class HiddenStates(torch.nn.Module):
+        """Token embeddings only; pooling is done by OnnxEncoder."""
+
+        def __init__(self, auto_model):
+            super().__init__()
+            self.auto_model = auto_model
+
+        def forward(self, *inputs):
+            return self.auto_model(**dict(zip(input_names, inputs))).last_hidden_state
+
+    dynamic_axes = {name: {0: "batch", 1: "sequence"} for name in input_names + ["last_hidden_state"]}
+    with torch.no_grad():
+        torch.onnx.export(
+            HiddenStates(transformer.auto_model.eval()),
+            tuple(sample[name] for name in input_names),
+            str(output_dir / "model.onnx"),
+            input_names=input_names,
+            output_names=["last_hidden_state"],
+            dynamic_axes=dynamic_axes,
+            opset_version=opset
+        )
+
+    if quantize:
+        from onnxruntime.quantization import QuantType, quantize_dynamic
+        quantize_dynamic(str(output_dir / "model.onnx"), str(output_dir / "model.int8.onnx"), weight_type=QuantType.QInt8)
+
+    tokenizer.save_pretrained(str(output_dir))  # writes tokenizer.json
+    config = {
+        "model": model_name,
+        "dimension": model.get_sentence_embedding_dimension(),
+        "max_seq_length": model.max_seq_length,
+        "pooling": pooling_mode,
+        "normalize": any(isinstance(module, Normalize) for module in model),
+        "pad_token_id": tokenizer.pad_token_id,
+        "pad_token": tokenizer.pad_token,
+        "quantized": quantize,
+        "opset": opset
+    }
+    with open(output_dir / "encoder.json", "w") as f:
+        json.dump(config, f, indent=2)
+    return config
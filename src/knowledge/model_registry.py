@@ -0,0 +1,135 @@
+"""
+Model Registry - One shared, lazily loaded embedding model per process.
+
+VectorStore, ThemeClusterer and RuntimeIntelligence all embed with the same
+sentence transformer. Asking the registry instead of constructing it keeps
+a single copy of each model in memory, and defers loading until the first
+text is actually encoded (a loaded vector store can answer filtered lookups
+and report stats without it). Servers call warm_up() at startup so the first
+request does not pay for loading.
+
+Each model can be served by either encoder backend (see encoders.py):
+"torch" (the SentenceTransformer) or "onnx" (the int8 ONNX Runtime export
+found under ONNX_MODEL_DIR/{model}).
+"""
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+from .concurrency import threads_per_search
+from .encoders import ENCODER_BACKENDS, OnnxEncoder
+
+
+DEFAULT_MODEL = "all-MiniLM-L6-v2"
+DEFAULT_BACKEND = "torch"
+ONNX_MODEL_DIR = os.getenv("ONNX_MODEL_DIR", "models/onnx")
+
+# Output dimensions of known models, so callers can size indexes without
+# loading the model. Anything else is looked up on the loaded model.
+KNOWN_DIMENSIONS: Dict[str, int] = {
+    "all-MiniLM-L6-v2": 384,
+    "all-MiniLM-L12-v2": 384,
+    "all-mpnet-base-v2": 768,
+    "multi-qa-MiniLM-L6-cos-v1": 384,
+    "paraphrase-MiniLM-L6-v2": 384,
+}
+
+_encoders: Dict[Tuple[str, str], object] = {}
+_dimensions: Dict[str, int] = {}
+_lock = threading.Lock()
+_model_locks: Dict[Tuple[str, str], threading.Lock] = {}
+
+
+def onnx_model_dir(model_name: str) -> Path:
+    """Where export_onnx_encoder.py puts (and the onnx backend looks for) a model."""
+    return Path(ONNX_MODEL_DIR) / model_name.replace("/", "_")
+
+
+def _load(model_name: str, backend: str):
+    if backend == "onnx":
+        # Size ONNX Runtime's thread pool like FAISS/BLAS under the active threading policy
+        return OnnxEncoder(onnx_model_dir(model_name), num_threads=threads_per_search())
+    # Imported here so the onnx backend runs without torch/sentence-transformers
+    from sentence_transformers import SentenceTransformer
+    return SentenceTransformer(model_name)
+
+
+def get_encoder(model_name: str = DEFAULT_MODEL, backend: Optional[str] = None):
+    """
+    Shared encoder for a model and backend, loaded on first use.
+
+    Concurrent first calls load the model once; other models keep loading
+    independently.
+
+    Args:
+        model_name: Sentence transformer model name
+        backend: "torch" or "onnx" (default: DEFAULT_BACKEND)
+    """
+    backend = backend or DEFAULT_BACKEND
+    key = (model_name, backend)
+    encoder = _encoders.get(key)
+    if encoder is not None:
+        return encoder
+    if backend not in ENCODER_BACKENDS:
+        raise ValueError(f"Unknown encoder backend: {backend} (expected one of {list(ENCODER_BACKENDS)})")
+    with _lock:
+        model_lock = _model_locks.setdefault(key, threading.Lock())
+    with model_lock:
+        encoder = _encoders.get(key)
+        if encoder is None:
+            start = time.perf_counter()
+            encoder = _load(model_name, backend)
+            _dimensions[model_name] = encoder.get_sentence_embedding_dimension()
+            _encoders[key] = encoder
+            print(f"Loaded embedding model {model_name} [{backend}] ({time.perf_counter() - start:.1f}s)")
+    return encoder
+
+
+def get_dimension(model_name: str = DEFAULT_MODEL) -> int:
+    """Embedding dimension of a model (loads it only if the dimension is not known)."""
+    if model_name in _dimensions:
+        return _dimensions[model_name]
+    if model_name in KNOWN_DIMENSIONS:
+        return KNOWN_DIMENSIONS[model_name]
+    get_encoder(model_name)
+    return _dimensions[model_name]
+
+
+def is_loaded(model_name: str = DEFAULT_MODEL, backend: Optional[str] = None) -> bool:
+    return (model_name, backend or DEFAULT_BACKEND) in _encoders
+
+
+def warm_up(model_names: Optional[Iterable[str]] = None, backend: Optional[str] = None) -> Dict[str, float]:
+    """
+    Load models and run one encode each, so lazy initialization (weights,
+    tokenizer, first-batch kernel setup) happens before serving traffic.
+
+    Args:
+        model_names: Models to warm up (default: DEFAULT_MODEL)
+        backend: Encoder backend to warm up (default: DEFAULT_BACKEND)
+
+    Returns:
+        Dict mapping model name -> seconds spent
+    """
+    timings = {}
+    for model_name in model_names or [DEFAULT_MODEL]:
+        start = time.perf_counter()
+        get_encoder(model_name, backend).encode(["warm-up"])
+        timings[model_name] = time.perf_counter() - start
+    return timings
+
+
+def get_stats() -> Dict:
+    return {
+        "loaded": [f"{model_name} [{backend}]" for model_name, backend in sorted(_encoders)],
+        "dimensions": {model_name: _dimensions[model_name] for model_name, _ in sorted(_encoders)}
+    }
+
+
+if __name__ == "__main__":
+    print(f"{DEFAULT_MODEL} dimension (no load): {get_dimension()} loaded={is_loaded()}")
+    print(f"Warm-up: {warm_up()}")
+    assert get_encoder() is get_encoder()
+    print(get_stats())
@@ -232,6 +232,20 @@ class SupabaseStore:
         
         return assignments
     
+    def delete_chunks(self, chunk_ids: List[str]):
+        """Delete everything derived from the given chunks (extractions, assignments, embeddings).
+        
+        Args:
+            chunk_ids: Chunk ids to delete
+        """
+        batch_size = 100
+        for table in ("theme_extractions", "chunk_theme_assignments", "chunk_embeddings"):
+            for i in range(0, len(chunk_ids), batch_size):
+                batch = chunk_ids[i:i + batch_size]
+                self.client.table(table).delete().in_("chunk_id", batch).execute()
+        
+        print(f"  Deleted {len(chunk_ids)} chunks from Supabase")
+    
     # Chunk Embeddings (Vector Store)
     def save_chunk_embeddings(
         self,
@@ -0,0 +1,493 @@
+"""
+Text Store - Chunk texts resolved lazily from the memory-mapped TurnStore.
+
+Chunks produced from the turn store are kept as (episode_id, start, end) byte
+spans into that episode's text, so the text only exists once on disk (in
+turn_store/text.bin) and is decoded on access instead of living in a dict.
+Chunks added without a span (e.g. ad-hoc add_chunk calls) keep their text
+inline. BlobTextStore is the saved, memory-mapped form of the same mapping;
+CompressedTextStore is a saved form that holds every text zstd-compressed in
+memory instead.
+"""
+import json
+import os
+import threading
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+
+import numpy as np
+
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    ZSTD_AVAILABLE = False
+
+from .columnar import Blob, atomic_write, load_array, save_array, write_blob
+from .turn_store import TurnStore
+
+
+TEXT_COMPRESSION = (None, "zstd")
+
+
+class SpanTextStore(MutableMapping):
+    """
+    chunk_id -> text mapping backed by TurnStore spans.
+
+    Behaves like the plain Dict[str, str] it replaces; assigning a string
+    stores it inline, add_span() stores a span.
+    """
+
+    compression: Optional[str] = None  # how saved texts are held (see TEXT_COMPRESSION)
+
+    def __init__(self, turn_store: Optional[TurnStore] = None):
+        self.turn_store = turn_store
+        self._spans: Dict[str, Tuple[str, int, int]] = {}
+        self._texts: Dict[str, str] = {}
+
+    def add_span(self, chunk_id: str, episode_id: str, start: int, end: int):
+        """Store a chunk as a byte span of its episode in the turn store."""
+        self._texts.pop(chunk_id, None)
+        self._spans[chunk_id] = (episode_id, start, end)
+
+    def span(self, chunk_id: str) -> Optional[Tuple[str, int, int]]:
+        """(episode_id, start, end) for span-backed chunks, else None."""
+        return self._spans.get(chunk_id)
+
+    def __getitem__(self, chunk_id: str) -> str:
+        span = self._spans.get(chunk_id)
+        if span is None:
+            return self._texts[chunk_id]
+        if self.turn_store is None:
+            raise RuntimeError(f"No turn store attached to resolve chunk {chunk_id}")
+        return self.turn_store.episode_text(*span)
+
+    def __setitem__(self, chunk_id: str, text: str):
+        self._spans.pop(chunk_id, None)
+        self._texts[chunk_id] = text
+
+    def __delitem__(self, chunk_id: str):
+        if chunk_id in self._spans:
+            del self._spans[chunk_id]
+        else:
+            del self._texts[chunk_id]
+
+    def __contains__(self, chunk_id) -> bool:
+        return chunk_id in self._spans or chunk_id in self._texts
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self._spans
+        yield from self._texts
+
+    def __len__(self) -> int:
+        return len(self._spans) + len(self._texts)
+
+    def save(self, path: str):
+        """
+        Write spans and inline texts to a JSON file.
+
+        The turn store location is recorded relative to the file so the
+        knowledge base directory can be moved as a whole.
+        """
+        path = Path(path)
+        turn_store_path = None
+        if self.turn_store is not None and self.turn_store.path:
+            turn_store_path = os.path.relpath(self.turn_store.path, path.parent)
+        with open(path, "w") as f:
+            json.dump({
+                "turn_store": turn_store_path,
+                "spans": self._spans,
+                "texts": self._texts
+            }, f)
+
+    @classmethod
+    def load(cls, path: str, turn_store: Optional[TurnStore] = None) -> "SpanTextStore":
+        """
+        Load a saved store.
+
+        Args:
+            path: File written by save()
+            turn_store: Turn store to resolve spans against (default: the one
+                recorded in the file, opened memory-mapped)
+        """
+        path = Path(path)
+        with open(path, "r") as f:
+            data = json.load(f)
+
+        if turn_store is None and data.get("turn_store") and data["spans"]:
+            turn_store = TurnStore.open(str(path.parent / data["turn_store"]))
+
+        store = cls(turn_store)
+        store._spans = {chunk_id: tuple(span) for chunk_id, span in data["spans"].items()}
+        store._texts = data["texts"]
+        return store
+
+
+class BlobTextStore(SpanTextStore):
+    """
+    SpanTextStore whose saved chunks stay on disk until accessed.
+
+    Saved rows are read from memory-mapped columns: per-row spans into the
+    turn store, and an offset-indexed blob for inline texts. Chunks added or
+    removed after loading are held in memory on top, like a SpanTextStore.
+
+    Layout ({path}/...):
+        text_spans.npy                   int64[n, 3] episode code (-1 = inline), start, end
+        texts.bin, texts.offsets.npy     inline texts (empty for span rows)
+        text_columns.json                episode vocabulary and turn store location
+    """
+
+    def __init__(
+        self,
+        turn_store: Optional[TurnStore],
+        rows: Dict[str, int],
+        spans: np.ndarray,
+        episode_ids: List[str],
+        texts: Optional[Blob]
+    ):
+        super().__init__(turn_store)
+        self._rows = rows
+        self._row_spans = spans
+        self._episode_ids = episode_ids
+        self._blob = texts
+        self._deleted: Set[str] = set()
+
+    def _saved_row(self, chunk_id: str) -> Optional[int]:
+        if chunk_id in self._spans or chunk_id in self._texts or chunk_id in self._deleted:
+            return None
+        return self._rows.get(chunk_id)
+
+    def add_span(self, chunk_id: str, episode_id: str, start: int, end: int):
+        super().add_span(chunk_id, episode_id, start, end)
+        self._deleted.discard(chunk_id)
+
+    def span(self, chunk_id: str) -> Optional[Tuple[str, int, int]]:
+        row = self._saved_row(chunk_id)
+        if row is None:
+            return super().span(chunk_id)
+        code, start, end = self._row_spans[row].tolist()
+        return None if code < 0 else (self._episode_ids[code], start, end)
+
+    def __getitem__(self, chunk_id: str) -> str:
+        row = self._saved_row(chunk_id)
+        if row is None:
+            return super().__getitem__(chunk_id)
+        span = self.span(chunk_id)
+        if span is None:
+            return self._blob[row]
+        if self.turn_store is None:
+            raise RuntimeError(f"No turn store attached to resolve chunk {chunk_id}")
+        return self.turn_store.episode_text(*span)
+
+    def __setitem__(self, chunk_id: str, text: str):
+        super().__setitem__(chunk_id, text)
+        self._deleted.discard(chunk_id)
+
+    def __delitem__(self, chunk_id: str):
+        if chunk_id in self._spans or chunk_id in self._texts:
+            super().__delitem__(chunk_id)
+            if chunk_id in self._rows:
+                self._deleted.add(chunk_id)
+        elif chunk_id in self._rows and chunk_id not in self._deleted:
+            self._deleted.add(chunk_id)
+        else:
+            raise KeyError(chunk_id)
+
+    def __contains__(self, chunk_id) -> bool:
+        return super().__contains__(chunk_id) or (chunk_id in self._rows and chunk_id not in self._deleted)
+
+    def __iter__(self) -> Iterator[str]:
+        for chunk_id in self._rows:
+            if chunk_id not in self._deleted:
+                yield chunk_id
+        for chunk_id in super().__iter__():
+            if chunk_id not in self._rows or chunk_id in self._deleted:
+                yield chunk_id
+
+    def __len__(self) -> int:
+        added = sum(1 for chunk_id in super().__iter__() if chunk_id not in self._rows)
+        return len(self._rows) - len(self._deleted) + added
+
+    @staticmethod
+    def write(path: str, chunk_ids: List[str], store: SpanTextStore):
+        """
+        Write the texts of `chunk_ids` (in row order) from any SpanTextStore.
+
+        Span-backed chunks are written as spans; their text is not copied.
+        """
+        path = Path(path)
+        spans, episode_ids = _write_spans(path, chunk_ids, store)
+        write_blob(path / "texts", (store[chunk_id] if code < 0 else "" for chunk_id, code in zip(chunk_ids, spans[:, 0])))
+        _write_spec(path, store, {"episode_ids": episode_ids})
+        _remove_files(path, CompressedTextStore.FILES)
+
+    @classmethod
+    def open(
+        cls,
+        path: str,
+        rows: Dict[str, int],
+        turn_store: Optional[TurnStore] = None
+    ) -> "BlobTextStore":
+        """
+        Memory-map texts written by write().
+
+        Args:
+            path: Directory passed to write()
+            rows: chunk_id -> row of the saved columns
+            turn_store: Turn store to resolve spans against (default: the one
+                recorded at write time, opened memory-mapped)
+        """
+        path = Path(path)
+        spec, turn_store = _read_spec(path, turn_store)
+        return cls(turn_store, rows, load_array(path / "text_spans.npy"), spec["episode_ids"], Blob(path / "texts"))
+
+
+class CompressedTextStore(BlobTextStore):
+    """
+    Saved texts held zstd-compressed in memory, decompressed per access.
+
+    Every saved row's text is compressed, span-backed ones included, so
+    serving results reads neither the turn store nor an uncompressed blob
+    (the spans are kept too, and written as spans again by an uncompressed
+    save). Rows are compressed in blocks of block_size consecutive rows with
+    a dictionary trained on the texts, which lets small blocks compress
+    nearly as well as large ones. Reading a chunk decompresses its block;
+    an LRU keeps the last cache_size texts read, and each thread keeps its
+    last decompressed block, so sequential reads decompress each block once.
+
+    Layout ({path}/...):
+        text_spans.npy                         as BlobTextStore
+        texts.zst.bin, texts.zst.offsets.npy   compressed blocks (block b = bin[offsets[b]:offsets[b + 1]])
+        text_offsets.npy                       int64[n + 1] row offsets into the uncompressed texts
+        texts.zdict                            zstd dictionary (absent if there was too little text)
+        text_columns.json                      + compression, block_size
+    """
+
+    compression = "zstd"
+    FILES = ("texts.zst.bin", "texts.zst.offsets.npy", "text_offsets.npy", "texts.zdict")
+
+    def __init__(
+        self,
+        turn_store: Optional[TurnStore],
+        rows: Dict[str, int],
+        spans: np.ndarray,
+        episode_ids: List[str],
+        blocks: bytes,
+        block_offsets: np.ndarray,
+        text_offsets: np.ndarray,
+        block_size: int,
+        dictionary: Optional[bytes] = None,
+        cache_size: int = 1024
+    ):
+        if not ZSTD_AVAILABLE:
+            raise ImportError("zstandard is not installed. Install with: pip install zstandard")
+        super().__init__(turn_store, rows, spans, episode_ids, texts=None)
+        self._blocks = blocks
+        self._block_offsets = block_offsets
+        self._text_offsets = text_offsets
+        self.block_size = block_size
+        self._dictionary = zstandard.ZstdCompressionDict(dictionary) if dictionary else None
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[int, str]" = OrderedDict()  # row -> text, least recently read first
+        self._cache_lock = threading.Lock()
+        self._local = threading.local()  # per thread: decompressor and last decompressed block
+        self.hits = 0
+        self.misses = 0
+
+    def _block(self, block: int) -> bytes:
+        local = self._local
+        if getattr(local, "block", None) == block:
+            return local.data
+        decompressor = getattr(local, "decompressor", None)
+        if decompressor is None:
+            # Decompressors are not thread-safe; one per thread also loads the dictionary once
+            decompressor = local.decompressor = zstandard.ZstdDecompressor(dict_data=self._dictionary)
+        start, end = self._block_offsets[block], self._block_offsets[block + 1]
+        local.data = decompressor.decompress(self._blocks[start:end])
+        local.block = block
+        return local.data
+
+    def _saved_text(self, row: int) -> str:
+        with self._cache_lock:
+            text = self._cache.get(row)
+            if text is not None:
+                self._cache.move_to_end(row)
+                self.hits += 1
+                return text
+            self.misses += 1
+
+        block = row // self.block_size
+        base = self._text_offsets[block * self.block_size]
+        text = self._block(block)[self._text_offsets[row] - base:self._text_offsets[row + 1] - base].decode("utf-8")
+        with self._cache_lock:
+            self._cache[row] = text
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return text
+
+    def __getitem__(self, chunk_id: str) -> str:
+        row = self._saved_row(chunk_id)
+        if row is None:
+            return SpanTextStore.__getitem__(self, chunk_id)
+        return self._saved_text(row)
+
+    @property
+    def nbytes(self) -> int:
+        """Resident bytes of the compressed texts and row offsets."""
+        return len(self._blocks) + self._block_offsets.nbytes + self._text_offsets.nbytes
+
+    def get_stats(self) -> Dict:
+        raw_bytes = int(self._text_offsets[-1])
+        return {
+            "compression": self.compression,
+            "rows": len(self._text_offsets) - 1,
+            "blocks": len(self._block_offsets) - 1,
+            "block_size": self.block_size,
+            "raw_bytes": raw_bytes,
+            "compressed_bytes": len(self._blocks),
+            "ratio": round(raw_bytes / max(len(self._blocks), 1), 2),
+            "dictionary_bytes": len(self._dictionary.as_bytes()) if self._dictionary is not None else 0,
+            "cached": len(self._cache),
+            "cache_hits": self.hits,
+            "cache_misses": self.misses
+        }
+
+    @staticmethod
+    def write(
+        path: str,
+        chunk_ids: List[str],
+        store: SpanTextStore,
+        block_size: int = 16,
+        level: int = 3,
+        dictionary_size: int = 64 * 1024
+    ):
+        """
+        Write the texts of `chunk_ids` (in row order) from any SpanTextStore.
+
+        Args:
+            path: Directory to write (see class docstring for the layout)
+            chunk_ids: Chunk ids in row order
+            store: Store to read texts and spans from
+            block_size: Rows per compressed block (smaller blocks make a
+                single read cheaper, larger ones compress better)
+            level: zstd compression level
+            dictionary_size: Target size of the trained dictionary
+        """
+        if not ZSTD_AVAILABLE:
+            raise ImportError("zstandard is not installed. Install with: pip install zstandard")
+        path = Path(path)
+        texts = [store[chunk_id].encode("utf-8") for chunk_id in chunk_ids]
+        _, episode_ids = _write_spans(path, chunk_ids, store)
+
+        # Train on (at most) 20,000 evenly spaced texts; too few or too short
+        # samples make training fail, and blocks are then compressed without
+        dictionary = None
+        samples = texts[::max(1, len(texts) // 20000)]
+        if sum(len(sample) for sample in samples) >= 10 * dictionary_size:
+            try:
+                dictionary = zstandard.train_dictionary(dictionary_size, samples, level=level)
+            except zstandard.ZstdError:
+                dictionary = None
+        compressor = zstandard.ZstdCompressor(level=level, dict_data=dictionary)
+
+        text_offsets = np.zeros(len(texts) + 1, dtype=np.int64)
+        np.cumsum([len(text) for text in texts], out=text_offsets[1:])
+        block_offsets = [0]
+
+        def write_blocks(tmp_path: str):
+            with open(tmp_path, "wb") as f:
+                for start in range(0, len(texts), block_size):
+                    data = compressor.compress(b"".join(texts[start:start + block_size]))
+                    f.write(data)
+                    block_offsets.append(block_offsets[-1] + len(data))
+        atomic_write(path / "texts.zst.bin", write_blocks)
+        save_array(path / "texts.zst.offsets.npy", np.array(block_offsets, dtype=np.int64))
+        save_array(path / "text_offsets.npy", text_offsets)
+        if dictionary is not None:
+            atomic_write(path / "texts.zdict", lambda tmp_path: Path(tmp_path).write_bytes(dictionary.as_bytes()))
+        elif (path / "texts.zdict").exists():
+            (path / "texts.zdict").unlink()
+        _write_spec(path, store, {"episode_ids": episode_ids, "compression": "zstd", "block_size": block_size})
+        _remove_files(path, ("texts.bin", "texts.offsets.npy"))
+
+    @classmethod
+    def open(
+        cls,
+        path: str,
+        rows: Dict[str, int],
+        turn_store: Optional[TurnStore] = None
+    ) -> "CompressedTextStore":
+        """
+        Read texts written by write() into memory (still compressed).
+
+        Args:
+            path: Directory passed to write()
+            rows: chunk_id -> row of the saved columns
+            turn_store: Turn store the saved spans point into (default: the
+                one recorded at write time, opened memory-mapped)
+        """
+        path = Path(path)
+        spec, turn_store = _read_spec(path, turn_store)
+        dictionary_file = path / "texts.zdict"
+        return cls(
+            turn_store,
+            rows,
+            load_array(path / "text_spans.npy"),
+            spec["episode_ids"],
+            (path / "texts.zst.bin").read_bytes(),
+            np.load(path / "texts.zst.offsets.npy"),
+            np.load(path / "text_offsets.npy"),
+            spec["block_size"],
+            dictionary_file.read_bytes() if dictionary_file.exists() else None
+        )
+
+
+def open_text_store(path: str, rows: Dict[str, int], turn_store: Optional[TurnStore] = None) -> BlobTextStore:
+    """Open saved texts with the store class they were written by."""
+    spec, _ = _read_spec(Path(path), turn_store=None, open_turn_store=False)
+    store_class = CompressedTextStore if spec.get("compression") == "zstd" else BlobTextStore
+    return store_class.open(path, rows, turn_store=turn_store)
+
+
+def _write_spans(path: Path, chunk_ids: List[str], store: SpanTextStore) -> Tuple[np.ndarray, List[str]]:
+    """Write text_spans.npy (episode code -1 for inline texts); returns (spans, episode vocabulary)."""
+    episode_codes: Dict[str, int] = {}
+    spans = np.empty((len(chunk_ids), 3), dtype=np.int64)
+    for row, chunk_id in enumerate(chunk_ids):
+        span = store.span(chunk_id)
+        if span is None:
+            spans[row] = (-1, 0, 0)
+        else:
+            episode_id, start, end = span
+            spans[row] = (episode_codes.setdefault(episode_id, len(episode_codes)), start, end)
+    save_array(path / "text_spans.npy", spans)
+    return spans, list(episode_codes)
+
+
+def _write_spec(path: Path, store: SpanTextStore, spec: Dict):
+    """Write text_columns.json, recording the turn store location relative to path."""
+    turn_store_path = None
+    if store.turn_store is not None and store.turn_store.path:
+        turn_store_path = os.path.relpath(store.turn_store.path, path)
+
+    def write(tmp_path: str):
+        with open(tmp_path, "w") as f:
+            json.dump({"turn_store": turn_store_path, **spec}, f)
+    atomic_write(path / "text_columns.json", write)
+
+
+def _read_spec(path: Path, turn_store: Optional[TurnStore], open_turn_store: bool = True) -> Tuple[Dict, Optional[TurnStore]]:
+    with open(path / "text_columns.json", "r") as f:
+        spec = json.load(f)
+    if open_turn_store and turn_store is None and spec.get("turn_store") and spec["episode_ids"]:
+        turn_store = TurnStore.open(str(path / spec["turn_store"]))
+    return spec, turn_store
+
+
+def _remove_files(path: Path, names: Tuple[str, ...]):
+    """Drop files of the other text layout left over from an earlier save."""
+    for name in names:
+        if (path / name).exists():
+            (path / name).unlink()
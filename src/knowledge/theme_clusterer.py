@@ -3,13 +3,15 @@ Theme Clustering - Creates emergent intent ontology using HDBSCAN.
 This generates the ~30-60 themes that form the intent space.
 """
 import numpy as np
-from typing import List, Dict, Optional
+from typing import Callable, Iterable, List, Dict, Optional, Tuple
 from dataclasses import dataclass, asdict
 import json
-from sentence_transformers import SentenceTransformer
 import hdbscan
 from sklearn.preprocessing import StandardScaler
 
+from .embedding_cache import EmbeddingCache
+from .model_registry import get_encoder
+
 
 @dataclass
 class Theme:
@@ -36,9 +38,11 @@ class ThemeClusterer:
         self,
         embedding_model: str = "all-MiniLM-L6-v2",
         min_cluster_size: int = 5,
-        min_samples: int = 3
+        min_samples: int = 3,
+        embedding_cache: Optional[EmbeddingCache] = None
     ):
-        self.encoder = SentenceTransformer(embedding_model)
+        self.encoder = get_encoder(embedding_model)
+        self.embedding_cache = embedding_cache  # Reuses embeddings across runs
         self.min_cluster_size = min_cluster_size
         self.min_samples = min_samples
     
@@ -91,7 +95,7 @@ class ThemeClusterer:
         
         # Step 2: Embed all texts
         print(f"Embedding {len(texts_to_embed)} texts...")
-        embeddings = self.encoder.encode(texts_to_embed)
+        embeddings = self._embed(texts_to_embed)
         embeddings = np.array(embeddings, dtype=np.float32)
         
         # Normalize embeddings
@@ -151,6 +155,12 @@ class ThemeClusterer:
         print(f"Created {len(themes)} themes")
         return themes
     
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Encode texts, going through the embedding cache if one is set."""
+        if self.embedding_cache is not None:
+            return self.embedding_cache.encode(texts, self.encoder)
+        return self.encoder.encode(texts)
+    
     def _generate_label(self, example_phrases: List[str]) -> str:
         """Generate a human-readable label for a theme (optional, for debugging)."""
         # Simple heuristic: use first example phrase, or combine common words
@@ -180,22 +190,56 @@ class ThemeClusterer:
         
         # Embed all chunk texts
         chunk_texts = [chunk["text"] for chunk in chunks]
-        chunk_embeddings = self.encoder.encode(chunk_texts)
+        chunk_embeddings = self._embed(chunk_texts)
         chunk_embeddings = np.array(chunk_embeddings, dtype=np.float32)
+        chunk_ids = [chunk["chunk_id"] for chunk in chunks]
+        
+        return self.assign_embeddings_to_themes(
+            lambda: [(chunk_ids, chunk_embeddings)],
+            themes
+        )
+    
+    def assign_embeddings_to_themes(
+        self,
+        embedding_batches: Callable[[], Iterable[Tuple[List[str], np.ndarray]]],
+        themes: List[Theme]
+    ) -> Dict[str, str]:
+        """
+        Assign already-embedded chunks to themes, streaming over batches.
+        
+        Makes two passes: one to fit the normalization statistics, one to
+        assign each chunk to its nearest centroid. Only one batch of
+        embeddings is held in memory at a time.
+        
+        Args:
+            embedding_batches: Zero-arg callable returning an iterable of
+                (chunk_ids, embeddings) batches; called once per pass
+            themes: List of Theme objects
+            
+        Returns:
+            Dict mapping chunk_id -> theme_id
+        """
+        if not themes:
+            return {}
         
-        # Normalize
+        # Pass 1: normalization statistics over all chunk embeddings
         scaler = StandardScaler()
-        chunk_embeddings_scaled = scaler.fit_transform(chunk_embeddings)
+        for _, batch_embeddings in embedding_batches():
+            if len(batch_embeddings):
+                scaler.partial_fit(np.asarray(batch_embeddings, dtype=np.float32))
         
-        # Assign each chunk to nearest theme centroid
+        # Pass 2: assign each chunk to nearest theme centroid
         assignments = {}
         theme_centroids = np.array([theme.centroid_embedding for theme in themes])
         
-        for i, chunk in enumerate(chunks):
-            chunk_emb = chunk_embeddings_scaled[i]
-            distances = np.linalg.norm(theme_centroids - chunk_emb, axis=1)
-            nearest_theme_idx = np.argmin(distances)
-            assignments[chunk["chunk_id"]] = themes[nearest_theme_idx].theme_id
+        for batch_ids, batch_embeddings in embedding_batches():
+            if not len(batch_embeddings):
+                continue
+            scaled = scaler.transform(np.asarray(batch_embeddings, dtype=np.float32))
+            distances = np.linalg.norm(scaled[:, None, :] - theme_centroids[None, :, :], axis=2)
+            nearest = np.argmin(distances, axis=1)
+            for chunk_id, theme_idx in zip(batch_ids, nearest):
+                assignments[chunk_id] = themes[theme_idx].theme_id
         
         return assignments
 
@@ -0,0 +1,155 @@
+"""
+Tokenization - Shared, batched tiktoken service.
+
+Every component that counts tokens (chunker, backfill scripts, RAG context
+budgeting) goes through one Tokenizer per encoding. Strings are encoded in
+batches with tiktoken's multi-threaded batch API, and token counts are kept
+in an LRU cache so a text is only encoded once per process.
+"""
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import tiktoken
+
+
+DEFAULT_ENCODING = "cl100k_base"
+
+
+class Tokenizer:
+    """
+    Batched token counting and encoding on top of a tiktoken encoding.
+
+    Special-token strings in the input are encoded as ordinary text, so corpus
+    text containing e.g. "<|endoftext|>" never raises.
+    """
+
+    def __init__(
+        self,
+        encoding_name: str = DEFAULT_ENCODING,
+        num_threads: Optional[int] = None,
+        cache_size: int = 200_000
+    ):
+        """
+        Args:
+            encoding_name: tiktoken encoding name
+            num_threads: Threads used by batch encoding (default: all cores)
+            cache_size: Max number of texts whose token counts are cached
+        """
+        self.encoding_name = encoding_name
+        self.encoding = tiktoken.get_encoding(encoding_name)
+        self.num_threads = num_threads or os.cpu_count() or 1
+        self.cache_size = cache_size
+        self._counts: "OrderedDict[str, int]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def encode(self, text: str) -> List[int]:
+        return self.encoding.encode_ordinary(text)
+
+    def encode_batch(self, texts: Sequence[str]) -> List[List[int]]:
+        """Encode many strings at once across `num_threads` threads."""
+        if not texts:
+            return []
+        return self.encoding.encode_ordinary_batch(list(texts), num_threads=self.num_threads)
+
+    def decode(self, tokens: Sequence[int]) -> str:
+        return self.encoding.decode(list(tokens))
+
+    def count(self, text: str) -> int:
+        return self.count_batch([text])[0]
+
+    def count_batch(self, texts: Sequence[str]) -> List[int]:
+        """
+        Token count of each text.
+
+        Cached counts are reused; all misses are encoded in a single
+        multi-threaded batch.
+        """
+        counts: List[Optional[int]] = [None] * len(texts)
+        missing: Dict[str, List[int]] = {}
+        with self._lock:
+            for i, text in enumerate(texts):
+                count = self._counts.get(text)
+                if count is None:
+                    missing.setdefault(text, []).append(i)
+                else:
+                    self._counts.move_to_end(text)
+                    counts[i] = count
+            self.hits += len(texts) - sum(len(positions) for positions in missing.values())
+            self.misses += len(missing)
+
+        if missing:
+            unique_texts = list(missing)
+            encoded = self.encode_batch(unique_texts)
+            with self._lock:
+                for text, tokens in zip(unique_texts, encoded):
+                    count = len(tokens)
+                    for i in missing[text]:
+                        counts[i] = count
+                    self._counts[text] = count
+                while len(self._counts) > self.cache_size:
+                    self._counts.popitem(last=False)
+        return counts
+
+    def offsets(self, text: str) -> Tuple[List[int], List[int]]:
+        """
+        Encode a text and return (tokens, character offset where each token starts).
+
+        Useful for cutting text at token boundaries without re-encoding slices.
+        """
+        tokens = self.encode(text)
+        _, offsets = self.encoding.decode_with_offsets(tokens)
+        return tokens, offsets
+
+    def truncate(self, text: str, max_tokens: int) -> str:
+        """Cut a text to at most `max_tokens` tokens at a token boundary."""
+        tokens, offsets = self.offsets(text)
+        if len(tokens) <= max_tokens:
+            return text
+        return text[:offsets[max_tokens]]
+
+    def clear_cache(self):
+        with self._lock:
+            self._counts.clear()
+            self.hits = self.misses = 0
+
+    def get_stats(self) -> Dict:
+        return {
+            "encoding": self.encoding_name,
+            "num_threads": self.num_threads,
+            "cached_counts": len(self._counts),
+            "hits": self.hits,
+            "misses": self.misses
+        }
+
+
+_tokenizers: Dict[str, Tokenizer] = {}
+_tokenizers_lock = threading.Lock()
+
+
+def get_tokenizer(encoding_name: str = DEFAULT_ENCODING) -> Tokenizer:
+    """Process-wide shared Tokenizer for an encoding (created on first use)."""
+    with _tokenizers_lock:
+        tokenizer = _tokenizers.get(encoding_name)
+        if tokenizer is None:
+            tokenizer = _tokenizers[encoding_name] = Tokenizer(encoding_name)
+        return tokenizer
+
+
+if __name__ == "__main__":
+    import time
+    from .transcript_parser import TranscriptParser
+
+    # Count tokens for every turn of the corpus in one batch
+    # (from the repo root: python -m src.knowledge.tokenization)
+    texts = [turn.text for t in TranscriptParser().iter_episodes() for turn in t.turns]
+    tokenizer = get_tokenizer()
+    start = time.perf_counter()
+    total = sum(tokenizer.count_batch(texts))
+    elapsed = time.perf_counter() - start
+    print(f"{len(texts)} turns, {total} tokens in {elapsed:.2f}s "
+          f"({tokenizer.num_threads} threads, {total / elapsed:,.0f} tokens/s)")
+    print(tokenizer.get_stats())
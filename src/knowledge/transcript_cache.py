@@ -0,0 +1,58 @@
+"""
+Transcript Cache - On-disk cache of parsed transcripts keyed by file content hash.
+Unchanged episodes load from the cache instead of being re-parsed.
+"""
+import hashlib
+import os
+import pickle
+from pathlib import Path
+
+
+# Bump whenever the parser output changes so stale entries are ignored
+CACHE_VERSION = 2
+
+
+class TranscriptCache:
+    """
+    Stores pickled Transcript objects under the sha256 of the raw file bytes.
+
+    Layout:
+        {cache_dir}/v{CACHE_VERSION}/{digest}.pkl
+    """
+
+    def __init__(self, cache_dir: str = ".cache/transcripts"):
+        self.cache_dir = Path(cache_dir) / f"v{CACHE_VERSION}"
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def content_hash(content: bytes) -> str:
+        """Hash raw transcript bytes."""
+        return hashlib.sha256(content).hexdigest()
+
+    def _entry_path(self, digest: str) -> Path:
+        return self.cache_dir / f"{digest}.pkl"
+
+    def get(self, digest: str):
+        """
+        Load a cached transcript.
+
+        Returns:
+            Transcript object, or None on a miss or unreadable entry
+        """
+        entry = self._entry_path(digest)
+        if not entry.exists():
+            return None
+        try:
+            with open(entry, "rb") as f:
+                return pickle.load(f)
+        except Exception:
+            # Corrupt or incompatible entry - treat as a miss
+            return None
+
+    def put(self, digest: str, transcript) -> None:
+        """Store a parsed transcript (atomic write)."""
+        entry = self._entry_path(digest)
+        tmp_path = entry.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "wb") as f:
+            pickle.dump(transcript, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, entry)
@@ -1,12 +1,27 @@
 """
 Transcript Parser - Extracts structured data from transcript markdown files.
 """
+import os
 import re
 import yaml
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Optional, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 from dataclasses import dataclass
 
+from .transcript_cache import TranscriptCache
+from .transcript_scanner import scan_transcript, timestamp_to_seconds
+
+
+# Speaker labels used for the podcast host in transcripts
+HOST_SPEAKERS = ("Lenny", "Lenny Rachitsky")
+
+
+def speaker_role(speaker: Optional[str]) -> str:
+    """Classify a speaker label as "host" or "guest"."""
+    return "host" if speaker and speaker.strip() in HOST_SPEAKERS else "guest"
+
 
 @dataclass
 class SpeakerTurn:
@@ -15,6 +30,7 @@ class SpeakerTurn:
     timestamp: str
     text: str
     turn_index: int
+    timestamp_seconds: int = 0
 
 
 @dataclass
@@ -50,8 +66,26 @@ class TranscriptParser:
         re.MULTILINE
     )
     
-    def __init__(self, episodes_dir: str = "episodes"):
+    def __init__(
+        self,
+        episodes_dir: str = "episodes",
+        cache_dir: Optional[str] = None,
+        workers: int = 1,
+        use_scanner: bool = True
+    ):
+        """
+        Initialize parser.
+        
+        Args:
+            episodes_dir: Directory containing {slug}/transcript.md files
+            cache_dir: Directory for the parsed-transcript cache (disabled if None)
+            workers: Processes used by parse_all_episodes (0 = all cores)
+            use_scanner: Use the single-pass scanner (False = legacy split/yaml/regex path)
+        """
         self.episodes_dir = Path(episodes_dir)
+        self.cache = TranscriptCache(cache_dir) if cache_dir else None
+        self.workers = workers if workers > 0 else (os.cpu_count() or 1)
+        self.use_scanner = use_scanner
     
     def parse_transcript(self, transcript_path: Path) -> Transcript:
         """
@@ -68,10 +102,32 @@ class TranscriptParser:
         # Extract episode_id from path: episodes/{slug}/transcript.md
         episode_id = transcript_path.parent.name
         
+        return self.parse_content(content, episode_id, source=transcript_path)
+    
+    def parse_content(
+        self,
+        content: str,
+        episode_id: str,
+        source: Optional[Path] = None
+    ) -> Transcript:
+        """
+        Parse transcript markdown that has already been read.
+        
+        Args:
+            content: Raw transcript.md content
+            episode_id: Episode slug
+            source: Originating path (for error messages)
+            
+        Returns:
+            Transcript object with metadata and turns
+        """
+        if self.use_scanner:
+            return self._parse_scanned(content, episode_id, source)
+        
         # Split frontmatter and content
         parts = content.split('---', 2)
         if len(parts) < 3:
-            raise ValueError(f"Invalid transcript format: {transcript_path}")
+            raise ValueError(f"Invalid transcript format: {source or episode_id}")
         
         # Parse frontmatter
         frontmatter_text = parts[1].strip()
@@ -88,6 +144,40 @@ class TranscriptParser:
             episode_id=episode_id
         )
     
+    def _parse_scanned(
+        self,
+        content: str,
+        episode_id: str,
+        source: Optional[Path] = None
+    ) -> Transcript:
+        """Parse with the single-pass scanner (frontmatter and turns in one walk)."""
+        try:
+            metadata_dict, scanned_turns, body = scan_transcript(content)
+        except ValueError:
+            raise ValueError(f"Invalid transcript format: {source or episode_id}")
+        
+        metadata = EpisodeMetadata(**metadata_dict)
+        turns = [
+            SpeakerTurn(
+                speaker=turn.speaker,
+                timestamp=turn.timestamp,
+                text=turn.text,
+                turn_index=turn.turn_index,
+                timestamp_seconds=turn.timestamp_seconds
+            )
+            for turn in scanned_turns
+        ]
+        
+        # Same fallback as the legacy path for transcripts without speaker headers
+        if not turns:
+            turns = self._parse_fallback(body)
+        
+        return Transcript(
+            metadata=metadata,
+            turns=turns,
+            episode_id=episode_id
+        )
+    
     def _parse_speaker_turns(self, text: str) -> List[SpeakerTurn]:
         """
         Extract speaker turns from transcript text.
@@ -114,7 +204,8 @@ class TranscriptParser:
                 speaker=speaker,
                 timestamp=timestamp,
                 text=text_content,
-                turn_index=idx
+                turn_index=idx,
+                timestamp_seconds=timestamp_to_seconds(timestamp) or 0
             )
             turns.append(turn)
         
@@ -168,18 +259,76 @@ class TranscriptParser:
     
     def parse_all_episodes(self) -> List[Transcript]:
         """Parse all transcripts in the episodes directory."""
-        transcripts = []
+        return list(self.iter_episodes())
+    
+    def iter_episodes(self) -> Iterator[Transcript]:
+        """
+        Stream parsed transcripts one episode at a time.
+        
+        Episodes whose content hash is already in the cache are loaded from it;
+        the rest are parsed (across `workers` processes) and written back. At most
+        a few episodes per worker are held in memory at once.
+        """
         episode_paths = self.get_all_episodes()
+        executor = ProcessPoolExecutor(max_workers=self.workers) if self.workers > 1 else None
+        max_in_flight = self.workers * 4
+        pending = deque()  # (path, digest, cached transcript, pending future)
+        cache_hits = 0
         
-        for path in episode_paths:
-            try:
-                transcript = self.parse_transcript(path)
-                transcripts.append(transcript)
-            except Exception as e:
-                print(f"Error parsing {path}: {e}")
-                continue
+        try:
+            for path in episode_paths:
+                digest = None
+                cached = None
+                if self.cache:
+                    digest = TranscriptCache.content_hash(path.read_bytes())
+                    cached = self.cache.get(digest)
+                if cached is not None:
+                    # Re-published episodes can share content; slug comes from the path
+                    cached.episode_id = path.parent.name
+                    cache_hits += 1
+                    pending.append((path, digest, cached, None))
+                else:
+                    future = executor.submit(self._parse_safe, path) if executor else None
+                    pending.append((path, digest, None, future))
+                
+                while len(pending) > max_in_flight:
+                    yield from self._resolve_pending(*pending.popleft())
+            
+            while pending:
+                yield from self._resolve_pending(*pending.popleft())
+        finally:
+            if executor:
+                executor.shutdown(cancel_futures=True)
         
-        return transcripts
+        if self.cache:
+            print(f"  Transcript cache: {cache_hits} hits, {len(episode_paths) - cache_hits} parsed")
+    
+    def _resolve_pending(
+        self,
+        path: Path,
+        digest: Optional[str],
+        cached: Optional[Transcript],
+        future
+    ) -> Iterator[Transcript]:
+        """Yield the transcript for a queued episode, parsing or awaiting it if needed."""
+        if cached is not None:
+            yield cached
+            return
+        
+        transcript, error = future.result() if future is not None else self._parse_safe(path)
+        if error:
+            print(f"Error parsing {path}: {error}")
+            return
+        if self.cache and digest:
+            self.cache.put(digest, transcript)
+        yield transcript
+    
+    def _parse_safe(self, path: Path) -> Tuple[Optional[Transcript], Optional[str]]:
+        """Parse one transcript, returning (transcript, error) so pool workers never raise."""
+        try:
+            return self.parse_transcript(path), None
+        except Exception as e:
+            return None, str(e)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,285 @@
+"""
+Transcript Scanner - Single-pass extraction of frontmatter and speaker turns.
+
+Replaces split('---') + yaml.safe_load + the multiline SPEAKER_PATTERN regex
+with one linear walk over the lines of a transcript.md file. Only the YAML
+subset that episode frontmatter actually uses is handled inline (plain,
+single- and double-quoted scalars, block lists); anything else falls back to
+yaml.safe_load for that frontmatter block.
+"""
+import datetime
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+
+
+_INT_RE = re.compile(r'^[-+]?(0|[1-9][0-9]*)$')
+_FLOAT_RE = re.compile(r'^[-+]?([0-9]+\.[0-9]*|\.[0-9]+)([eE][-+]?[0-9]+)?$')
+_DATE_RE = re.compile(r'^([0-9]{4})-([0-9]{2})-([0-9]{2})$')
+_NULL_VALUES = {"", "~", "null", "Null", "NULL"}
+# Plain scalars containing any of these may carry YAML semantics we don't model
+_PLAIN_SPECIAL = (": ", " #", "\t")
+_PLAIN_INDICATORS = "[]{}&*!|>%@`\"'#"
+
+
+class _NeedsYaml(Exception):
+    """Raised when frontmatter uses YAML features outside the scanned subset."""
+
+
+@dataclass
+class ScannedTurn:
+    """A speaker turn as found by the scanner."""
+    speaker: str
+    timestamp: str
+    timestamp_seconds: int
+    text: str
+    turn_index: int
+
+
+def timestamp_to_seconds(timestamp: str) -> Optional[int]:
+    """Convert 'HH:MM:SS' (or 'MM:SS') to integer seconds; None if malformed."""
+    seconds = 0
+    parts = timestamp.split(':')
+    if len(parts) not in (2, 3):
+        return None
+    for part in parts:
+        if not part.isdigit():
+            return None
+        seconds = seconds * 60 + int(part)
+    return seconds
+
+
+def scan_transcript(content: str) -> Tuple[Dict[str, Any], List[ScannedTurn], str]:
+    """
+    Scan a transcript in one pass.
+
+    Args:
+        content: Raw transcript.md content
+
+    Returns:
+        (frontmatter dict, speaker turns, body text). The body text is only
+        needed by callers that fall back to paragraph parsing when no turns
+        are found.
+    """
+    lines = content.split('\n')
+    if not lines or lines[0].strip() != '---':
+        raise ValueError("Missing frontmatter")
+
+    # Frontmatter: lines[1:end]
+    end = 1
+    while end < len(lines) and lines[end].rstrip() != '---':
+        end += 1
+    if end >= len(lines):
+        raise ValueError("Unterminated frontmatter")
+
+    frontmatter_lines = lines[1:end]
+    try:
+        frontmatter = _scan_frontmatter(frontmatter_lines)
+    except _NeedsYaml:
+        frontmatter = yaml.safe_load('\n'.join(frontmatter_lines)) or {}
+
+    turns = _scan_turns(lines, end + 1)
+    body = '\n'.join(lines[end + 1:]) if not turns else ""
+    return frontmatter, turns, body
+
+
+def _scan_turns(lines: List[str], start: int) -> List[ScannedTurn]:
+    """Walk body lines, opening a new turn at every 'Speaker (HH:MM:SS):' header."""
+    turns: List[ScannedTurn] = []
+    speaker = ""
+    timestamp = ""
+    seconds = 0
+    text_parts: List[str] = []
+    in_turn = False
+    header_idx = -1
+
+    def flush():
+        text = ' '.join(text_parts)
+        if text:
+            turns.append(ScannedTurn(
+                speaker=speaker,
+                timestamp=timestamp,
+                timestamp_seconds=seconds,
+                text=text,
+                turn_index=header_idx
+            ))
+
+    for line_no in range(start, len(lines)):
+        line = lines[line_no].strip()
+        if not line:
+            continue
+
+        header = _parse_header(line)
+        if header is not None:
+            if in_turn:
+                flush()
+            header_speaker, timestamp, seconds, inline_text = header
+            # "(00:06:29):" continues the previous speaker
+            if header_speaker:
+                speaker = header_speaker
+            text_parts = [inline_text] if inline_text else []
+            in_turn = True
+            header_idx += 1
+        elif in_turn:
+            text_parts.append(line)
+        # Lines before the first header (title, "## Transcript") are skipped
+
+    if in_turn:
+        flush()
+    return turns
+
+
+def _parse_header(line: str) -> Optional[Tuple[str, str, int, str]]:
+    """Parse 'Speaker (HH:MM:SS): [text]' -> (speaker, timestamp, seconds, text)."""
+    close = line.find('):')
+    if close <= 0:
+        return None
+    open_paren = line.rfind('(', 0, close)
+    if open_paren < 0:
+        return None
+    timestamp = line[open_paren + 1:close]
+    seconds = timestamp_to_seconds(timestamp)
+    if seconds is None:
+        return None
+    speaker = line[:open_paren].strip()
+    if speaker.startswith('#'):
+        return None
+    return speaker, timestamp, seconds, line[close + 2:].strip()
+
+
+def _scan_frontmatter(lines: List[str]) -> Dict[str, Any]:
+    """Scan flat 'key: value' frontmatter with quoted/plain scalars and block lists."""
+    result: Dict[str, Any] = {}
+    i = 0
+    n = len(lines)
+    while i < n:
+        line = lines[i]
+        if not line.strip() or line.lstrip().startswith('#'):
+            i += 1
+            continue
+        if line[0] in ' \t-':
+            raise _NeedsYaml()
+
+        sep = line.find(': ')
+        if sep < 0:
+            if not line.rstrip().endswith(':'):
+                raise _NeedsYaml()
+            key, rest = line.rstrip()[:-1], ""
+        else:
+            key, rest = line[:sep], line[sep + 2:].strip()
+        if not key or key[0] in _PLAIN_INDICATORS:
+            raise _NeedsYaml()
+
+        i += 1
+        if not rest:
+            # Block list (or null)
+            items = []
+            while i < n and lines[i].startswith('- '):
+                value, i = _scan_scalar(lines, i, lines[i][2:].strip(), item=True)
+                items.append(value)
+            result[key] = items if items else None
+        else:
+            result[key], i = _scan_scalar(lines, i, rest)
+    return result
+
+
+def _scan_scalar(lines: List[str], i: int, first: str, item: bool = False) -> Tuple[Any, int]:
+    """
+    Read a scalar that starts with `first` (already stripped).
+
+    `i` is the index of the line after the one `first` came from; returns the
+    value and the index of the next unread line.
+    """
+    if item:
+        i += 1
+    if first[0] == "'":
+        return _scan_quoted(lines, i, first, "'")
+    if first[0] == '"':
+        return _scan_quoted(lines, i, first, '"')
+    if first[0] in _PLAIN_INDICATORS:
+        raise _NeedsYaml()
+
+    # Plain scalar, possibly folded over indented continuation lines
+    parts = [first]
+    while i < len(lines) and lines[i].startswith(' ') and lines[i].strip():
+        parts.append(lines[i].strip())
+        i += 1
+    if i < len(lines) and lines[i].startswith(' '):
+        # Blank-line folding inside plain scalars: leave to YAML
+        raise _NeedsYaml()
+    return _resolve_plain(' '.join(parts)), i
+
+
+def _scan_quoted(lines: List[str], i: int, first: str, quote: str) -> Tuple[str, int]:
+    """Read a (possibly multi-line) quoted scalar with YAML line folding."""
+    pieces: List[str] = []
+    segment = first[1:]
+    while True:
+        closed, text = _quoted_segment(segment, quote)
+        pieces.append(text)
+        if closed:
+            return ''.join(pieces), i
+
+        # Continue on following lines; a single break folds to a space and
+        # each blank line becomes a newline
+        breaks = 0
+        while i < len(lines) and not lines[i].strip():
+            breaks += 1
+            i += 1
+        if i >= len(lines):
+            raise _NeedsYaml()
+        pieces.append('\n' * breaks if breaks else ' ')
+        segment = lines[i].strip()
+        i += 1
+
+
+def _quoted_segment(segment: str, quote: str) -> Tuple[bool, str]:
+    """Decode one line of a quoted scalar. Returns (closed, decoded text)."""
+    out = []
+    j = 0
+    n = len(segment)
+    while j < n:
+        ch = segment[j]
+        if quote == "'" and ch == "'":
+            if j + 1 < n and segment[j + 1] == "'":
+                out.append("'")
+                j += 2
+                continue
+            if segment[j + 1:].strip():
+                raise _NeedsYaml()
+            return True, ''.join(out)
+        if quote == '"':
+            if ch == '"':
+                if segment[j + 1:].strip():
+                    raise _NeedsYaml()
+                return True, ''.join(out)
+            if ch == '\\':
+                # Escapes are rare in frontmatter; let YAML decode them
+                raise _NeedsYaml()
+        out.append(ch)
+        j += 1
+    # Trailing whitespace before a line fold is dropped
+    return False, ''.join(out).rstrip()
+
+
+def _resolve_plain(value: str) -> Any:
+    """Resolve a plain scalar the way yaml.safe_load would for this corpus."""
+    if value in _NULL_VALUES:
+        return None
+    if _INT_RE.match(value):
+        return int(value)
+    if _FLOAT_RE.match(value):
+        return float(value)
+    date_match = _DATE_RE.match(value)
+    if date_match:
+        year, month, day = (int(g) for g in date_match.groups())
+        return datetime.date(year, month, day)
+    if value in ("true", "True", "TRUE", "false", "False", "FALSE") or \
+            value.lower() in ("yes", "no", "on", "off", "y", "n", ".inf", "-.inf", ".nan") or \
+            ':' in value and value.replace(':', '').replace('.', '').isdigit() or \
+            any(marker in value for marker in _PLAIN_SPECIAL):
+        # YAML 1.1 booleans, sexagesimals and the like
+        return yaml.safe_load(value)
+    return value
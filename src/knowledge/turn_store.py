@@ -0,0 +1,295 @@
+"""
+Turn Store - Compact, columnar storage for every speaker turn in the corpus.
+
+Instead of one SpeakerTurn object per turn, the store keeps:
+- interned speaker codes (int32) plus one list of distinct speaker names
+- timestamps as int32 seconds, plus an int8 style code so the original
+  "HH:MM:SS" / "MM:SS" strings come back exactly
+- byte offsets into one shared UTF-8 text buffer
+- per-episode start indexes into the turn columns
+
+Saved as a directory of .npy columns plus a raw text buffer, so the chunker
+and the API can memory-map it instead of re-parsing transcripts.
+"""
+import json
+from array import array
+from dataclasses import asdict
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from .columnar import atomic_write, save_array
+from .transcript_parser import EpisodeMetadata, SpeakerTurn, Transcript
+
+
+FORMAT_VERSION = 1
+
+# Turns are written back to back with this separator, so the text of
+# consecutive turns i..j is one slice equal to " ".join(turn texts)
+TURN_SEPARATOR = b" "
+
+
+# Timestamp renderings, indexed by the codes in timestamp_styles.npy
+TIMESTAMP_STYLES = ("HH:MM:SS", "MM:SS")
+
+
+def format_timestamp(seconds: int, style: int = 0) -> str:
+    """Format integer seconds as HH:MM:SS (style 0) or MM:SS (style 1, total minutes)."""
+    if style == 1:
+        return f"{seconds // 60:02d}:{seconds % 60:02d}"
+    return f"{seconds // 3600:02d}:{(seconds % 3600) // 60:02d}:{seconds % 60:02d}"
+
+
+def timestamp_style(timestamp: str, seconds: int) -> int:
+    """Style code that reproduces `timestamp` from `seconds`, or -1 if none does."""
+    for style in range(len(TIMESTAMP_STYLES)):
+        if format_timestamp(seconds, style) == timestamp:
+            return style
+    return -1
+
+
+class TurnStore:
+    """
+    Columnar, memory-mappable store of speaker turns.
+
+    Layout on disk:
+        {path}/meta.json              speakers, episode ids, episode metadata, unstyled timestamps
+        {path}/text.bin               UTF-8 turn texts separated by TURN_SEPARATOR
+        {path}/text_offsets.npy       int64[num_turns + 1] byte offsets into text.bin
+        {path}/speaker_codes.npy      int32[num_turns] index into meta["speakers"]
+        {path}/timestamps.npy         int32[num_turns] seconds from episode start
+        {path}/timestamp_styles.npy   int8[num_turns] TIMESTAMP_STYLES code (-1: string in meta.json)
+        {path}/turn_indices.npy       int32[num_turns] original turn_index
+        {path}/episode_starts.npy     int64[num_episodes + 1] first turn of each episode
+    """
+
+    def __init__(
+        self,
+        speakers: List[str],
+        episode_ids: List[str],
+        episode_metadata: List[Dict],
+        text: np.ndarray,
+        text_offsets: np.ndarray,
+        speaker_codes: np.ndarray,
+        timestamps: np.ndarray,
+        turn_indices: np.ndarray,
+        episode_starts: np.ndarray,
+        path: Optional[str] = None,
+        timestamp_styles: Optional[np.ndarray] = None,
+        timestamp_strings: Optional[Dict[int, str]] = None
+    ):
+        self.speakers = speakers
+        self.episode_ids = episode_ids
+        self.episode_metadata = episode_metadata
+        self.text = text
+        self.text_offsets = text_offsets
+        self.speaker_codes = speaker_codes
+        self.timestamps = timestamps
+        self.turn_indices = turn_indices
+        self.episode_starts = episode_starts
+        self.path = path
+        # Stores saved without styles render every timestamp as HH:MM:SS
+        self.timestamp_styles = timestamp_styles
+        self.timestamp_strings = timestamp_strings or {}  # position -> timestamp no style reproduces
+        self._episode_positions = {episode_id: i for i, episode_id in enumerate(episode_ids)}
+
+    @classmethod
+    def build(cls, transcripts: Iterable[Transcript], path: str) -> "TurnStore":
+        """
+        Build a store from a stream of transcripts and write it to `path`.
+
+        The text buffer is written to disk as transcripts arrive, so only the
+        integer columns are held in memory while building. Every file is
+        written under a temporary name and renamed into place, so a store
+        already open (memory-mapped) at `path` keeps reading the old files.
+        """
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+
+        speaker_lookup: Dict[str, int] = {}
+        speakers: List[str] = []
+        episode_ids: List[str] = []
+        episode_metadata: List[Dict] = []
+        text_offsets = array("q", [0])
+        speaker_codes = array("i")
+        timestamps = array("i")
+        timestamp_styles = array("b")
+        timestamp_strings: Dict[int, str] = {}
+        turn_indices = array("i")
+        episode_starts = array("q", [0])
+
+        def write_text(tmp_path: str):
+            offset = 0
+            with open(tmp_path, "wb") as text_file:
+                for transcript in transcripts:
+                    for turn in transcript.turns:
+                        code = speaker_lookup.get(turn.speaker)
+                        if code is None:
+                            code = speaker_lookup[turn.speaker] = len(speakers)
+                            speakers.append(turn.speaker)
+
+                        encoded = turn.text.encode("utf-8")
+                        text_file.write(encoded)
+                        text_file.write(TURN_SEPARATOR)
+                        offset += len(encoded) + len(TURN_SEPARATOR)
+
+                        text_offsets.append(offset)
+                        speaker_codes.append(code)
+                        timestamps.append(turn.timestamp_seconds)
+                        style = timestamp_style(turn.timestamp, turn.timestamp_seconds)
+                        if style < 0:
+                            timestamp_strings[len(timestamps) - 1] = turn.timestamp
+                        timestamp_styles.append(style)
+                        turn_indices.append(turn.turn_index)
+
+                    episode_ids.append(transcript.episode_id)
+                    episode_metadata.append(asdict(transcript.metadata))
+                    episode_starts.append(len(speaker_codes))
+
+        atomic_write(path / "text.bin", write_text)
+
+        save_array(path / "text_offsets.npy", np.frombuffer(text_offsets, dtype=np.int64))
+        save_array(path / "speaker_codes.npy", np.frombuffer(speaker_codes, dtype=np.int32))
+        save_array(path / "timestamps.npy", np.frombuffer(timestamps, dtype=np.int32))
+        save_array(path / "timestamp_styles.npy", np.frombuffer(timestamp_styles, dtype=np.int8))
+        save_array(path / "turn_indices.npy", np.frombuffer(turn_indices, dtype=np.int32))
+        save_array(path / "episode_starts.npy", np.frombuffer(episode_starts, dtype=np.int64))
+
+        def write_meta(tmp_path: str):
+            with open(tmp_path, "w") as f:
+                json.dump({
+                    "format_version": FORMAT_VERSION,
+                    "speakers": speakers,
+                    "episode_ids": episode_ids,
+                    "episode_metadata": episode_metadata,
+                    "timestamp_strings": timestamp_strings
+                }, f, default=str)
+        atomic_write(path / "meta.json", write_meta)
+
+        return cls.open(str(path))
+
+    @classmethod
+    def open(cls, path: str) -> "TurnStore":
+        """Open a saved store with all columns memory-mapped."""
+        path = Path(path)
+        with open(path / "meta.json", "r") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported turn store format: {meta.get('format_version')}")
+        styles_path = path / "timestamp_styles.npy"
+
+        text_path = path / "text.bin"
+        if text_path.stat().st_size:
+            text = np.memmap(text_path, dtype=np.uint8, mode="r")
+        else:
+            text = np.zeros(0, dtype=np.uint8)
+
+        return cls(
+            speakers=meta["speakers"],
+            episode_ids=meta["episode_ids"],
+            episode_metadata=meta["episode_metadata"],
+            text=text,
+            text_offsets=np.load(path / "text_offsets.npy", mmap_mode="r"),
+            speaker_codes=np.load(path / "speaker_codes.npy", mmap_mode="r"),
+            timestamps=np.load(path / "timestamps.npy", mmap_mode="r"),
+            turn_indices=np.load(path / "turn_indices.npy", mmap_mode="r"),
+            episode_starts=np.load(path / "episode_starts.npy", mmap_mode="r"),
+            path=str(path),
+            timestamp_styles=np.load(styles_path, mmap_mode="r") if styles_path.exists() else None,
+            timestamp_strings={int(position): timestamp for position, timestamp in meta.get("timestamp_strings", {}).items()}
+        )
+
+    def __len__(self) -> int:
+        return len(self.speaker_codes)
+
+    @property
+    def num_episodes(self) -> int:
+        return len(self.episode_ids)
+
+    def has_episode(self, episode_id: str) -> bool:
+        return episode_id in self._episode_positions
+
+    def episode_range(self, episode_id: str) -> Tuple[int, int]:
+        """Global [start, end) turn positions for an episode."""
+        pos = self._episode_positions[episode_id]
+        return int(self.episode_starts[pos]), int(self.episode_starts[pos + 1])
+
+    def text_span(self, start: int, end: int) -> str:
+        """Decode a byte range of the shared text buffer."""
+        return bytes(self.text[start:end]).decode("utf-8")
+
+    def episode_text(self, episode_id: str, start: int = 0, end: Optional[int] = None) -> str:
+        """
+        Decode a byte range of one episode's text (the whole episode by default).
+
+        Offsets are relative to the episode's first turn, so they stay valid
+        when other episodes are added or removed and the store is rebuilt.
+        """
+        first, last = self.episode_range(episode_id)
+        base = int(self.text_offsets[first])
+        if end is None:
+            end = max(int(self.text_offsets[last]) - len(TURN_SEPARATOR) - base, 0)
+        return self.text_span(base + start, base + end)
+
+    def turn_text(self, position: int) -> str:
+        """Text of the turn at a global position."""
+        start = int(self.text_offsets[position])
+        end = int(self.text_offsets[position + 1]) - len(TURN_SEPARATOR)
+        return self.text_span(start, end)
+
+    def turn_speaker(self, position: int) -> str:
+        return self.speakers[self.speaker_codes[position]]
+
+    def turn_timestamp(self, position: int) -> str:
+        """Timestamp string of the turn at a global position, as parsed."""
+        style = int(self.timestamp_styles[position]) if self.timestamp_styles is not None else 0
+        if style < 0:
+            return self.timestamp_strings[position]
+        return format_timestamp(int(self.timestamps[position]), style)
+
+    def get_episode_metadata(self, episode_id: str) -> Dict:
+        """Frontmatter fields of one episode (as saved in meta.json)."""
+        return self.episode_metadata[self._episode_positions[episode_id]]
+
+    def get_turns(self, episode_id: str) -> List[SpeakerTurn]:
+        """Materialize SpeakerTurn objects for one episode."""
+        start, end = self.episode_range(episode_id)
+        return [
+            SpeakerTurn(
+                speaker=self.turn_speaker(i),
+                timestamp=self.turn_timestamp(i),
+                text=self.turn_text(i),
+                turn_index=int(self.turn_indices[i]),
+                timestamp_seconds=int(self.timestamps[i])
+            )
+            for i in range(start, end)
+        ]
+
+    def get_transcript(self, episode_id: str) -> Optional[Transcript]:
+        """Materialize a full Transcript for one episode (None if unknown)."""
+        if not self.has_episode(episode_id):
+            return None
+        pos = self._episode_positions[episode_id]
+        return Transcript(
+            metadata=EpisodeMetadata(**self.episode_metadata[pos]),
+            turns=self.get_turns(episode_id),
+            episode_id=episode_id
+        )
+
+    def iter_transcripts(self) -> Iterator[Transcript]:
+        """Stream Transcript objects episode by episode, without re-parsing."""
+        for episode_id in self.episode_ids:
+            yield self.get_transcript(episode_id)
+
+
+if __name__ == "__main__":
+    import sys
+    from .transcript_parser import TranscriptParser
+
+    # Build a turn store from the episodes directory
+    # (from the repo root: python -m src.knowledge.turn_store [output_dir])
+    output = sys.argv[1] if len(sys.argv) > 1 else "knowledge_base/turn_store"
+    store = TurnStore.build(TranscriptParser().iter_episodes(), output)
+    print(f"Turn store: {len(store)} turns, {store.num_episodes} episodes, "
+          f"{len(store.speakers)} distinct speakers, {len(store.text) / 1e6:.1f} MB text")
@@ -6,16 +6,162 @@ import numpy as np
 import faiss
 import json
 import pickle
+import shutil
+import threading
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 from pathlib import Path
-from typing import List, Dict, Optional, Tuple
-from dataclasses import dataclass, asdict
-from sentence_transformers import SentenceTransformer
+from typing import Callable, Iterable, Iterator, List, Dict, Optional, Set, Tuple
+from dataclasses import MISSING, dataclass, asdict, fields as dataclass_fields
 import os
 
+from .bm25 import BM25Index
+from .embedding_cache import EmbeddingCache
+from .model_registry import get_dimension, get_encoder
+from .columnar import CategoricalTable, atomic_write, load_array, save_array
+from .concurrency import ReadWriteLock, apply_threading_policy
+from .text_store import TEXT_COMPRESSION, ZSTD_AVAILABLE, BlobTextStore, CompressedTextStore, SpanTextStore, open_text_store
+from .turn_store import TurnStore
 
-@dataclass
+
+# Supported ANN index types and their default parameters (names follow FAISS).
+# None means "derive from the corpus size at training time"; the resolved
+# values are persisted in config.json.
+INDEX_DEFAULTS: Dict[str, Dict] = {
+    "flat": {},
+    "hnsw": {"M": 32, "efConstruction": 200, "efSearch": 64},
+    "ivf_flat": {"nlist": None, "nprobe": 16},
+    "ivf_pq": {"nlist": None, "nprobe": 16, "m": None, "nbits": 8},
+}
+
+# How the index stores vector codes (FAISS factory suffix). Anything but
+# float32 is lossy, so search results are re-ranked against the raw vectors.
+# "pq" takes its m / nbits from the index params, like ivf_pq.
+INDEX_STORAGE: Dict[str, Optional[str]] = {
+    "float32": None,
+    "float16": "SQfp16",
+    "sq8": "SQ8",
+    "pq": "PQ{m}x{nbits}",
+}
+
+
+def resolve_pq_params(params: Dict, dimension: int):
+    """Fill in PQ sub-quantizer count (largest with >= 8 dims per sub-vector) and bits."""
+    if params.get("m") is None:
+        params["m"] = max(m for m in range(1, dimension // 8 + 1) if dimension % m == 0)
+    if params.get("nbits") is None:
+        params["nbits"] = 8
+
+
+def code_bytes(index_type: str, storage: str, dimension: int, params: Dict) -> float:
+    """Bytes per vector the index uses for codes (excluding graph links / list ids)."""
+    if index_type == "ivf_pq" or storage == "pq":
+        params = dict(params)
+        resolve_pq_params(params, dimension)
+        return params["m"] * params["nbits"] / 8
+    return dimension * {"float32": 4, "float16": 2, "sq8": 1}[storage]
+
+
+def create_index(
+    index_type: str,
+    dimension: int,
+    params: Dict,
+    num_vectors: int,
+    storage: str = "float32"
+) -> Tuple[faiss.Index, Dict, int]:
+    """
+    Create an empty (possibly untrained) FAISS index.
+    
+    Args:
+        index_type: One of INDEX_DEFAULTS
+        dimension: Vector dimension
+        params: Index parameters (missing/None values are filled in)
+        num_vectors: Number of vectors the index will be trained on
+        storage: Vector code storage, one of INDEX_STORAGE (ivf_pq is
+            always "pq")
+    
+    Returns:
+        (index, resolved params, minimum number of training vectors)
+    """
+    if index_type not in INDEX_DEFAULTS:
+        raise ValueError(f"Unknown index type: {index_type} (expected one of {list(INDEX_DEFAULTS)})")
+    if storage not in INDEX_STORAGE:
+        raise ValueError(f"Unknown storage: {storage} (expected one of {list(INDEX_STORAGE)})")
+    if index_type == "ivf_pq" and storage not in ("float32", "pq"):
+        raise ValueError(f"ivf_pq always stores PQ codes; use ivf_flat with storage={storage!r}")
+    params = {**INDEX_DEFAULTS[index_type], **params}
+    min_train = 0
+    
+    codes = INDEX_STORAGE[storage]
+    if index_type == "ivf_pq" or storage == "pq":
+        resolve_pq_params(params, dimension)
+        codes = INDEX_STORAGE["pq"].format(**params)
+        min_train = 2 ** params["nbits"]
+    elif codes is not None:
+        min_train = 1  # scalar quantizers learn per-dimension ranges
+    
+    if index_type == "flat":
+        factory = codes or "Flat"
+    elif index_type == "hnsw":
+        factory = f"HNSW{params['M']}" + (f"_{codes}" if codes else "")
+    else:
+        if params["nlist"] is None:
+            # ~4*sqrt(n) lists, keeping >= 39 training points per centroid
+            params["nlist"] = max(1, min(int(4 * np.sqrt(num_vectors)), num_vectors // 39))
+        min_train = max(min_train, params["nlist"])
+        factory = f"IVF{params['nlist']},{codes or 'Flat'}"
+    
+    index = faiss.index_factory(dimension, factory, faiss.METRIC_L2)
+    if index_type == "hnsw":
+        index.hnsw.efConstruction = params["efConstruction"]
+    return index, params, min_train
+
+
+def apply_search_params(index: faiss.Index, index_type: str, params: Dict):
+    """
+    Apply query-time tuning parameters (efSearch / nprobe) to an index.
+    
+    Flat stand-ins for indexes that had too few vectors to train (e.g. the
+    shard of a guest with a handful of chunks) have neither and are skipped.
+    """
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    space = faiss.ParameterSpace()
+    if index_type == "hnsw" and isinstance(inner, faiss.IndexHNSW):
+        space.set_index_parameter(index, "efSearch", params["efSearch"])
+    elif index_type in ("ivf_flat", "ivf_pq") and isinstance(inner, faiss.IndexIVF):
+        space.set_index_parameter(index, "nprobe", params["nprobe"])
+
+
+def add_vectors(index: faiss.Index, vectors: np.ndarray, ids: np.ndarray, keys: Optional[List[str]] = None):
+    """
+    Add vectors under their stable ids (plain indexes number them
+    sequentially; a ShardedIndex routes them by partition key).
+    """
+    if not len(vectors):
+        return
+    if isinstance(index, ShardedIndex):
+        index.add(vectors, ids, keys)
+    elif isinstance(index, faiss.IndexIDMap):
+        index.add_with_ids(vectors, ids)
+    else:
+        index.add(vectors)
+
+
+def publish_days(dates: List[Optional[str]]) -> np.ndarray:
+    """ISO dates as datetime64[D]; unknown dates are NaT, which never satisfies a range filter."""
+    return np.array([str(date)[:10] if date else "NaT" for date in dates], dtype="datetime64[D]")
+
+
+@dataclass(slots=True)
 class ChunkMetadata:
-    """Metadata for a chunk in the vector store."""
+    """
+    Metadata for a chunk in the vector store.
+    
+    The store itself keeps metadata as categorical columns (CategoricalTable)
+    and hands out RecordView objects with the same attributes.
+    """
     chunk_id: str
     guest_id: str
     episode_id: str
@@ -23,6 +169,36 @@ class ChunkMetadata:
     speaker: Optional[str] = None
     timestamp: Optional[str] = None
     token_count: Optional[int] = None
+    speaker_role: Optional[str] = None  # "guest" or "host"
+    publish_date: Optional[str] = None  # ISO date of the episode
+    
+    def __setstate__(self, state):
+        # metadata.pkl from before slots pickled an instance __dict__, possibly
+        # without fields added since (those take their defaults)
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **(state[1] or {})}
+        for field in dataclass_fields(self):
+            object.__setattr__(self, field.name, state.get(field.name, None if field.default is MISSING else field.default))
+
+
+# ChunkMetadata fields stored as plain integers rather than categorical codes
+METADATA_INTEGER_FIELDS = ("token_count",)
+
+
+# Files of the JSON/pickle layout, replaced by the columnar one on save
+LEGACY_FILES = ("chunks.json", "chunk_spans.json", "metadata.pkl", "chunk_id_order.json")
+
+# Metadata fields with inverted position lists for filter pushdown
+FILTER_FIELDS = ("guest_id", "theme_id", "episode_id", "speaker_role")
+# Keys accepted in search_many() filter dicts
+FILTER_KEYS = FILTER_FIELDS + ("date_from", "date_to")
+# Fields a store can be physically partitioned by (one sub-index per value)
+PARTITION_FIELDS = ("guest_id", "episode_id")
+# Fields whose per-value chunk counts get_stats() reports (kept up to date on every change)
+COUNT_FIELDS = ("guest_id", "theme_id", "episode_id")
+# search_many() modes: embedding similarity, BM25 only (no query encoding),
+# or both fused by reciprocal-rank fusion
+SEARCH_MODES = ("vector", "lexical", "hybrid")
 
 
 @dataclass
@@ -34,52 +210,366 @@ class SearchResult:
     metadata: ChunkMetadata
 
 
+def read_index_mmap(index_file: str, index_type: str) -> faiss.Index:
+    """
+    Read a saved index memory-mapped where FAISS supports it.
+    
+    Flat/HNSW codes are mapped in place (IO_FLAG_MMAP_IFC) and IVF inverted
+    lists are served from disk (IO_FLAG_MMAP); both are read-only, so
+    VectorStore copies the index into memory before mutating it.
+    """
+    if index_type.startswith("ivf"):
+        flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+    else:
+        flags = getattr(faiss, "IO_FLAG_MMAP_IFC", faiss.IO_FLAG_MMAP)
+    try:
+        return faiss.read_index(index_file, flags)
+    except RuntimeError:
+        return faiss.read_index(index_file)
+
+
+def search_parameters(index: faiss.Index, selector) -> faiss.SearchParameters:
+    """Search parameters carrying the selector plus the index's own tuning."""
+    if isinstance(index, faiss.IndexIDMap):
+        index = faiss.downcast_index(index.index)
+    if isinstance(index, faiss.IndexHNSW):
+        return faiss.SearchParametersHNSW(sel=selector, efSearch=index.hnsw.efSearch)
+    if isinstance(index, faiss.IndexIVF):
+        return faiss.SearchParametersIVF(sel=selector, nprobe=index.nprobe)
+    return faiss.SearchParameters(sel=selector)
+
+
+def masked_search(
+    index: faiss.Index,
+    query_matrix: np.ndarray,
+    k: int,
+    selector=None,
+    id_mask: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    index.search restricted to the ids set in `id_mask` (`selector` is the
+    same mask as an IDSelectorBitmap); no restriction if None.
+    
+    IndexPQ (flat PQ codes) rejects search-time selectors, so it is searched
+    unrestricted for more hits than needed, doubling until every query has k
+    allowed hits or the index is exhausted, and the hits are filtered by id.
+    """
+    inner = faiss.downcast_index(index.index) if isinstance(index, faiss.IndexIDMap) else index
+    if selector is None:
+        return index.search(query_matrix, k)
+    if not isinstance(inner, faiss.IndexPQ):
+        return index.search(query_matrix, k, params=search_parameters(index, selector))
+    
+    allowed = max(int(np.count_nonzero(id_mask)), 1)
+    fetch = min(index.ntotal, max(2 * k, k * index.ntotal // allowed))
+    while True:
+        distances, ids = index.search(query_matrix, fetch)
+        keep = (ids >= 0) & id_mask[np.maximum(ids, 0)]
+        if fetch >= index.ntotal or keep.sum(axis=1).min() >= k:
+            break
+        fetch = min(index.ntotal, 2 * fetch)
+    # Allowed hits first (stable, so still nearest first), cut to k columns
+    order = np.argsort(~keep, axis=1, kind="stable")[:, :k]
+    out_distances = np.full((len(query_matrix), k), np.inf, dtype=np.float32)
+    out_ids = np.full((len(query_matrix), k), -1, dtype=np.int64)
+    kept = np.take_along_axis(keep, order, axis=1)
+    out_distances[:, :order.shape[1]] = np.where(kept, np.take_along_axis(distances, order, axis=1), np.inf)
+    out_ids[:, :order.shape[1]] = np.where(kept, np.take_along_axis(ids, order, axis=1), -1)
+    return out_distances, out_ids
+
+
+class ShardedIndex:
+    """
+    Physically partitioned ANN index: one id-mapped FAISS index per
+    partition value (e.g. per guest), all in the same id space.
+    
+    Searches scoped to some partitions touch only their shards; unscoped
+    searches fan out over a thread pool (FAISS releases the GIL while
+    searching) and the per-shard top-k lists are merged.
+    
+    Layout ({path}/):
+        shard_{n}.faiss   one FAISS index per shard
+        shards.json       partition value of each shard file
+    """
+    
+    def __init__(
+        self,
+        new_shard: Callable[[np.ndarray, np.ndarray], Tuple[faiss.Index, bool]],
+        max_workers: Optional[int] = None
+    ):
+        """
+        Args:
+            new_shard: Builds a filled shard index from (vectors, ids); also
+                returns False if it is a flat stand-in (too few vectors to train)
+            max_workers: Threads for fan-out searches (default: CPU count, max 8)
+        """
+        self.new_shard = new_shard
+        self.max_workers = max_workers or min(8, os.cpu_count() or 1)
+        self.shards: Dict[str, faiss.Index] = {}
+        # Flat stand-in shards -> size at which training is retried
+        self._untrained: Dict[str, int] = {}
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
+    
+    @property
+    def ntotal(self) -> int:
+        return sum(index.ntotal for index in self.shards.values())
+    
+    def size(self, keys: Optional[List[str]] = None) -> int:
+        """Vectors in the given shards (all if None)."""
+        if keys is None:
+            return self.ntotal
+        return sum(self.shards[key].ntotal for key in keys if key in self.shards)
+    
+    def add(self, vectors: np.ndarray, ids: np.ndarray, keys: List[str]):
+        """Add vectors to the shards of their partition values, creating new shards."""
+        keys = np.asarray(keys, dtype=object)
+        for key in dict.fromkeys(keys.tolist()):
+            rows = np.flatnonzero(keys == key)
+            if key not in self.shards:
+                self.rebuild(key, vectors[rows], ids[rows])
+                continue
+            add_vectors(self.shards[key], vectors[rows], ids[rows])
+            if key in self._untrained and self.shards[key].ntotal >= self._untrained[key]:
+                # Retry training the stand-in now that it has doubled
+                shard = self.shards[key]
+                inner = faiss.downcast_index(shard.index)
+                self.rebuild(key, inner.reconstruct_n(0, inner.ntotal), faiss.vector_to_array(shard.id_map))
+    
+    def rebuild(self, key: str, vectors: np.ndarray, ids: np.ndarray):
+        """Replace one shard with a freshly built one (dropped if empty)."""
+        if not len(vectors):
+            self.shards.pop(key, None)
+            self._untrained.pop(key, None)
+            return
+        self.shards[key], complete = self.new_shard(vectors, ids)
+        if complete:
+            self._untrained.pop(key, None)
+        else:
+            self._untrained[key] = 2 * len(vectors)
+    
+    def search(
+        self,
+        query_matrix: np.ndarray,
+        k: int,
+        keys: Optional[List[str]] = None,
+        selector=None,
+        id_mask: Optional[np.ndarray] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        k nearest ids over the given shards (all if None), FAISS style
+        (distances, ids) with -1 ids where there are fewer than k hits,
+        restricted to `id_mask` / `selector` if given (see masked_search).
+        """
+        keys = list(self.shards) if keys is None else [key for key in keys if key in self.shards]
+        
+        def search_shards(group: List[str]) -> List[Tuple[np.ndarray, np.ndarray]]:
+            results = []
+            for key in group:
+                index = self.shards[key]
+                results.append(masked_search(index, query_matrix, min(k, index.ntotal), selector, id_mask))
+            return results
+        
+        if len(keys) <= 1 or self.max_workers <= 1:
+            results = search_shards(keys)
+        else:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="vector-shard")
+            # One task per worker, each over a contiguous group of shards
+            groups = [list(group) for group in np.array_split(np.array(keys, dtype=object), self.max_workers) if len(group)]
+            results = [result for group in self._executor.map(search_shards, groups) for result in group]
+        
+        distances = np.full((len(query_matrix), k), np.inf, dtype=np.float32)
+        ids = np.full((len(query_matrix), k), -1, dtype=np.int64)
+        if not results:
+            return distances, ids
+        all_distances = np.concatenate([distances] + [result[0] for result in results], axis=1)
+        all_ids = np.concatenate([ids] + [result[1] for result in results], axis=1)
+        all_distances[all_ids < 0] = np.inf
+        top = np.argpartition(all_distances, k - 1, axis=1)[:, :k]
+        top = np.take_along_axis(top, np.argsort(np.take_along_axis(all_distances, top, axis=1), axis=1), axis=1)
+        return np.take_along_axis(all_distances, top, axis=1), np.take_along_axis(all_ids, top, axis=1)
+    
+    def write(self, path: Path):
+        """Write every shard (atomically) plus shards.json; stale shard files are removed."""
+        path = Path(path)
+        path.mkdir(parents=True, exist_ok=True)
+        keys = list(self.shards)
+        for n, key in enumerate(keys):
+            atomic_write(path / f"shard_{n}.faiss", lambda tmp_path: faiss.write_index(self.shards[key], tmp_path))
+        
+        def write_keys(tmp_path: str):
+            with open(tmp_path, "w") as f:
+                json.dump({"keys": keys, "untrained": self._untrained}, f)
+        atomic_write(path / "shards.json", write_keys)
+        for shard_file in path.glob("shard_*.faiss"):
+            if int(shard_file.stem.split("_")[1]) >= len(keys):
+                shard_file.unlink()
+    
+    def read(self, path: Path, index_type: str, mmap: bool = True):
+        """Load shards written by write(), memory-mapped where FAISS supports it."""
+        path = Path(path)
+        with open(path / "shards.json", "r") as f:
+            spec = json.load(f)
+        self.shards = {}
+        for n, key in enumerate(spec["keys"]):
+            shard_file = str(path / f"shard_{n}.faiss")
+            self.shards[key] = read_index_mmap(shard_file, index_type) if mmap else faiss.read_index(shard_file)
+        self._untrained = spec.get("untrained", {})
+
+
 class VectorStore:
     """
     FAISS-based vector store for RAG.
     
     Stores:
     - Chunk embeddings
-    - Chunk text
+    - Chunk text (as spans into the memory-mapped TurnStore when available)
     - Metadata (guest_id, episode_id, theme_id)
     
     Supports:
     - Semantic search
-    - Metadata filtering (by guest_id, theme_id, etc.)
+    - Metadata filtering (by guest_id, theme_id, episode_id, speaker_role and
+      publish-date range), pushed down into FAISS as an ID selector
+    - Pluggable ANN index types (flat, hnsw, ivf_flat, ivf_pq). The raw
+      float32 vectors are kept alongside the index, so it can be rebuilt as
+      another type and its recall measured against an exact search.
+    - Quantized index storage (float16, sq8, pq): the index holds 2-16x
+      smaller codes, and a short candidate list is re-ranked exactly against
+      the raw vectors (memory-mapped once the store is saved and loaded).
+    - Upserts and deletes on a live index: every vector has a stable int64
+      id (IndexIDMap2), removed chunks become tombstones that searches skip,
+      and compaction drops them in the background once they pile up.
+    - Optional physical partitioning by guest or episode (ShardedIndex):
+      scoped searches only touch their shard, unscoped ones fan out.
+    - Concurrent use: searches share a read lock (FAISS and the encoder
+      release the GIL), mutations take it exclusively; an optional
+      threading policy divides the cores between and within searches.
     """
     
     def __init__(
         self,
         embedding_model: str = "all-MiniLM-L6-v2",
         dimension: Optional[int] = None,
-        index_path: Optional[str] = None
+        index_path: Optional[str] = None,
+        turn_store: Optional[TurnStore] = None,
+        index_type: str = "flat",
+        index_params: Optional[Dict] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        storage: str = "float32",
+        rerank_factor: int = 4,
+        partition_by: Optional[str] = None,
+        shard_workers: Optional[int] = None,
+        threading_policy: Optional[str] = None,
+        num_threads: Optional[int] = None,
+        query_backend: Optional[str] = None,
+        text_compression: Optional[str] = None
     ):
         """
         Initialize vector store.
         
         Args:
-            embedding_model: Sentence transformer model name
-            dimension: Embedding dimension (auto-detected if None)
+            embedding_model: Sentence transformer model name (shared through
+                the model registry and loaded on first encode)
+            dimension: Embedding dimension (from the model if None; a loaded
+                store uses the dimension recorded in its config.json)
             index_path: Path to save/load index
+            turn_store: Turn store that chunk spans point into (when loading,
+                defaults to the one recorded with the saved index)
+            index_type: ANN index type for a new store (see INDEX_DEFAULTS);
+                a loaded store keeps the type recorded in its config.json
+            index_params: Overrides for the index type's default parameters
+            embedding_cache: Persistent cache consulted before encoding chunk
+                texts (must belong to the same embedding model)
+            storage: Vector code storage in the index for a new store (see
+                INDEX_STORAGE); a loaded store keeps its recorded storage
+            rerank_factor: With lossy storage, k * rerank_factor index hits
+                are re-ranked by exact distance (1 disables re-ranking)
+            partition_by: Keep one sub-index per value of this field (see
+                PARTITION_FIELDS) for a new store; a loaded store keeps its
+                recorded partitioning
+            shard_workers: Threads for searches fanned out over shards
+            threading_policy: "intra_query" or "inter_query" (see
+                concurrency.py); None leaves FAISS/BLAS threading alone
+            num_threads: Cores the threading policy may use (default: all)
+            query_backend: Encoder backend for search queries ("torch" or
+                "onnx", see encoders.py); chunks are always embedded with
+                the default backend
+            text_compression: How save() writes chunk texts: None (spans and
+                memory-mapped inline texts) or "zstd" (all texts compressed
+                in memory on load, see CompressedTextStore); a loaded store
+                keeps the compression its texts were saved with
         """
         self.embedding_model_name = embedding_model
-        self.encoder = SentenceTransformer(embedding_model)
+        self.query_backend = query_backend
+        self.embedding_cache = embedding_cache
+        self.dimension = dimension or get_dimension(embedding_model)
+        self.index_path = index_path
         
-        # Get dimension from model
-        if dimension is None:
-            # Create a dummy embedding to get dimension
-            test_embedding = self.encoder.encode(["test"])
-            dimension = test_embedding.shape[1]
+        # FAISS index (L2 distance). Built lazily for types that need
+        # training, from the raw vectors kept in self.vectors
+        if index_type not in INDEX_DEFAULTS:
+            raise ValueError(f"Unknown index type: {index_type} (expected one of {list(INDEX_DEFAULTS)})")
+        if storage not in INDEX_STORAGE:
+            raise ValueError(f"Unknown storage: {storage} (expected one of {list(INDEX_STORAGE)})")
+        self.index_type = index_type
+        self.index_params = {**INDEX_DEFAULTS[index_type], **(index_params or {})}
+        self.storage = storage
+        self.rerank_factor = rerank_factor
+        if text_compression not in TEXT_COMPRESSION:
+            raise ValueError(f"Unknown text compression: {text_compression} (expected one of {list(TEXT_COMPRESSION)})")
+        if text_compression == "zstd" and not ZSTD_AVAILABLE:
+            raise ImportError("zstandard is not installed. Install with: pip install zstandard")
+        self.text_compression = text_compression
+        if partition_by is not None and partition_by not in PARTITION_FIELDS:
+            raise ValueError(f"Cannot partition by {partition_by} (expected one of {list(PARTITION_FIELDS)})")
+        self.partition_by = partition_by
+        self.shard_workers = shard_workers
+        self._index = None  # faiss.Index, or ShardedIndex when partitioned
+        self._index_stale = True
+        # Set while self._index is memory-mapped from this file/shard directory (read-only for IVF)
+        self._index_file: Optional[str] = None
+        self._vector_blocks: List[np.ndarray] = []
+        self.recall_report: Optional[Dict] = None
         
-        self.dimension = dimension
-        self.index_path = index_path
+        # Stable id per row of self.vectors (ascending, never reused). Removed
+        # rows stay in place as tombstones until compaction drops them
+        self._id_blocks: List[np.ndarray] = []
+        self._next_id = 0
+        self._tombstones: Set[int] = set()
+        self._row_of_chunk: Optional[Dict[str, int]] = None  # live rows, built lazily
+        self.auto_compact = True
+        self.compaction_ratio = 0.2  # tombstone fraction that triggers compaction
+        self._compaction: Optional[threading.Thread] = None
+        self._generation = 0  # bumped by every compaction swap and load
+        # Searches hold the read side; anything that changes rows, ids or
+        # the index holds the write side
+        self._lock = ReadWriteLock()
+        self._build_lock = threading.Lock()  # lazy index (re)builds under the read lock
+        self._search_slots: Optional[threading.BoundedSemaphore] = None
+        self.threading = None
+        if threading_policy:
+            self.set_threading_policy(threading_policy, num_threads)
         
-        # FAISS index (L2 distance)
-        self.index = faiss.IndexFlatL2(dimension)
+        # Filter pushdown: per-field value -> index positions, built lazily
+        self._postings: Optional[Dict[str, Dict[str, np.ndarray]]] = None
+        self._publish_days: Optional[np.ndarray] = None
+        # Filtered searches over at most this many candidates are done exactly
+        self.exact_filter_threshold = 4096
+        # Live chunks per value of each COUNT_FIELDS field (None until counted
+        # for a loaded store)
+        self._counts: Optional[Dict[str, Counter]] = {field: Counter() for field in COUNT_FIELDS}
+        
+        # BM25 over chunk texts, keyed by the same stable ids as the index
+        # (None until built for stores loaded from saves without one)
+        self._bm25: Optional[BM25Index] = BM25Index()
+        self.rrf_k = 60  # reciprocal-rank fusion constant
+        self.fusion_depth = 50  # hits per ranking fed into the fusion
         
         # Storage for texts and metadata
-        self.chunks: Dict[str, str] = {}  # chunk_id -> text
-        self.metadata: Dict[str, ChunkMetadata] = {}  # chunk_id -> metadata
+        self.chunks = SpanTextStore(turn_store)  # chunk_id -> text
+        self.metadata = CategoricalTable(ChunkMetadata, "chunk_id", METADATA_INTEGER_FIELDS)  # chunk_id -> metadata view
         self.chunk_id_order: List[str] = []  # Track order for FAISS index mapping
         
         # Load if index exists
@@ -91,31 +581,23 @@ class VectorStore:
         chunk_id: str,
         text: str,
         metadata: ChunkMetadata,
-        embedding: Optional[np.ndarray] = None
+        embedding: Optional[np.ndarray] = None,
+        span: Optional[Tuple[str, int, int]] = None
     ):
         """
-        Add a chunk to the vector store.
+        Add a chunk to the vector store (replacing a stored chunk with the same id).
         
         Args:
             chunk_id: Unique identifier
             text: Chunk text
             metadata: Chunk metadata
             embedding: Pre-computed embedding (optional)
+            span: (episode_id, start, end) of the text in the turn store; the
+                text itself is then not kept in memory
         """
-        # Compute embedding if not provided
-        if embedding is None:
-            embedding = self.encoder.encode([text])[0]
-        
-        # Ensure embedding is the right shape and type
-        embedding = np.array(embedding, dtype=np.float32).reshape(1, -1)
-        
-        # Add to index
-        self.index.add(embedding)
-        
-        # Store text and metadata
-        self.chunks[chunk_id] = text
-        self.metadata[chunk_id] = metadata
-        self.chunk_id_order.append(chunk_id)
+        chunk = {"chunk_id": chunk_id, "text": text, "metadata": metadata, "span": span}
+        embeddings = None if embedding is None else np.asarray(embedding).reshape(1, -1)
+        self.upsert_chunks([chunk], embeddings)
     
     def add_chunks_batch(
         self,
@@ -125,28 +607,355 @@ class VectorStore:
         """
         Add multiple chunks at once (more efficient).
         
+        Same as upsert_chunks: chunks whose id is already stored replace it.
+        
+        Args:
+            chunks: List of dicts with keys: chunk_id, text, metadata and
+                optionally span (episode_id, start, end)
+            embeddings: Pre-computed embeddings (optional)
+        """
+        self.upsert_chunks(chunks, embeddings)
+    
+    def upsert_chunks(
+        self,
+        chunks: List[Dict],
+        embeddings: Optional[np.ndarray] = None
+    ) -> int:
+        """
+        Insert chunks, replacing stored chunks with the same chunk_id.
+        
+        Replaced entries are tombstoned and the new vectors appended with new
+        ids, so the live index is updated without a rebuild.
+        
         Args:
-            chunks: List of dicts with keys: chunk_id, text, metadata
+            chunks: List of dicts with keys: chunk_id, text, metadata and
+                optionally span (episode_id, start, end)
             embeddings: Pre-computed embeddings (optional)
+        
+        Returns:
+            Number of chunks that replaced a stored one
         """
+        if not chunks:
+            return 0
         texts = [chunk["text"] for chunk in chunks]
         
         # Compute embeddings if not provided
         if embeddings is None:
-            embeddings = self.encoder.encode(texts)
+            embeddings = self._embed(texts)
         
         # Ensure correct shape and type
         embeddings = np.array(embeddings, dtype=np.float32)
         
-        # Add to index
-        self.index.add(embeddings)
+        with self._lock.write():
+            row_of_chunk = self._chunk_rows()
+            replaced_rows = []
+            for chunk in chunks:
+                row = row_of_chunk.pop(chunk["chunk_id"], None)
+                if row is not None:
+                    self._tombstones.add(row)
+                    replaced_rows.append(row)
+                    self._update_counts(self.metadata[chunk["chunk_id"]], -1)
+            replaced = len(replaced_rows)
+            
+            # Add to index
+            start = len(self.chunk_id_order)
+            keys = None
+            if self.partition_by:
+                keys = [getattr(chunk["metadata"], self.partition_by) for chunk in chunks]
+            self._add_vectors(embeddings, keys)
+            
+            # Store texts and metadata
+            for i, chunk in enumerate(chunks):
+                chunk_id = chunk["chunk_id"]
+                self._store_text(chunk_id, chunk["text"], chunk.get("span"))
+                self.metadata[chunk_id] = chunk["metadata"]
+                self._update_counts(chunk["metadata"], 1)
+                self.chunk_id_order.append(chunk_id)
+                row_of_chunk[chunk_id] = start + i
+            self._extend_postings(start)
+            if self._bm25 is not None:
+                self._bm25.remove(self.row_ids[replaced_rows])
+                self._bm25.add(self.row_ids[start:], texts)
+        
+        if replaced:
+            self._maybe_compact()
+        return replaced
+    
+    def _embed(self, texts: List[str]) -> np.ndarray:
+        """Encode chunk texts, going through the embedding cache if one is set."""
+        if self.embedding_cache is not None:
+            return self.embedding_cache.encode(texts, self.encoder)
+        return self.encoder.encode(texts)
+    
+    @property
+    def vectors(self) -> np.ndarray:
+        """Raw float32 embeddings, one row per entry of chunk_id_order."""
+        if len(self._vector_blocks) != 1:
+            self._vector_blocks = [
+                np.concatenate(self._vector_blocks) if self._vector_blocks
+                else np.zeros((0, self.dimension), dtype=np.float32)
+            ]
+        return self._vector_blocks[0]
+    
+    @property
+    def row_ids(self) -> np.ndarray:
+        """Stable int64 id of each row of self.vectors (ascending)."""
+        if len(self._id_blocks) != 1:
+            self._id_blocks = [
+                np.concatenate(self._id_blocks) if self._id_blocks
+                else np.zeros(0, dtype=np.int64)
+            ]
+        return self._id_blocks[0]
+    
+    def _chunk_rows(self) -> Dict[str, int]:
+        """chunk_id -> row of its live entry."""
+        if self._row_of_chunk is None:
+            self._row_of_chunk = {
+                chunk_id: row for row, chunk_id in enumerate(self.chunk_id_order)
+                if row not in self._tombstones
+            }
+        return self._row_of_chunk
+    
+    def _live_mask(self) -> np.ndarray:
+        mask = np.ones(len(self.chunk_id_order), dtype=bool)
+        if self._tombstones:
+            mask[np.fromiter(self._tombstones, dtype=np.int64)] = False
+        return mask
+    
+    @property
+    def encoder(self):
+        """The shared sentence transformer (see model_registry.py)."""
+        return get_encoder(self.embedding_model_name)
+    
+    @property
+    def query_encoder(self):
+        """Encoder for search queries (the query_backend, if set)."""
+        return get_encoder(self.embedding_model_name, self.query_backend)
+    
+    @property
+    def index(self):
+        """The ANN index (a ShardedIndex when partitioned), (re)built and trained on first use after changes."""
+        if self._index is None or self._index_stale:
+            with self._build_lock:
+                if self._index is None or self._index_stale:
+                    self._build_index()
+        return self._index
+    
+    def set_threading_policy(self, policy: str, num_threads: Optional[int] = None) -> Dict:
+        """
+        Apply a FAISS/BLAS threading policy (process-wide) and bound the
+        number of searches running at once to match it.
         
-        # Store texts and metadata
-        for i, chunk in enumerate(chunks):
-            chunk_id = chunk["chunk_id"]
-            self.chunks[chunk_id] = chunk["text"]
-            self.metadata[chunk_id] = chunk["metadata"]
-            self.chunk_id_order.append(chunk_id)
+        Args:
+            policy: "intra_query" (one search at a time on all cores) or
+                "inter_query" (single-threaded searches, one per core)
+            num_threads: Cores to use (default: all)
+        """
+        self.threading = apply_threading_policy(policy, num_threads)
+        self._search_slots = threading.BoundedSemaphore(self.threading["concurrent_searches"])
+        # Shard fan-out is intra-query parallelism too
+        self.shard_workers = self.threading["threads_per_search"]
+        if isinstance(self._index, ShardedIndex):
+            self._index.max_workers = self.shard_workers
+        return self.threading
+    
+    def _own_index(self):
+        """Swap a memory-mapped index for an in-memory copy before mutating it."""
+        if self._index_file is not None:
+            if isinstance(self._index, ShardedIndex):
+                self._index.read(self._index_file, self.index_type, mmap=False)
+                for shard in self._index.shards.values():
+                    apply_search_params(shard, self.index_type, self.index_params)
+            elif self._index is not None and not self._index_stale:
+                self._index = faiss.read_index(self._index_file)
+                apply_search_params(self._index, self.index_type, self.index_params)
+            self._index_file = None
+    
+    def _add_vectors(self, embeddings: np.ndarray, keys: Optional[List[str]] = None):
+        ids = np.arange(self._next_id, self._next_id + len(embeddings), dtype=np.int64)
+        self._next_id += len(embeddings)
+        self._own_index()
+        self._vector_blocks.append(embeddings)
+        self._id_blocks.append(ids)
+        if self._index is not None and not self._index_stale:
+            # Flat/HNSW and already-trained IVF indexes take new vectors directly
+            add_vectors(self._index, embeddings, ids, keys)
+        else:
+            self._index_stale = True
+    
+    def _new_index(self, vectors: np.ndarray, ids: np.ndarray) -> Tuple[faiss.Index, Dict, bool]:
+        """
+        Create, train and fill an id-mapped index of the configured type.
+        
+        Returns:
+            (index, resolved params, False if it is a flat stand-in because
+            there are too few vectors to train on yet)
+        """
+        index, params, min_train = create_index(
+            self.index_type, self.dimension, self.index_params, len(vectors), self.storage
+        )
+        complete = True
+        if not index.is_trained:
+            if len(vectors) < min_train:
+                # Too few vectors to train yet: serve exact results until there are
+                index = faiss.IndexFlatL2(self.dimension)
+                complete = False
+            else:
+                index.train(vectors)
+        index = faiss.IndexIDMap2(index)
+        if len(vectors):
+            index.add_with_ids(vectors, ids)
+        if complete:
+            apply_search_params(index, self.index_type, params)
+        return index, params, complete
+    
+    def _new_shard(self, vectors: np.ndarray, ids: np.ndarray) -> Tuple[faiss.Index, bool]:
+        # Shards resolve data-dependent params (nlist) from their own size
+        index, _, complete = self._new_index(vectors, ids)
+        return index, complete
+    
+    def _new_search_index(
+        self,
+        vectors: np.ndarray,
+        ids: np.ndarray,
+        keys: Optional[List[str]] = None
+    ) -> Tuple[object, Dict, bool]:
+        """_new_index, or a ShardedIndex over the partition keys of the vectors."""
+        if not self.partition_by:
+            return self._new_index(vectors, ids)
+        index = ShardedIndex(self._new_shard, self.shard_workers)
+        index.add(vectors, ids, keys)
+        return index, self.index_params, True
+    
+    def _partition_keys(self, rows: np.ndarray) -> Optional[List[str]]:
+        if not self.partition_by:
+            return None
+        return self._metadata_column(self.partition_by)[rows].tolist()
+    
+    def _build_index(self):
+        """Build the configured index from the live rows of the raw vectors."""
+        self._index_file = None
+        live = np.flatnonzero(self._live_mask())
+        if self._tombstones:
+            vectors, ids = self.vectors[live], self.row_ids[live]
+        else:
+            vectors, ids = self.vectors, self.row_ids
+        self._index, params, complete = self._new_search_index(vectors, ids, self._partition_keys(live))
+        if complete:
+            self.index_params = params
+        self._index_stale = not complete
+    
+    def rebuild_shard(self, value: str):
+        """
+        Rebuild the sub-index of one partition value from its live rows,
+        e.g. after many upserts of one guest's chunks.
+        """
+        if not self.partition_by:
+            raise ValueError("Store is not partitioned")
+        with self._lock.write():
+            index = self.index
+            self._own_index()
+            index = self._index
+            rows = np.flatnonzero(self._filter_mask({self.partition_by: value}))
+            index.rebuild(value, self.vectors[rows], self.row_ids[rows])
+    
+    def set_partitioning(self, partition_by: Optional[str]):
+        """Partition the index by another field (or none) and rebuild it."""
+        if partition_by is not None and partition_by not in PARTITION_FIELDS:
+            raise ValueError(f"Cannot partition by {partition_by} (expected one of {list(PARTITION_FIELDS)})")
+        with self._lock.write():
+            self.partition_by = partition_by
+            self._build_index()
+    
+    def rebuild_index(
+        self,
+        index_type: Optional[str] = None,
+        measure: bool = True,
+        storage: Optional[str] = None,
+        **params
+    ) -> Optional[Dict]:
+        """
+        Rebuild the ANN index, optionally as another type, storage or with new parameters.
+        
+        Args:
+            index_type: New index type (default: keep the current one)
+            measure: Measure recall@k against exact search afterwards
+            storage: New vector code storage (default: keep the current one)
+            **params: Parameter overrides, e.g. efSearch=128 or nprobe=32
+        
+        Returns:
+            The recall report if measured
+        """
+        with self._lock.write():
+            if index_type and index_type != self.index_type:
+                if index_type not in INDEX_DEFAULTS:
+                    raise ValueError(f"Unknown index type: {index_type} (expected one of {list(INDEX_DEFAULTS)})")
+                self.index_type = index_type
+                self.index_params = dict(INDEX_DEFAULTS[index_type])
+            if storage and storage != self.storage:
+                if storage not in INDEX_STORAGE:
+                    raise ValueError(f"Unknown storage: {storage} (expected one of {list(INDEX_STORAGE)})")
+                self.storage = storage
+                # PQ parameters are derived per storage type
+                for name in ("m", "nbits"):
+                    if name not in INDEX_DEFAULTS[self.index_type]:
+                        self.index_params.pop(name, None)
+            self.index_params.update(params)
+            self._index = None
+            self._build_index()
+        return self.measure_recall() if measure else None
+    
+    def measure_recall(self, k: int = 10, num_queries: int = 200, seed: int = 0) -> Optional[Dict]:
+        """
+        Measure recall@k and latency of the index (including re-ranking)
+        against an exact flat search.
+        
+        Stored vectors are used as queries. The report is kept in
+        self.recall_report, persisted in config.json and shown by get_stats.
+        
+        Returns:
+            Report dict, or None for an empty store
+        """
+        with self._lock.read():
+            live = np.flatnonzero(self._live_mask())
+            if len(live) == 0:
+                return None
+            vectors = self.vectors[live] if self._tombstones else self.vectors
+            k = min(k, len(live))
+            rng = np.random.RandomState(seed)
+            queries = np.ascontiguousarray(vectors[rng.choice(len(live), min(num_queries, len(live)), replace=False)])
+            
+            exact = faiss.IndexFlatL2(self.dimension)
+            exact.add(vectors)
+            start = time.perf_counter()
+            _, truth = exact.search(queries, k)
+            truth = live[truth]
+            flat_seconds = time.perf_counter() - start
+            
+            self.index
+            start = time.perf_counter()
+            _, approx = self._ann_search(queries, k, self._live_mask() if self._tombstones else None)
+            index_seconds = time.perf_counter() - start
+            
+            hits = sum(len(set(t) & set(a)) for t, a in zip(truth.tolist(), approx.tolist()))
+            self.recall_report = {
+                "index_type": self.index_type,
+                "storage": self.storage,
+                "rerank_factor": self.rerank_factor if self.reranks else 1,
+                "k": k,
+                "num_queries": len(queries),
+                "recall_at_k": hits / (len(queries) * k),
+                "latency_ms": 1000 * index_seconds / len(queries),
+                "flat_latency_ms": 1000 * flat_seconds / len(queries)
+            }
+            return self.recall_report
+    
+    def _store_text(self, chunk_id: str, text: str, span: Optional[Tuple[str, int, int]]):
+        """Keep a span into the turn store if possible, else the text itself."""
+        if span is not None and self.chunks.turn_store is not None:
+            self.chunks.add_span(chunk_id, *span)
+        else:
+            self.chunks[chunk_id] = text
     
     def search(
         self,
@@ -154,63 +963,629 @@ class VectorStore:
         k: int = 10,
         filter_guest_id: Optional[str] = None,
         filter_theme_id: Optional[str] = None,
-        filter_episode_id: Optional[str] = None
+        filter_episode_id: Optional[str] = None,
+        filter_speaker_role: Optional[str] = None,
+        filter_date_from: Optional[str] = None,
+        filter_date_to: Optional[str] = None,
+        mode: str = "vector"
     ) -> List[SearchResult]:
         """
         Search the vector store with optional metadata filtering.
         
+        Filters are applied inside the index search, so a filtered search
+        returns min(k, number of matching chunks) results (lexical search:
+        at most the number of matching chunks containing a query term).
+        
         Args:
             query: Search query text
             k: Number of results to return
             filter_guest_id: Filter by guest_id
             filter_theme_id: Filter by theme_id
             filter_episode_id: Filter by episode_id
+            filter_speaker_role: Filter by speaker role ("guest" or "host")
+            filter_date_from: Earliest episode publish date (ISO, inclusive)
+            filter_date_to: Latest episode publish date (ISO, inclusive)
+            mode: "vector", "lexical" or "hybrid" (see SEARCH_MODES)
             
         Returns:
             List of SearchResult objects, sorted by relevance
         """
-        # Encode query
-        query_embedding = self.encoder.encode([query])
-        query_embedding = np.array(query_embedding, dtype=np.float32)
-        
-        # Search (get more results if filtering)
-        search_k = k * 10 if any([filter_guest_id, filter_theme_id, filter_episode_id]) else k
+        return self.search_many([query], [{
+            "guest_id": filter_guest_id,
+            "theme_id": filter_theme_id,
+            "episode_id": filter_episode_id,
+            "speaker_role": filter_speaker_role,
+            "date_from": filter_date_from,
+            "date_to": filter_date_to
+        }], k=k, mode=mode)[0]
+    
+    def hybrid_search(
+        self,
+        query: str,
+        k: int = 10,
+        lexical_only: bool = False,
+        **filters
+    ) -> List[SearchResult]:
+        """
+        Search with BM25 and embedding similarity, fused by reciprocal rank.
         
-        distances, indices = self.index.search(query_embedding, min(search_k, self.index.ntotal))
+        Helps queries naming a framework, company or person ("RICE",
+        "Airbnb"), which embedding similarity alone matches poorly.
         
-        results = []
-        for dist, idx in zip(distances[0], indices[0]):
-            if idx >= len(self.chunk_id_order):
-                continue
-            
-            chunk_id = self.chunk_id_order[idx]
-            metadata = self.metadata[chunk_id]
+        Args:
+            query: Search query text
+            k: Number of results to return
+            lexical_only: BM25 only, which skips query encoding entirely
+            **filters: filter_guest_id, filter_theme_id, ... as in search()
             
-            # Apply filters
-            if filter_guest_id and metadata.guest_id != filter_guest_id:
-                continue
-            if filter_theme_id and metadata.theme_id != filter_theme_id:
-                continue
-            if filter_episode_id and metadata.episode_id != filter_episode_id:
-                continue
+        Returns:
+            List of SearchResult objects, sorted by fused relevance
+        """
+        return self.search(query, k, mode="lexical" if lexical_only else "hybrid", **filters)
+    
+    def search_many(
+        self,
+        queries: List[str],
+        filters: Optional[List[Dict]] = None,
+        k: int = 10,
+        mode: str = "vector"
+    ) -> List[List[SearchResult]]:
+        """
+        Search several queries at once.
+        
+        All distinct query texts are encoded in one encoder batch, and queries
+        sharing a filter are answered by one matrix search, so callers that
+        fan out (per theme, per guest) collapse into a single call.
+        
+        Args:
+            queries: Query texts. A single query is paired with every filter dict.
+            filters: One filter dict per query with any of the keys in
+                FILTER_KEYS ("guest_id", "theme_id", "episode_id",
+                "speaker_role", "date_from", "date_to"); None means unfiltered
+            k: Number of results per query
+            mode: "vector" (embedding similarity, score 1 / (1 + L2 distance)),
+                "lexical" (BM25 only, no query encoding, score bm25 / (1 + bm25))
+                or "hybrid" (both, fused by reciprocal rank and scaled so
+                ranking first in both gives 1.0)
             
-            # Convert L2 distance to similarity score (lower distance = higher similarity)
-            score = 1.0 / (1.0 + dist)
+        Returns:
+            One list of SearchResult objects per (query, filter) pair, each
+            sorted by relevance
+        """
+        queries = list(queries)
+        filters = list(filters) if filters is not None else [{}] * len(queries)
+        if len(queries) == 1 and len(filters) > 1:
+            queries = queries * len(filters)
+        if len(queries) != len(filters):
+            raise ValueError(f"Got {len(queries)} queries but {len(filters)} filter dicts")
+        if mode not in SEARCH_MODES:
+            raise ValueError(f"Unknown search mode: {mode} (expected one of {list(SEARCH_MODES)})")
+        if not queries:
+            return []
+        for query_filters in filters:
+            unknown = set(query_filters or {}) - set(FILTER_KEYS)
+            if unknown:
+                raise ValueError(f"Unknown filter keys: {sorted(unknown)}")
+        
+        with self._search_slots or nullcontext():
+            return self._search_many(queries, filters, k, mode)
+    
+    def _search_many(
+        self,
+        queries: List[str],
+        filters: List[Optional[Dict]],
+        k: int,
+        mode: str
+    ) -> List[List[SearchResult]]:
+        query_matrix = None
+        if mode != "lexical":
+            # Encode each distinct query once (outside the lock: no store state involved)
+            unique_queries = list(dict.fromkeys(queries))
+            embeddings = np.array(self.query_encoder.encode(unique_queries), dtype=np.float32)
+            rows = {query: row for row, query in enumerate(unique_queries)}
+            query_matrix = embeddings[[rows[query] for query in queries]]
+        depth = max(k, self.fusion_depth) if mode == "hybrid" else k
+        
+        # One search per distinct filter combination
+        groups: Dict[Tuple, List[int]] = {}
+        for i, query_filters in enumerate(filters):
+            key = tuple((query_filters or {}).get(name) for name in FILTER_KEYS)
+            groups.setdefault(key, []).append(i)
+        
+        # Row positions are only stable while the lock is held (compaction renumbers them)
+        with self._lock.read():
+            ranked: List[Optional[List[Tuple[int, float]]]] = [None] * len(queries)
+            for key, members in groups.items():
+                group_filters = dict(zip(FILTER_KEYS, key))
+                mask = self._filter_mask(group_filters)
+                vector_hits = lexical_hits = None
+                if mode != "lexical":
+                    vector_mask = mask
+                    shards = None
+                    if self.partition_by and group_filters[self.partition_by] is not None:
+                        # Scoped to one shard; if that is the only restriction, no selector is needed
+                        shards = [group_filters[self.partition_by]]
+                        if self._filter_mask({**group_filters, self.partition_by: None}) is None:
+                            vector_mask = None
+                    vector_hits = self._search_vectors(query_matrix[members], depth, vector_mask, shards)
+                if mode != "vector":
+                    lexical_hits = [self._lexical_search(queries[i], depth, mask) for i in members]
+                
+                for j, i in enumerate(members):
+                    if mode == "vector":
+                        distances, positions = vector_hits[j]
+                        # Convert L2 distance to similarity score (lower distance = higher similarity)
+                        ranked[i] = [(int(p), 1.0 / (1.0 + float(d))) for d, p in zip(distances, positions)]
+                    elif mode == "lexical":
+                        positions, scores = lexical_hits[j]
+                        ranked[i] = [(int(p), float(s) / (1.0 + float(s))) for p, s in zip(positions, scores)]
+                    else:
+                        distances, positions = vector_hits[j]
+                        vector_ranking = positions[np.argsort(distances, kind="stable")]
+                        ranked[i] = self._fuse([vector_ranking, lexical_hits[j][0]], k)
             
-            result = SearchResult(
-                chunk_id=chunk_id,
-                text=self.chunks[chunk_id],
-                score=score,
-                metadata=metadata
+            all_results = []
+            for hits in ranked:
+                results = []
+                for position, score in hits:
+                    chunk_id = self.chunk_id_order[position]
+                    results.append(SearchResult(
+                        chunk_id=chunk_id,
+                        text=self.chunks[chunk_id],
+                        score=score,
+                        metadata=self.metadata[chunk_id]
+                    ))
+                # Sort by score (descending)
+                results.sort(key=lambda x: x.score, reverse=True)
+                all_results.append(results)
+        return all_results
+    
+    def _lexical_index(self) -> BM25Index:
+        """The BM25 index, built from the stored texts if the store was loaded without one."""
+        if self._bm25 is None:
+            with self._build_lock:
+                if self._bm25 is None:
+                    bm25 = BM25Index()
+                    live = np.flatnonzero(self._live_mask())
+                    bm25.add(self.row_ids[live], [self.chunks[self.chunk_id_order[row]] for row in live])
+                    self._bm25 = bm25
+        return self._bm25
+    
+    def _lexical_search(
+        self,
+        query: str,
+        k: int,
+        mask: Optional[np.ndarray]
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """(positions, BM25 scores) of the k best live chunks within `mask`, best first."""
+        ids, scores = self._lexical_index().scores(query)
+        # Map stable ids to row positions (row_ids is ascending)
+        row_ids = self.row_ids
+        positions = np.searchsorted(row_ids, ids)
+        found = positions < len(row_ids)
+        found[found] = row_ids[positions[found]] == ids[found]
+        positions, scores = positions[found], scores[found]
+        if mask is not None:
+            keep = mask[positions]
+            positions, scores = positions[keep], scores[keep]
+        
+        if len(scores) > k:
+            top = np.argpartition(-scores, k - 1)[:k]
+            positions, scores = positions[top], scores[top]
+        order = np.lexsort((positions, -scores))
+        return positions[order], scores[order]
+    
+    def _fuse(self, rankings: List[np.ndarray], k: int) -> List[Tuple[int, float]]:
+        """
+        Reciprocal-rank fusion of position rankings (best first): a position
+        scores sum(1 / (rrf_k + rank)) over the rankings it appears in,
+        scaled so that ranking first everywhere gives 1.0.
+        """
+        fused: Dict[int, float] = {}
+        for ranking in rankings:
+            for rank, position in enumerate(ranking.tolist(), 1):
+                fused[position] = fused.get(position, 0.0) + 1.0 / (self.rrf_k + rank)
+        scale = len(rankings) / (self.rrf_k + 1)
+        best = sorted(fused.items(), key=lambda item: (-item[1], item[0]))[:k]
+        return [(position, score / scale) for position, score in best]
+    
+    def _search_vectors(
+        self,
+        query_matrix: np.ndarray,
+        k: int,
+        mask: Optional[np.ndarray],
+        shards: Optional[List[str]] = None
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """
+        (distances, positions) of the k nearest vectors for each (n, d) query
+        row, restricted to `mask` if given (and to `shards` of a partitioned
+        index, which must cover the mask).
+        
+        Large filtered candidate sets are searched in the ANN index through an
+        IDSelectorBitmap; small ones, and rows whose ANN search comes back
+        with fewer than k hits (e.g. HNSW graph walks cut off by the filter),
+        are answered exactly over the candidate vectors.
+        """
+        empty = (np.zeros(0, dtype=np.float32), np.zeros(0, dtype=np.int64))
+        if mask is None:
+            k = min(k, self._index_size(shards))
+            if k == 0:
+                return [empty] * len(query_matrix)
+            distances, positions = self._ann_search(query_matrix, k, shards=shards)
+            valid = positions >= 0
+            return [(d[v], p[v]) for d, p, v in zip(distances, positions, valid)]
+        
+        candidates = np.flatnonzero(mask)
+        k = min(k, len(candidates))
+        if k == 0:
+            return [empty] * len(query_matrix)
+        
+        hits: List[Optional[Tuple[np.ndarray, np.ndarray]]] = [None] * len(query_matrix)
+        if len(candidates) > self.exact_filter_threshold:
+            distances, positions = self._ann_search(query_matrix, k, mask, shards)
+            for row in range(len(query_matrix)):
+                valid = positions[row] >= 0
+                if valid.sum() >= k:
+                    hits[row] = (distances[row][valid], positions[row][valid])
+        
+        short = [row for row, hit in enumerate(hits) if hit is None]
+        if short:
+            for row, hit in zip(short, self._exact_search(query_matrix[short], candidates, k)):
+                hits[row] = hit
+        return hits
+    
+    @property
+    def reranks(self) -> bool:
+        """Whether index hits are re-ranked exactly (lossy vector codes)."""
+        lossy = self.storage != "float32" or self.index_type == "ivf_pq"
+        return lossy and self.rerank_factor > 1
+    
+    def _index_size(self, shards: Optional[List[str]] = None) -> int:
+        index = self.index
+        return index.size(shards) if isinstance(index, ShardedIndex) else index.ntotal
+    
+    def _ann_search(
+        self,
+        query_matrix: np.ndarray,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+        shards: Optional[List[str]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        _index_search, re-ranked: with lossy storage the index returns
+        k * rerank_factor candidates, ordered by exact distance to the raw
+        vectors, and the best k are kept.
+        """
+        if not self.reranks:
+            return self._index_search(query_matrix, k, mask, shards)
+        limit = self._index_size(shards) if mask is None else int(np.count_nonzero(mask))
+        _, positions = self._index_search(query_matrix, min(k * self.rerank_factor, limit), mask, shards)
+        return self._rerank(query_matrix, positions, k)
+    
+    def _rerank(
+        self,
+        query_matrix: np.ndarray,
+        positions: np.ndarray,
+        k: int,
+        block_size: int = 256
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Exact squared-L2 top-k among each query row's candidate positions (-1 = none)."""
+        vectors = self.vectors
+        k = min(k, positions.shape[1])
+        out_distances = np.full((len(query_matrix), k), np.inf, dtype=np.float32)
+        out_positions = np.full((len(query_matrix), k), -1, dtype=np.int64)
+        # Blocks of queries bound the gathered (queries, candidates, dim) array
+        for start in range(0, len(query_matrix), block_size):
+            block = slice(start, start + block_size)
+            candidates = positions[block]
+            valid = candidates >= 0
+            diff = vectors[np.where(valid, candidates, 0)] - query_matrix[block, None, :]
+            distances = np.einsum("qcd,qcd->qc", diff, diff)
+            distances[~valid] = np.inf
+            order = np.argsort(distances, axis=1)[:, :k]
+            out_distances[block] = np.take_along_axis(distances, order, axis=1)
+            out_positions[block] = np.where(
+                np.isfinite(out_distances[block]), np.take_along_axis(candidates, order, axis=1), -1
             )
-            results.append(result)
-            
-            if len(results) >= k:
-                break
+        return out_distances, out_positions
+    
+    def _index_search(
+        self,
+        query_matrix: np.ndarray,
+        k: int,
+        mask: Optional[np.ndarray] = None,
+        shards: Optional[List[str]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search the ANN index, restricted to the rows in `mask` if given (and
+        to `shards` of a partitioned index).
+        
+        The mask is translated to an IDSelectorBitmap over stable ids, and
+        the ids FAISS returns are translated back to rows (-1 = no hit).
+        """
+        index = self.index
+        selector = id_mask = None
+        if mask is not None:
+            id_mask = np.zeros(self._next_id, dtype=bool)
+            id_mask[self.row_ids[mask]] = True
+            bitmap = np.packbits(id_mask, bitorder="little")
+            selector = faiss.IDSelectorBitmap(len(id_mask), faiss.swig_ptr(bitmap))
+        if isinstance(index, ShardedIndex):
+            distances, ids = index.search(query_matrix, k, shards, selector, id_mask)
+        else:
+            distances, ids = masked_search(index, query_matrix, k, selector, id_mask)
+        rows = np.searchsorted(self.row_ids, ids)
+        rows[ids < 0] = -1
+        return distances, rows
+    
+    def _exact_search(
+        self,
+        query_matrix: np.ndarray,
+        candidates: np.ndarray,
+        k: int
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Brute-force squared-L2 top-k over the raw vectors at `candidates`, per query row."""
+        candidate_vectors = self.vectors[candidates]
+        distances = (
+            np.einsum("ij,ij->i", query_matrix, query_matrix)[:, None]
+            - 2.0 * query_matrix @ candidate_vectors.T
+            + np.einsum("ij,ij->i", candidate_vectors, candidate_vectors)[None, :]
+        )
+        np.maximum(distances, 0.0, out=distances)
+        if k < len(candidates):
+            top = np.argpartition(distances, k - 1, axis=1)[:, :k]
+        else:
+            top = np.tile(np.arange(len(candidates)), (len(query_matrix), 1))
+        hits = []
+        for row_distances, row_top in zip(distances, top):
+            row_top = row_top[np.argsort(row_distances[row_top])]
+            hits.append((row_distances[row_top], candidates[row_top]))
+        return hits
+    
+    def _filter_mask(self, filters: Dict) -> Optional[np.ndarray]:
+        """
+        Boolean mask over live index positions matching all active filters
+        (None if there are neither filters nor tombstones).
+        """
+        active = any(value is not None for value in filters.values())
+        if not active and not self._tombstones:
+            return None
+        mask = self._live_mask()
+        if not active:
+            return mask
+        if self._postings is None:
+            self._build_postings()
+        
+        n = len(self.chunk_id_order)
+        for field in FILTER_FIELDS:
+            value = filters.get(field)
+            if value is None:
+                continue
+            field_mask = np.zeros(n, dtype=bool)
+            field_mask[self._postings[field].get(value, np.zeros(0, dtype=np.int64))] = True
+            mask &= field_mask
+        if filters.get("date_from"):
+            mask &= self._publish_days >= np.datetime64(filters["date_from"][:10], "D")
+        if filters.get("date_to"):
+            mask &= self._publish_days <= np.datetime64(filters["date_to"][:10], "D")
+        return mask
+    
+    def _metadata_column(self, field: str) -> np.ndarray:
+        """One ChunkMetadata field for every index position (object array, None for tombstones)."""
+        keys = self.chunk_id_order
+        if self._tombstones:
+            keys = [None if row in self._tombstones else chunk_id for row, chunk_id in enumerate(keys)]
+        return self.metadata.column(field, keys)
+    
+    def _build_postings(self):
+        """
+        Build per-field inverted lists of index positions, plus publish days.
+        
+        Concurrent searches may build them at the same time, so both are
+        assigned only once complete (publish days first).
+        """
+        all_postings = {}
+        for field in FILTER_FIELDS:
+            postings: Dict[str, List[int]] = {}
+            for position, value in enumerate(self._metadata_column(field).tolist()):
+                if value is not None:
+                    postings.setdefault(value, []).append(position)
+            all_postings[field] = {
+                value: np.array(positions, dtype=np.int64) for value, positions in postings.items()
+            }
+        
+        self._publish_days = publish_days(self._metadata_column("publish_date").tolist())
+        self._postings = all_postings
+    
+    def _extend_postings(self, start: int):
+        """Add the rows appended from `start` on to already built postings."""
+        if self._postings is None:
+            return
+        appended: Dict[str, Dict[str, List[int]]] = {field: {} for field in FILTER_FIELDS}
+        dates = []
+        for position in range(start, len(self.chunk_id_order)):
+            metadata = self.metadata[self.chunk_id_order[position]]
+            for field in FILTER_FIELDS:
+                value = getattr(metadata, field)
+                if value is not None:
+                    appended[field].setdefault(value, []).append(position)
+            dates.append(metadata.publish_date)
+        
+        for field, values in appended.items():
+            postings = self._postings[field]
+            for value, positions in values.items():
+                new_positions = np.array(positions, dtype=np.int64)
+                postings[value] = np.concatenate([postings[value], new_positions]) if value in postings else new_positions
+        self._publish_days = np.concatenate([self._publish_days, publish_days(dates)])
+    
+    def _count(self, field: str, value: Optional[str], delta: int):
+        if value is None:
+            return
+        counts = self._counts[field]
+        counts[value] += delta
+        if counts[value] <= 0:
+            del counts[value]
+    
+    def _update_counts(self, metadata: ChunkMetadata, delta: int):
+        """Add (delta=1) or remove (delta=-1) one chunk from the per-field counts."""
+        if self._counts is None:
+            return
+        for field in COUNT_FIELDS:
+            self._count(field, getattr(metadata, field), delta)
+    
+    def _field_counts(self) -> Dict[str, Counter]:
+        """Per-field chunk counts, counted once from the metadata columns after a load."""
+        counts = self._counts
+        if counts is None:
+            counts = {
+                field: Counter(value for value in self._metadata_column(field).tolist() if value is not None)
+                for field in COUNT_FIELDS
+            }
+            self._counts = counts
+        return counts
+    
+    def _invalidate_filters(self):
+        self._postings = None
+        self._publish_days = None
+    
+    def set_theme_ids(self, assignments: Dict[str, Optional[str]]):
+        """
+        Update chunk theme assignments.
+        
+        Args:
+            assignments: Dict[chunk_id] = theme_id or None
+        """
+        with self._lock.write():
+            for chunk_id, theme_id in assignments.items():
+                metadata = self.metadata[chunk_id]
+                if self._counts is not None:
+                    self._count("theme_id", metadata.theme_id, -1)
+                    self._count("theme_id", theme_id, 1)
+                metadata.theme_id = theme_id
+            self._invalidate_filters()
+    
+    def remove_chunks(self, chunk_ids: List[str]) -> int:
+        """
+        Remove chunks (embedding, text and metadata) from the store.
+        
+        Their index entries become tombstones, skipped by every search until
+        compaction drops them.
+        
+        Args:
+            chunk_ids: Chunk ids to remove; unknown ids are ignored
+        
+        Returns:
+            Number of chunks removed
+        """
+        with self._lock.write():
+            row_of_chunk = self._chunk_rows()
+            removed_rows = []
+            for chunk_id in chunk_ids:
+                row = row_of_chunk.pop(chunk_id, None)
+                if row is None:
+                    continue
+                self._tombstones.add(row)
+                self._update_counts(self.metadata[chunk_id], -1)
+                del self.chunks[chunk_id]
+                del self.metadata[chunk_id]
+                removed_rows.append(row)
+            removed = len(removed_rows)
+            if removed and self._bm25 is not None:
+                self._bm25.remove(self.row_ids[removed_rows])
+        
+        if removed:
+            self._maybe_compact()
+        return removed
+    
+    def remove_episode(self, episode_id: str) -> int:
+        """Remove every chunk of an episode. Returns the number removed."""
+        return self._remove_matching({"episode_id": episode_id})
+    
+    def remove_guest(self, guest_id: str) -> int:
+        """Remove every chunk of a guest. Returns the number removed."""
+        return self._remove_matching({"guest_id": guest_id})
+    
+    def _remove_matching(self, filters: Dict) -> int:
+        with self._lock.write():
+            rows = np.flatnonzero(self._filter_mask(filters))
+            return self.remove_chunks([self.chunk_id_order[row] for row in rows])
+    
+    def _maybe_compact(self):
+        if (
+            self.auto_compact
+            and self._tombstones
+            and len(self._tombstones) >= self.compaction_ratio * len(self.chunk_id_order)
+        ):
+            self.compact(background=True)
+    
+    def compact(self, background: bool = False) -> Optional[threading.Thread]:
+        """
+        Drop tombstoned rows from the raw vectors and rebuild the index from
+        the live rows, keeping their ids.
+        
+        The index is rebuilt without holding the store lock; chunks added or
+        removed meanwhile are carried over before the result is swapped in.
+        
+        Args:
+            background: Run in a daemon thread (returned) instead of blocking
+        """
+        if background:
+            with self._lock.write():
+                if self._compaction is None or not self._compaction.is_alive():
+                    self._compaction = threading.Thread(
+                        target=self._compact, name="vector-store-compaction", daemon=True
+                    )
+                    self._compaction.start()
+                return self._compaction
+        self.wait_for_compaction()
+        self._compact()
+        return None
+    
+    def wait_for_compaction(self):
+        """Block until a running background compaction has finished."""
+        compaction = self._compaction
+        if compaction is not None:
+            compaction.join()
+    
+    def _compact(self):
+        with self._lock.read():
+            if not self._tombstones:
+                return
+            generation = self._generation
+            snapshot_rows = len(self.chunk_id_order)
+            live = np.flatnonzero(self._live_mask())
+            vectors = self.vectors[live]
+            ids = self.row_ids[live]
+            keys = self._partition_keys(live)
         
-        # Sort by score (descending)
-        results.sort(key=lambda x: x.score, reverse=True)
-        return results
+        index, params, complete = self._new_search_index(vectors, ids, keys)
+        
+        with self._lock.write():
+            if self._generation != generation:
+                return  # another compaction (or a load) replaced the rows meanwhile
+            self._generation += 1
+            current_vectors = self.vectors
+            current_ids = self.row_ids
+            # Rows appended while the index was being built (tombstoned ones stay out)
+            appended = np.arange(snapshot_rows, len(self.chunk_id_order))
+            added = appended[self._live_mask()[appended]]
+            add_vectors(index, current_vectors[added], current_ids[added], self._partition_keys(added))
+            keep = np.concatenate([live, appended])
+            new_row = np.full(len(self.chunk_id_order), -1, dtype=np.int64)
+            new_row[keep] = np.arange(len(keep))
+            
+            self._vector_blocks = [np.concatenate([vectors, current_vectors[snapshot_rows:]])]
+            self._id_blocks = [current_ids[keep]]
+            self.chunk_id_order = [self.chunk_id_order[row] for row in keep]
+            # Rows removed while the index was being built stay tombstoned
+            self._tombstones = {int(new_row[row]) for row in self._tombstones if new_row[row] >= 0}
+            self._row_of_chunk = None
+            self._invalidate_filters()
+            self._index = index
+            self._index_file = None
+            self._index_stale = not complete
+            if complete:
+                self.index_params = params
     
     def get_chunk(self, chunk_id: str) -> Optional[Tuple[str, ChunkMetadata]]:
         """Get chunk text and metadata by chunk_id."""
@@ -218,8 +1593,55 @@ class VectorStore:
             return None
         return (self.chunks[chunk_id], self.metadata[chunk_id])
     
+    def iter_embeddings(
+        self,
+        batch_size: int = 1000,
+        chunk_ids: Optional[Iterable[str]] = None
+    ) -> Iterator[Tuple[List[str], np.ndarray]]:
+        """
+        Stream stored embeddings in index order.
+        
+        Args:
+            batch_size: Vectors per yielded batch
+            chunk_ids: Only stream these chunks (default: every live chunk)
+        
+        Yields:
+            (chunk_ids, embeddings) batches of the raw stored vectors
+        """
+        # Snapshot under the lock; later swaps replace (never modify) these arrays
+        with self._lock.read():
+            vectors = self.vectors
+            if chunk_ids is None:
+                live = np.flatnonzero(self._live_mask())
+            else:
+                rows = self._chunk_rows()
+                live = np.sort(np.fromiter(
+                    (rows[chunk_id] for chunk_id in chunk_ids if chunk_id in rows), dtype=np.int64
+                ))
+            chunk_id_order = self.chunk_id_order
+        for start in range(0, len(live), batch_size):
+            rows = live[start:start + batch_size]
+            yield [chunk_id_order[row] for row in rows], np.array(vectors[rows])
+    
     def save(self, path: Optional[str] = None):
-        """Save the vector store to disk."""
+        """
+        Save the vector store to disk in the columnar, memory-mappable layout.
+        
+        Layout ({path}/):
+            index.faiss                      FAISS index (unpartitioned stores)
+            shards/                          per-partition FAISS indexes (ShardedIndex)
+            vectors.npy                      raw float32 vectors (row = index position)
+            vector_ids.npy                   stable int64 id of each row in the index
+            bm25_*                           BM25 postings over chunk texts (see bm25.py)
+            ids.npy                          chunk ids (fixed-width UTF-8, row order)
+            text_spans.npy, texts.*          chunk text spans / inline texts (BlobTextStore), or
+                                             zstd-compressed texts (CompressedTextStore)
+            meta_*.npy, meta_columns.json    categorical ChunkMetadata columns (CategoricalTable)
+            config.json                      model, dimension and index configuration
+        
+        Every file is written to a temporary name and renamed into place, so
+        saving over the files a store was loaded (memory-mapped) from is safe.
+        """
         path = path or self.index_path
         if not path:
             raise ValueError("No path provided for saving")
@@ -227,42 +1649,147 @@ class VectorStore:
         path = Path(path)
         path.mkdir(parents=True, exist_ok=True)
         
-        # Save FAISS index
-        faiss.write_index(self.index, str(path / "index.faiss"))
-        
-        # Save chunks and metadata
-        with open(path / "chunks.json", "w") as f:
-            json.dump(self.chunks, f)
-        
-        with open(path / "metadata.pkl", "wb") as f:
-            pickle.dump(self.metadata, f)
-        
-        # Save chunk_id_order
-        with open(path / "chunk_id_order.json", "w") as f:
-            json.dump(self.chunk_id_order, f)
-        
-        # Save config
-        config = {
-            "embedding_model": self.embedding_model_name,
-            "dimension": self.dimension,
-            "num_chunks": len(self.chunks)
-        }
-        with open(path / "config.json", "w") as f:
-            json.dump(config, f)
+        self.wait_for_compaction()
+        with self._lock.write():
+            # Drop tombstones so rows, ids and index entries line up one to one
+            self._compact()
+            
+            # Save FAISS index, the raw vectors it is built from and their ids
+            if self.partition_by:
+                self.index.write(path / "shards")
+                if (path / "index.faiss").exists():
+                    (path / "index.faiss").unlink()
+            else:
+                atomic_write(path / "index.faiss", lambda tmp_path: faiss.write_index(self.index, tmp_path))
+                if (path / "shards").exists():
+                    shutil.rmtree(path / "shards")
+            save_array(path / "vectors.npy", self.vectors)
+            save_array(path / "vector_ids.npy", self.row_ids)
+            self._lexical_index().write(str(path), prefix="bm25_")
+            
+            # Save ids, texts and metadata as columns in index order
+            chunk_ids = self.chunk_id_order
+            save_array(path / "ids.npy", np.array([chunk_id.encode("utf-8") for chunk_id in chunk_ids], dtype=bytes))
+            if self.text_compression == "zstd":
+                CompressedTextStore.write(str(path), chunk_ids, self.chunks)
+            else:
+                BlobTextStore.write(str(path), chunk_ids, self.chunks)
+            self.metadata.write(str(path), chunk_ids, prefix="meta_")
+            for legacy_file in LEGACY_FILES:
+                if (path / legacy_file).exists():
+                    (path / legacy_file).unlink()
+            
+            # Save config
+            config = {
+                "embedding_model": self.embedding_model_name,
+                "dimension": self.dimension,
+                "num_chunks": len(chunk_ids),
+                "format": "columnar",
+                "index_type": self.index_type,
+                "index_params": self.index_params,
+                "storage": self.storage,
+                "rerank_factor": self.rerank_factor,
+                "partition_by": self.partition_by,
+                "index_built": not self._index_stale,
+                "next_id": self._next_id,
+                "recall": self.recall_report
+            }
+            
+            def write_config(tmp_path: str):
+                with open(tmp_path, "w") as f:
+                    json.dump(config, f)
+            atomic_write(path / "config.json", write_config)
     
     def load(self, path: str):
-        """Load the vector store from disk."""
+        """
+        Load the vector store from disk.
+        
+        Columnar saves are memory-mapped: the index is read with FAISS mmap IO
+        flags, and texts and metadata are decoded only when accessed (texts
+        saved with text_compression="zstd" are read into memory compressed
+        and decompressed per access). Saves
+        in the older JSON/pickle layout are still read (and converted by the
+        next save()).
+        """
         path = Path(path)
+        self.wait_for_compaction()
+        with self._lock.write():
+            self._generation += 1
+            self._load(path)
+    
+    def _load(self, path: Path):
+        # Load config
+        with open(path / "config.json", "r") as f:
+            config = json.load(f)
+        self.dimension = config.get("dimension", self.dimension)
+        self.index_type = config.get("index_type", "flat")
+        self.index_params = config.get("index_params", {})
+        self.storage = config.get("storage", "float32")
+        self.rerank_factor = config.get("rerank_factor", self.rerank_factor)
+        self.partition_by = config.get("partition_by")
+        self.recall_report = config.get("recall")
         
-        # Load FAISS index
-        self.index = faiss.read_index(str(path / "index.faiss"))
+        self._invalidate_filters()
+        self._counts = None
+        self._tombstones = set()
+        self._row_of_chunk = None
         
-        # Load chunks and metadata
-        with open(path / "chunks.json", "r") as f:
-            self.chunks = json.load(f)
+        # Load FAISS index (memory-mapped) and raw vectors
+        if self.partition_by:
+            self._index = ShardedIndex(self._new_shard, self.shard_workers)
+            self._index.read(path / "shards", self.index_type)
+            self._index_file = str(path / "shards")
+            for shard in self._index.shards.values():
+                apply_search_params(shard, self.index_type, self.index_params)
+        else:
+            self._index = read_index_mmap(str(path / "index.faiss"), self.index_type)
+            self._index_file = str(path / "index.faiss")
+            apply_search_params(self._index, self.index_type, self.index_params)
+        # An index saved before it could be trained is a flat stand-in
+        self._index_stale = not config.get("index_built", True)
+        vectors_file = path / "vectors.npy"
+        if vectors_file.exists():
+            self._vector_blocks = [np.load(vectors_file, mmap_mode="r")]
+        else:
+            # Older saves only have the flat index, which stores the vectors
+            self._vector_blocks = [self._index.reconstruct_n(0, self._index.ntotal)]
+        # Saves before stable ids have a plain index numbered by row
+        ids_file = path / "vector_ids.npy"
+        if ids_file.exists():
+            self._id_blocks = [np.load(ids_file)]
+        else:
+            self._id_blocks = [np.arange(len(self._vector_blocks[0]), dtype=np.int64)]
+        self._next_id = config.get("next_id", len(self._id_blocks[0]))
+        # Saves without BM25 postings build them on first lexical use
+        self._bm25 = BM25Index.open(str(path), prefix="bm25_") if BM25Index.exists(str(path), prefix="bm25_") else None
+        
+        if config.get("format") == "columnar":
+            self.chunk_id_order = np.char.decode(load_array(path / "ids.npy"), "utf-8").tolist()
+            rows = {chunk_id: row for row, chunk_id in enumerate(self.chunk_id_order)}
+            self.chunks = open_text_store(str(path), rows, turn_store=self.chunks.turn_store)
+            self.text_compression = self.chunks.compression
+            # The table adds and drops rows of its own; the text store keeps the saved ones
+            self.metadata = CategoricalTable.open(str(path), ChunkMetadata, "chunk_id", dict(rows), prefix="meta_")
+        else:
+            self._load_legacy(path)
+        
+        print(f"Loaded vector store: {config['num_chunks']} chunks ({self.index_type} index, {self.storage} storage)")
+    
+    def _load_legacy(self, path: Path):
+        """Texts, metadata and order from saves that predate the columnar layout."""
+        # Load chunk spans/texts (or full texts from older saves) and metadata
+        spans_file = path / "chunk_spans.json"
+        if spans_file.exists():
+            self.chunks = SpanTextStore.load(str(spans_file), turn_store=self.chunks.turn_store)
+        else:
+            self.chunks = SpanTextStore(self.chunks.turn_store)
+            with open(path / "chunks.json", "r") as f:
+                self.chunks.update(json.load(f))
         
         with open(path / "metadata.pkl", "rb") as f:
-            self.metadata = pickle.load(f)
+            self.metadata = CategoricalTable.from_records(
+                ChunkMetadata, "chunk_id", pickle.load(f), METADATA_INTEGER_FIELDS
+            )
         
         # Load chunk_id_order if available, otherwise reconstruct
         order_file = path / "chunk_id_order.json"
@@ -272,34 +1799,67 @@ class VectorStore:
         else:
             # Reconstruct from chunks dict (order may not be preserved)
             self.chunk_id_order = list(self.chunks.keys())
+    
+    def get_stats(self, measure_recall: bool = False) -> Dict:
+        """
+        Get statistics about the vector store.
         
-        # Load config
-        with open(path / "config.json", "r") as f:
-            config = json.load(f)
+        Cheap enough to serve on every health check or metrics scrape: counts
+        are maintained incrementally, nothing is built or measured (unless
+        measure_recall is set), and no metadata records are decoded.
         
-        print(f"Loaded vector store: {config['num_chunks']} chunks")
-    
-    def get_stats(self) -> Dict:
-        """Get statistics about the vector store."""
-        guest_counts = {}
-        theme_counts = {}
-        episode_counts = {}
-        
-        for chunk_id, metadata in self.metadata.items():
-            guest_counts[metadata.guest_id] = guest_counts.get(metadata.guest_id, 0) + 1
-            if metadata.theme_id:
-                theme_counts[metadata.theme_id] = theme_counts.get(metadata.theme_id, 0) + 1
-            episode_counts[metadata.episode_id] = episode_counts.get(metadata.episode_id, 0) + 1
-        
-        return {
-            "total_chunks": len(self.chunks),
-            "unique_guests": len(guest_counts),
-            "unique_themes": len(theme_counts),
-            "unique_episodes": len(episode_counts),
-            "guest_counts": guest_counts,
-            "theme_counts": theme_counts
-        }
-
+        Args:
+            measure_recall: Re-measure recall@k of the index against exact
+                search instead of reporting the last measurement
+        """
+        if measure_recall:
+            self.measure_recall()
+        
+        with self._lock.read():
+            counts = self._field_counts()
+            index = self._index
+            shard_sizes = None
+            if isinstance(index, ShardedIndex):
+                shard_sizes = {key: shard.ntotal for key, shard in index.shards.items()}
+            bytes_per_code = code_bytes(self.index_type, self.storage, self.dimension, self.index_params)
+            ntotal = index.ntotal if index is not None else 0
+            vector_bytes = sum(block.nbytes for block in self._vector_blocks)
+            
+            return {
+                "total_chunks": len(self.chunk_id_order) - len(self._tombstones),
+                "tombstones": len(self._tombstones),
+                "unique_guests": len(counts["guest_id"]),
+                "unique_themes": len(counts["theme_id"]),
+                "unique_episodes": len(counts["episode_id"]),
+                "guest_counts": dict(counts["guest_id"]),
+                "theme_counts": dict(counts["theme_id"]),
+                "index": {
+                    "type": self.index_type,
+                    "faiss_class": type(index).__name__ if index is not None else None,
+                    "params": self.index_params,
+                    "storage": self.storage,
+                    "reranks": self.reranks,
+                    "built": index is not None and not self._index_stale,
+                    "memory_mapped": self._index_file is not None,
+                    "code_bytes_per_vector": bytes_per_code,
+                    "ntotal": ntotal,
+                    "partition_by": self.partition_by,
+                    "shards": len(shard_sizes) if shard_sizes is not None else None,
+                    "shard_sizes": shard_sizes,
+                    "recall": self.recall_report
+                },
+                "memory": {
+                    "vector_bytes": vector_bytes,
+                    "vector_bytes_mapped": sum(
+                        block.nbytes for block in self._vector_blocks if isinstance(block, np.memmap)
+                    ),
+                    "id_bytes": sum(block.nbytes for block in self._id_blocks),
+                    "metadata_bytes": self.metadata.nbytes,
+                    "index_code_bytes": int(bytes_per_code * ntotal)
+                },
+                "lexical": self._bm25.get_stats() if self._bm25 is not None else None,
+                "text_store": self.chunks.get_stats() if isinstance(self.chunks, CompressedTextStore) else None
+            }
 
 if __name__ == "__main__":
     # Test vector store
@@ -5,8 +5,8 @@ This is the "routing" layer that decides who should speak.
 import numpy as np
 from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
-from sentence_transformers import SentenceTransformer
 
+from ..knowledge.model_registry import get_encoder
 from ..knowledge.theme_clusterer import Theme
 from ..knowledge.vector_store import VectorStore
 
@@ -42,7 +42,8 @@ class RuntimeIntelligence:
         themes: List[Theme],
         guest_theme_strengths: Dict[str, Dict[str, float]],
         vector_store: VectorStore,
-        embedding_model: str = "all-MiniLM-L6-v2"
+        embedding_model: str = "all-MiniLM-L6-v2",
+        encoder_backend: Optional[str] = None
     ):
         """
         Initialize runtime intelligence.
@@ -52,11 +53,12 @@ class RuntimeIntelligence:
             guest_theme_strengths: Dict mapping guest_id -> {theme_id: strength}
             vector_store: Vector store for additional retrieval
             embedding_model: Embedding model name
+            encoder_backend: Query encoder backend ("torch" or "onnx")
         """
         self.themes = {theme.theme_id: theme for theme in themes}
         self.guest_theme_strengths = guest_theme_strengths
         self.vector_store = vector_store
-        self.encoder = SentenceTransformer(embedding_model)
+        self.encoder = get_encoder(embedding_model, encoder_backend)  # shared with the vector store
         
         # Pre-compute theme centroids
         self.theme_centroids = {
@@ -157,15 +157,13 @@ class LangChainRAGOrchestrator:
             def get_relevant_documents(self, query: str):
                 """LangChain-compatible retrieval."""
                 if self.theme_ids:
-                    # Search within each theme and combine
+                    # Search within each theme (one batched call) and combine
                     all_results = []
-                    for theme_id in self.theme_ids:
-                        results = self.vector_store.search(
-                            query=query,
-                            k=self.k,
-                            filter_guest_id=self.guest_id,
-                            filter_theme_id=theme_id
-                        )
+                    for results in self.vector_store.search_many(
+                        [query],
+                        [{"guest_id": self.guest_id, "theme_id": theme_id} for theme_id in self.theme_ids],
+                        k=self.k
+                    ):
                         all_results.extend(results)
                     
                     # Deduplicate and sort by score
@@ -26,6 +26,7 @@ try:
 except ImportError:
     ANTHROPIC_AVAILABLE = False
 
+from ..knowledge.tokenization import get_tokenizer
 from ..knowledge.vector_store import VectorStore, SearchResult
 
 load_dotenv()
@@ -55,10 +56,14 @@ class RAGEngine:
         self,
         vector_store: VectorStore,
         model: Optional[str] = None,
-        provider: str = "gemini"
+        provider: str = "gemini",
+        max_context_tokens: Optional[int] = None,
+        retrieval_mode: str = "vector"
     ):
         self.vector_store = vector_store
+        self.retrieval_mode = retrieval_mode  # VectorStore search mode: vector, lexical or hybrid
         self.provider = provider.lower()
+        self.max_context_tokens = max_context_tokens  # excerpt token budget (None = no limit)
         
         # Initialize client based on provider
         if self.provider == "gemini" and GEMINI_AVAILABLE:
@@ -97,13 +102,19 @@ class RAGEngine:
             else:
                 raise ValueError("No API key found. Set GEMINI_API_KEY, OPENAI_API_KEY, or ANTHROPIC_API_KEY")
     
+    @property
+    def tokenizer(self):
+        """Shared tokenizer for the excerpt budget, only created once a budget is used."""
+        return get_tokenizer()
+    
     def generate_guest_response(
         self,
         query: str,
         guest_id: str,
         guest_name: str,
         theme_ids: Optional[List[str]] = None,
-        num_chunks: int = 5
+        num_chunks: int = 5,
+        chunks: Optional[List[SearchResult]] = None
     ) -> GuestResponse:
         """
         Generate a response from a specific guest using RAG.
@@ -114,17 +125,19 @@ class RAGEngine:
             guest_name: Guest's display name
             theme_ids: Optional list of theme IDs to filter by
             num_chunks: Number of chunks to retrieve
+            chunks: Already retrieved chunks (skips retrieval)
             
         Returns:
             GuestResponse object
         """
         # Step 1: Retrieve relevant chunks
-        chunks = self._retrieve_chunks(
-            query=query,
-            guest_id=guest_id,
-            theme_ids=theme_ids,
-            k=num_chunks
-        )
+        if chunks is None:
+            chunks = self._retrieve_chunks(
+                query=query,
+                guest_id=guest_id,
+                theme_ids=theme_ids,
+                k=num_chunks
+            )
         
         if not chunks:
             return GuestResponse(
@@ -165,44 +178,73 @@ class RAGEngine:
         
         If theme_ids provided, searches within each theme and combines results.
         """
-        if theme_ids:
-            # Search within each theme and combine
-            all_results = []
-            for theme_id in theme_ids:
-                results = self.vector_store.search(
-                    query=query,
-                    k=k,
-                    filter_guest_id=guest_id,
-                    filter_theme_id=theme_id
-                )
-                all_results.extend(results)
-            
-            # Deduplicate and sort by score
+        return self._retrieve_chunks_many(query, [guest_id], theme_ids, k)[guest_id]
+    
+    def _retrieve_chunks_many(
+        self,
+        query: str,
+        guest_ids: List[str],
+        theme_ids: Optional[List[str]] = None,
+        k: int = 5
+    ) -> Dict[str, List[SearchResult]]:
+        """
+        Retrieve relevant chunks for several guests with one batched search.
+        
+        Every (guest, theme) pair becomes one filter of a single
+        VectorStore.search_many call, so the query is encoded once.
+        
+        Returns:
+            Dict[guest_id] = top-k chunks across the guest's themes
+        """
+        pairs = [(guest_id, theme_id) for guest_id in guest_ids for theme_id in (theme_ids or [None])]
+        result_lists = self.vector_store.search_many(
+            [query],
+            [{"guest_id": guest_id, "theme_id": theme_id} for guest_id, theme_id in pairs],
+            k=k,
+            mode=self.retrieval_mode
+        )
+        
+        all_results: Dict[str, List[SearchResult]] = {guest_id: [] for guest_id in guest_ids}
+        for (guest_id, _), results in zip(pairs, result_lists):
+            all_results[guest_id].extend(results)
+        
+        # Deduplicate and sort by score
+        retrieved = {}
+        for guest_id, results in all_results.items():
             seen_chunk_ids = set()
             unique_results = []
-            for result in sorted(all_results, key=lambda x: x.score, reverse=True):
+            for result in sorted(results, key=lambda x: x.score, reverse=True):
                 if result.chunk_id not in seen_chunk_ids:
                     unique_results.append(result)
                     seen_chunk_ids.add(result.chunk_id)
                     if len(unique_results) >= k:
                         break
-            
-            return unique_results
-        else:
-            # Search without theme filter
-            return self.vector_store.search(
-                query=query,
-                k=k,
-                filter_guest_id=guest_id
-            )
+            retrieved[guest_id] = unique_results
+        return retrieved
     
     def _build_context(self, chunks: List[SearchResult]) -> str:
-        """Build context string from retrieved chunks."""
+        """
+        Build context string from retrieved chunks.
+        
+        With max_context_tokens set, excerpts are added best-first until it is
+        reached; the excerpt that crosses the budget is cut at a token boundary.
+        """
+        if self.max_context_tokens is None:
+            return "\n".join(f"[Excerpt {i}]\n{chunk.text}\n" for i, chunk in enumerate(chunks, 1))
+        
         context_parts = []
-        for i, chunk in enumerate(chunks, 1):
+        remaining = self.max_context_tokens
+        token_counts = self.tokenizer.count_batch([chunk.text for chunk in chunks])
+        for i, (chunk, token_count) in enumerate(zip(chunks, token_counts), 1):
+            if remaining <= 0:
+                break
+            text = chunk.text
+            if token_count > remaining:
+                text = self.tokenizer.truncate(text, remaining)
+            remaining -= token_count
             context_parts.append(
                 f"[Excerpt {i}]\n"
-                f"{chunk.text}\n"
+                f"{text}\n"
             )
         return "\n".join(context_parts)
     
@@ -275,13 +317,21 @@ Your response:"""
         Returns:
             List of GuestResponse objects
         """
+        # Retrieve for all guests in one batched search
+        retrieved = self._retrieve_chunks_many(
+            query=query,
+            guest_ids=[config["guest_id"] for config in guest_configs],
+            theme_ids=theme_ids
+        )
+        
         responses = []
         for config in guest_configs:
             response = self.generate_guest_response(
                 query=query,
                 guest_id=config["guest_id"],
                 guest_name=config["guest_name"],
-                theme_ids=theme_ids
+                theme_ids=theme_ids,
+                chunks=retrieved[config["guest_id"]]
             )
             responses.append(response)
         return responses
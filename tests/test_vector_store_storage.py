@@ -0,0 +1,91 @@
+"""
+Search after removal for every allowed index type x storage combination.
+
+Removed chunks stay in the index as tombstones and are masked out with a
+search-time selector; filtered searches over more candidates than
+exact_filter_threshold use the same path. Run with: python -m pytest tests
+"""
+import itertools
+import zlib
+
+import numpy as np
+import pytest
+
+from src.knowledge import model_registry
+from src.knowledge.vector_store import INDEX_DEFAULTS, INDEX_STORAGE, ChunkMetadata, VectorStore, create_index
+
+
+MODEL = "test-hash-encoder"
+DIMENSION = 32
+COMBINATIONS = [
+    (index_type, storage)
+    for index_type, storage in itertools.product(INDEX_DEFAULTS, INDEX_STORAGE)
+    if not (index_type == "ivf_pq" and storage not in ("float32", "pq"))
+]
+
+
+class HashEncoder:
+    """Deterministic text -> vector encoder, so queries can hit stored chunks exactly."""
+
+    def encode(self, texts, **kwargs):
+        return np.stack([
+            np.random.RandomState(zlib.crc32(text.encode("utf-8"))).standard_normal(DIMENSION).astype(np.float32)
+            for text in texts
+        ])
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return DIMENSION
+
+
+@pytest.fixture(autouse=True)
+def hash_encoder(monkeypatch):
+    monkeypatch.setitem(model_registry._encoders, (MODEL, model_registry.DEFAULT_BACKEND), HashEncoder())
+    monkeypatch.setitem(model_registry._dimensions, MODEL, DIMENSION)
+
+
+def build_store(index_type: str, storage: str, partition_by=None) -> VectorStore:
+    store = VectorStore(embedding_model=MODEL, index_type=index_type, storage=storage, partition_by=partition_by)
+    store.auto_compact = False  # keep removed rows as tombstones
+    store.upsert_chunks([
+        {
+            "chunk_id": f"c{i}",
+            "text": f"chunk {i}",
+            "metadata": ChunkMetadata(chunk_id=f"c{i}", guest_id=f"g{i % 2}", episode_id=f"e{i % 6}")
+        }
+        for i in range(600)
+    ])
+    return store
+
+
+def test_combinations_are_valid():
+    for index_type, storage in COMBINATIONS:
+        create_index(index_type, DIMENSION, {}, 600, storage)
+    with pytest.raises(ValueError):
+        create_index("ivf_pq", DIMENSION, {}, 600, "sq8")
+
+
+@pytest.mark.parametrize("partition_by", [None, "guest_id"])
+@pytest.mark.parametrize("index_type,storage", COMBINATIONS)
+def test_search_after_removal(index_type, storage, partition_by):
+    store = build_store(index_type, storage, partition_by)
+    assert store.remove_episode("e0") == 100
+    store.remove_chunks(["c1", "c2"])
+    removed = {f"c{i}" for i in range(0, 600, 6)} | {"c1", "c2"}
+
+    queries = [f"chunk {i}" for i in range(40)]
+    results = store.search_many(queries, k=5)
+    self_hits = 0
+    for query, hits in zip(queries, results):
+        assert len(hits) == 5
+        assert not removed & {hit.chunk_id for hit in hits}
+        self_hits += hits[0].text == query
+    assert self_hits >= 0.9 * sum(f"c{i}" not in removed for i in range(40))
+
+    # Filtered ANN search (not the exact small-candidate path)
+    store.exact_filter_threshold = 0
+    hits = store.search("chunk 7", k=5, filter_guest_id="g1")
+    assert len(hits) == 5
+    assert all(hit.metadata.guest_id == "g1" and hit.chunk_id not in removed for hit in hits)
+
+    report = store.measure_recall(k=5, num_queries=20)
+    assert report["recall_at_k"] > 0.5